@@ -1,23 +1,362 @@
+import hashlib
+import json
+import re
 import sqlite3
+import threading
 import pandas as pd
 import os
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime
+from date_utils import BLANK_VALUES, DATE_FORMAT, ISO_FORMAT, to_iso_date
+from query_cache import QueryCache, SharedSnapshot, cached_query
+from query_metrics import QueryMetrics, instrument_methods
+from vessel_search import VesselSearchIndex
 
+# Profil PRAGMA yang dipasang di setiap koneksi pool.
+# WAL: pembaca tidak memblokir penulis (dan sebaliknya).
+CONNECTION_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),     # aman untuk WAL, fsync hanya saat checkpoint
+    ('busy_timeout', 5000),        # ms menunggu lock sebelum "database is locked"
+    ('cache_size', -20000),        # ~20 MB page cache per koneksi
+    ('mmap_size', 268435456),      # 256 MB memory-mapped I/O
+    ('temp_store', 'MEMORY'),
+)
+
+# Kolom teks tanggal -> kolom ISO 'YYYY-MM-DD' yang diisi saat tulis dan di-index
+DATE_COLUMNS = {
+    'day': 'day_iso',
+    'issued_date': 'issued_iso',
+    'closed_date': 'closed_iso',
+}
+
+# Key data add_laporan / update_laporan -> kolom teks tanggal
+DATE_FIELDS = {
+    'Day': 'day',
+    'Issued Date': 'issued_date',
+    'Closed Date': 'closed_date',
+}
+
+# Kolom turunan yang ditambahkan ke database lama: nama -> (tipe, ekspresi backfill)
+DERIVED_COLUMNS = {
+    'day_iso': ('TEXT', 'to_iso_date(day)'),
+    'issued_iso': ('TEXT', 'to_iso_date(issued_date)'),
+    'closed_iso': ('TEXT', 'to_iso_date(closed_date)'),
+    # 1 = OPEN, 0 = lainnya; urutan listing: status_rank DESC, created_at DESC, id DESC
+    'status_rank': ('INTEGER', "CASE WHEN status = 'OPEN' THEN 1 ELSE 0 END"),
+    # Kunci dedup import (lihat laporan_content_hash), UNIQUE via idx_content_hash
+    'content_hash': ('TEXT', 'laporan_content_hash(vessel, unit, day, permasalahan)'),
+}
+
+# Kolom yang ditulis oleh add_laporan / update_laporan (urutan = _laporan_values)
+WRITE_COLUMNS = (
+    'day', 'vessel', 'permasalahan', 'penyelesaian', 'unit', 'issued_date', 'closed_date',
+    'keterangan', 'status', 'day_iso', 'issued_iso', 'closed_iso', 'status_rank',
+    'content_hash',
+)
+
+# Kolom yang diperbarui saat import menemukan laporan dengan content_hash yang sama
+UPSERT_UPDATE_COLUMNS = (
+    'penyelesaian', 'issued_date', 'closed_date', 'keterangan', 'status',
+    'issued_iso', 'closed_iso', 'status_rank',
+)
+
+INSERT_SQL = f'''
+    INSERT INTO laporan_kerusakan ({', '.join(WRITE_COLUMNS)})
+    VALUES ({', '.join('?' for _ in WRITE_COLUMNS)})
+'''
+UPSERT_SQL = INSERT_SQL + f'''
+    ON CONFLICT (content_hash) DO UPDATE SET
+        {', '.join(f'{col} = excluded.{col}' for col in UPSERT_UPDATE_COLUMNS)},
+        updated_at = CURRENT_TIMESTAMP
+    WHERE {' OR '.join(f'{col} IS NOT excluded.{col}' for col in UPSERT_UPDATE_COLUMNS)}
+'''
+INSERT_IGNORE_SQL = INSERT_SQL + 'ON CONFLICT (content_hash) DO NOTHING'
+UPDATE_SQL = f'''
+    UPDATE laporan_kerusakan
+    SET {', '.join(f'{col}=?' for col in WRITE_COLUMNS)}, updated_at=CURRENT_TIMESTAMP
+    WHERE id=?
+'''
+
+# Kolom yang boleh diminta sebagai proyeksi di get_laporan_page
+LAPORAN_COLUMNS = ('id',) + WRITE_COLUMNS + ('created_at', 'updated_at')
+
+# Kolom teks yang di-index FTS5 (laporan_fts)
+FTS_COLUMNS = ('permasalahan', 'penyelesaian', 'keterangan')
+
+# Penanda highlight di snippet hasil search_laporan; halaman mengganti
+# keduanya dengan tag HTML setelah teks di-escape.
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+# MTTR: hari kalender inklusif (+1) antara issued_iso dan closed_iso, NULL jika tidak valid
+RESOLUTION_DAYS_SQL = '''CASE WHEN julianday(closed_iso) - julianday(issued_iso) >= 0
+                     THEN CAST(julianday(closed_iso) - julianday(issued_iso) AS INTEGER) + 1
+                END'''
+
+# Kolom kunci laporan_rollup (vessel, unit, bulan kejadian 'YYYY-MM', status)
+ROLLUP_KEY_COLUMNS = ('vessel', 'unit', 'month', 'status')
+
+# Urutan kartu kapal di Homepage (get_vessel_cards): kunci -> ORDER BY
+VESSEL_CARD_SORTS = {
+    'vessel': 'vessel',
+    'open_desc': 'open_count DESC, vessel',
+    'last_issued_desc': 'last_issued IS NULL, last_issued DESC, vessel',
+}
+
+# Filter status kartu kapal (get_vessel_cards): kunci -> kondisi atas jumlah OPEN/CLOSED
+VESSEL_CARD_STATUS_FILTERS = {
+    'open': 'open_count > 0',
+    'all_closed': 'open_count = 0 AND closed_count > 0',
+    'empty': 'open_count = 0 AND closed_count = 0',
+}
+
+# Jumlah koneksi idle yang disimpan untuk dipakai ulang thread baru
+MAX_IDLE_CONNECTIONS = 8
+
+# Bagian data_token yang dibaca dari database: sama untuk semua koneksi dan proses.
+# Setiap tulis laporan menambah baris laporan_changes (trigger), add_vessel menambah
+# vessel_registry; keduanya AUTOINCREMENT, jadi sqlite_sequence hanya bisa naik
+# (juga setelah changelog lama dipangkas, lihat _prune_changes).
+DATA_TOKEN_SQL = '''
+    SELECT
+        (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'laporan_changes'),
+        (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'vessel_registry')
+'''
+
+# Load bertipe (compact_laporan_frame): teks berkardinalitas rendah -> category,
+# kolom ISO -> datetime64, integer -> dtype ringkas
+CATEGORY_COLUMNS = ('vessel', 'unit', 'status', 'day')
+COMPACT_INT_COLUMNS = {'id': 'int32', 'status_rank': 'int8'}
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at')  # CURRENT_TIMESTAMP 'YYYY-MM-DD HH:MM:SS'
+
+# Langkah migrasi schema berurutan (nama method DatabaseManager). Setelah langkah ke-n
+# diterapkan, PRAGMA user_version = n. Setiap langkah idempoten (IF NOT EXISTS / cek
+# kolom / cek tabel) supaya database lama yang dibuat sebelum ada user_version ikut
+# termigrasi dengan benar. Tambahkan langkah baru di akhir, jangan mengubah urutan.
+SCHEMA_MIGRATIONS = (
+    '_create_base_schema',          # 1: tabel laporan_kerusakan + index dasar
+    '_migrate_derived_columns',     # 2: kolom ISO, status_rank, content_hash + backfill
+    '_create_derived_indexes',      # 3: index tanggal ISO + keyset listing
+    '_create_content_hash_index',   # 4: UNIQUE content_hash (dedup import)
+    '_create_import_log',           # 5: import_log CLI
+    '_create_vessel_summary',       # 6: ringkasan per kapal + trigger
+    '_create_fulltext_index',       # 7: FTS5 laporan_fts + trigger
+    '_create_laporan_rollup',       # 8: rollup bulanan dashboard + trigger
+    '_create_change_log',           # 9: laporan_changes + index updated_at
+    '_normalize_legacy_values',     # 10: upper/strip vessel, unit, status data lama
+    '_create_covering_indexes',     # 11: index covering get_stats + laporan OPEN terlama
+    '_create_vessel_registry',      # 12: daftar kapal armada + trigger dari laporan
+    '_refresh_content_hash',        # 13: hash ulang setelah nilai kosong ('nan', 'None') dinormalisasi
+    '_reparse_app_dates',           # 14: tanggal ISO dari input aplikasi di-parse ulang sebagai DD/MM
+    '_drop_changes_changed_at_index',  # 15: watermark changelog hanya version
+)
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+# Normalisasi satu kali untuk data lama (nilai baru sudah dinormalisasi di _laporan_values)
+NORMALIZE_LEGACY_SQL = '''
+    UPDATE laporan_kerusakan SET
+        vessel = UPPER(TRIM(vessel)),
+        unit = UPPER(TRIM(unit)),
+        status = COALESCE(NULLIF(UPPER(TRIM(status)), ''), 'OPEN'),
+        status_rank = COALESCE(NULLIF(UPPER(TRIM(status)), ''), 'OPEN') = 'OPEN'
+    WHERE vessel IS NOT UPPER(TRIM(vessel))
+       OR unit IS NOT UPPER(TRIM(unit))
+       OR status IS NOT COALESCE(NULLIF(UPPER(TRIM(status)), ''), 'OPEN')
+'''
+
+def _summary_year_sql(row):
+    """Tahun issued_iso untuk vessel_summary, 0 jika tanggal tidak diketahui"""
+    return f"COALESCE(CAST(substr({row}.issued_iso, 1, 4) AS INTEGER), 0)"
+
+
+def _summary_add_sql(row):
+    """Statement trigger: tambahkan satu laporan (NEW/OLD) ke vessel_summary"""
+    return f'''
+        INSERT INTO vessel_summary (vessel, year, total_count, open_count, closed_count, last_issued)
+        VALUES ({row}.vessel, {_summary_year_sql(row)}, 1,
+                {row}.status = 'OPEN', {row}.status = 'CLOSED', {row}.issued_iso)
+        ON CONFLICT (vessel, year) DO UPDATE SET
+            total_count = total_count + 1,
+            open_count = open_count + excluded.open_count,
+            closed_count = closed_count + excluded.closed_count,
+            last_issued = CASE WHEN last_issued IS NULL OR excluded.last_issued > last_issued
+                               THEN excluded.last_issued ELSE last_issued END;
+    '''
+
+
+def _summary_remove_sql(row):
+    """Statement trigger: keluarkan satu laporan (OLD) dari vessel_summary"""
+    year = _summary_year_sql(row)
+    return f'''
+        UPDATE vessel_summary SET
+            total_count = total_count - 1,
+            open_count = open_count - ({row}.status = 'OPEN'),
+            closed_count = closed_count - ({row}.status = 'CLOSED'),
+            last_issued = (
+                SELECT MAX(issued_iso) FROM laporan_kerusakan
+                WHERE vessel = {row}.vessel
+                  AND issued_iso >= printf('%04d-01-01', {year})
+                  AND issued_iso < printf('%04d-01-01', {year} + 1)
+            )
+        WHERE vessel = {row}.vessel AND year = {year};
+        DELETE FROM vessel_summary
+        WHERE vessel = {row}.vessel AND year = {year} AND total_count <= 0;
+    '''
+
+
+def _rollup_key_sql(row):
+    """Nilai kunci laporan_rollup untuk satu laporan (NEW/OLD)"""
+    return (f"{row}.vessel, COALESCE({row}.unit, ''), substr({row}.day_iso, 1, 7), "
+            f"COALESCE({row}.status, '')")
+
+
+def _rollup_resolution_sql(row):
+    return RESOLUTION_DAYS_SQL.replace('closed_iso', f'{row}.closed_iso').replace('issued_iso', f'{row}.issued_iso')
+
+
+def _rollup_add_sql(row):
+    """Statement trigger: tambahkan satu laporan ke laporan_rollup (laporan tanpa day_iso tidak dihitung)"""
+    resolution = _rollup_resolution_sql(row)
+    return f'''
+        INSERT INTO laporan_rollup ({', '.join(ROLLUP_KEY_COLUMNS)}, report_count, resolution_sum, resolution_count)
+        SELECT {_rollup_key_sql(row)}, 1, COALESCE({resolution}, 0), ({resolution}) IS NOT NULL
+        WHERE {row}.day_iso IS NOT NULL
+        ON CONFLICT ({', '.join(ROLLUP_KEY_COLUMNS)}) DO UPDATE SET
+            report_count = report_count + 1,
+            resolution_sum = resolution_sum + excluded.resolution_sum,
+            resolution_count = resolution_count + excluded.resolution_count;
+    '''
+
+
+def _rollup_remove_sql(row):
+    """Statement trigger: keluarkan satu laporan (OLD) dari laporan_rollup"""
+    resolution = _rollup_resolution_sql(row)
+    key = f"({', '.join(ROLLUP_KEY_COLUMNS)}) = ({_rollup_key_sql(row)})"
+    return f'''
+        UPDATE laporan_rollup SET
+            report_count = report_count - 1,
+            resolution_sum = resolution_sum - COALESCE({resolution}, 0),
+            resolution_count = resolution_count - (({resolution}) IS NOT NULL)
+        WHERE {key};
+        DELETE FROM laporan_rollup WHERE {key} AND report_count <= 0;
+    '''
+
+
+def compact_laporan_frame(df):
+    """DataFrame laporan hasil read_sql -> dtype ringkas (memori jauh lebih kecil).
+    
+    vessel/unit/status/day menjadi category, day_iso/issued_iso/closed_iso dan
+    created_at/updated_at menjadi datetime64 (NaT jika kosong), id/status_rank
+    menjadi integer kecil.
+    Nilai tidak diubah: normalisasi (upper/strip) sudah dilakukan saat tulis.
+    """
+    df = df.copy(deep=False)
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in DATE_COLUMNS.values():
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format=ISO_FORMAT, errors='coerce')
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    for column, dtype in COMPACT_INT_COLUMNS.items():
+        if column in df.columns and df[column].notna().all():
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+# BLANK_VALUES tanpa membedakan huruf: importer meng-uppercase unit ('nan' -> 'NAN')
+_BLANK_HASH_VALUES = {value.lower() for value in BLANK_VALUES}
+
+
+def _hash_text(value):
+    """Teks satu kolom untuk content hash: di-strip, nilai kosong ('nan', 'None', ...) menjadi ''"""
+    text = '' if value is None else str(value).strip()
+    return '' if text.lower() in _BLANK_HASH_VALUES else text
+
+
+def laporan_content_hash(vessel, unit, day, permasalahan):
+    """Hash deterministik identitas laporan: kapal, unit, tanggal kejadian, teks masalah.
+
+    Dinormalisasi dulu (huruf besar/kecil, spasi, format tanggal, nilai kosong) supaya
+    laporan yang sama dari form maupun export CSV menghasilkan hash yang sama.
+    """
+    vessel, unit, day, permasalahan = (_hash_text(value) for value in (vessel, unit, day, permasalahan))
+    key = '\x1f'.join((
+        vessel.upper(),
+        unit.upper(),
+        to_iso_date(day) or day,
+        ' '.join(permasalahan.lower().split()),
+    ))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _fts_match_expression(query):
+    """Teks bebas -> ekspresi MATCH FTS5: setiap kata di-quote dan dijadikan prefix"""
+    tokens = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+# Helper murah/infrastruktur yang tidak perlu dicatat di QueryMetrics
+UNTIMED_METHODS = ('get_connection', 'transaction', 'data_token', 'schema_version',
+                   'clear_cache', 'close_all')
+
+
+@instrument_methods(exclude=UNTIMED_METHODS)
 class DatabaseManager:
     def __init__(self, db_path='data/laporan_kerusakan.db'):
         self.db_path = db_path
+        self._pool_lock = threading.Lock()
+        self._connections = {}  # thread -> koneksi milik thread tersebut
+        self._idle = []         # koneksi dari thread yang sudah selesai
+        # Cache hasil query baca, divalidasi dengan data_token()
+        self.query_cache = QueryCache()
+        # Latensi/baris/byte per method dan per SQL (halaman Monitor Sistem)
+        self.query_metrics = QueryMetrics()
+        # Snapshot seluruh laporan yang dibagi semua sesi Streamlit dalam proses ini
+        self.laporan_snapshot = SharedSnapshot(
+            'vessel', self._load_laporan_snapshot, self._get_snapshot_changes,
+            sort_by=['status_rank', 'created_at', 'id'], ascending=False
+        )
+        self._data_generation = 0  # jumlah commit lewat transaction() di proses ini
+        # Index pencarian kode kapal (trie + n-gram), dibangun ulang saat vessel_registry berubah
+        self.vessel_index = VesselSearchIndex()
+        self._vessel_index_lock = threading.Lock()
+        self._vessel_index_token = None      # data_token saat index terakhir dicek
+        self._vessel_index_signature = None  # (jumlah, id terbesar) vessel_registry saat dibangun
         self._ensure_data_dir()
         self.init_db()
     
     def _ensure_data_dir(self):
         """Ensure data directory exists"""
-        os.makedirs('data', exist_ok=True)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
     
     def init_db(self):
-        """Initialize database dengan schema yang benar"""
-        conn = self.get_connection()
-        c = conn.cursor()
+        """Pastikan schema terbaru dengan menjalankan langkah SCHEMA_MIGRATIONS yang belum diterapkan.
         
+        Fast path: jika PRAGMA user_version sudah SCHEMA_VERSION, tidak ada DDL maupun transaksi tulis.
+        """
+        if self.schema_version() >= SCHEMA_VERSION:
+            return
+        with self.transaction() as conn:
+            # Cek ulang di dalam lock tulis: proses lain mungkin baru saja selesai migrasi
+            version = self.schema_version()
+            c = conn.cursor()
+            for step in SCHEMA_MIGRATIONS[version:]:
+                getattr(self, step)(c)
+            c.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        # print(f"✅ Database initialized at: {self.db_path}")
+    
+    def schema_version(self):
+        """Versi schema database (PRAGMA user_version), 0 untuk database lama/baru"""
+        return self.get_connection().execute('PRAGMA user_version').fetchone()[0]
+    
+    # Langkah migrasi schema (lihat SCHEMA_MIGRATIONS)
+    def _create_base_schema(self, c):
+        """DDL tabel dan index utama"""
         c.execute('''
             CREATE TABLE IF NOT EXISTS laporan_kerusakan (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -31,7 +370,12 @@ class DatabaseManager:
                 keterangan TEXT,
                 status TEXT DEFAULT 'OPEN',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                day_iso TEXT,
+                issued_iso TEXT,
+                closed_iso TEXT,
+                status_rank INTEGER,
+                content_hash TEXT
             )
         ''')
         
@@ -39,140 +383,1169 @@ class DatabaseManager:
         c.execute('CREATE INDEX IF NOT EXISTS idx_vessel ON laporan_kerusakan(vessel)')
         c.execute('CREATE INDEX IF NOT EXISTS idx_status ON laporan_kerusakan(status)')
         c.execute('CREATE INDEX IF NOT EXISTS idx_unit ON laporan_kerusakan(unit)')
+    
+    def _create_derived_indexes(self, c):
+        """Index kolom tanggal ISO dan keyset pagination"""
+        c.execute('CREATE INDEX IF NOT EXISTS idx_day_iso ON laporan_kerusakan(day_iso)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_issued_iso ON laporan_kerusakan(issued_iso)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_vessel_day_iso ON laporan_kerusakan(vessel, day_iso)')
+        # Keyset pagination listing (lihat get_laporan_page)
+        c.execute('CREATE INDEX IF NOT EXISTS idx_listing ON laporan_kerusakan(status_rank, created_at, id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_vessel_listing ON laporan_kerusakan(vessel, status_rank, created_at, id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_vessel_issued_iso ON laporan_kerusakan(vessel, issued_iso)')
+    
+    def _create_import_log(self, c):
+        """Riwayat file yang sudah diimport lewat CLI (import_laporan.py)"""
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS import_log (
+                file_hash TEXT PRIMARY KEY,
+                file_name TEXT,
+                rows_read INTEGER,
+                rows_inserted INTEGER,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+    def _create_covering_indexes(self, c):
+        """Index komposit supaya query tanpa full scan / temp sort (cek: scripts/check_query_plans.py)"""
+        # get_stats: GROUP BY vessel cukup dari index, tanpa membaca baris tabel
+        c.execute('CREATE INDEX IF NOT EXISTS idx_vessel_stats ON laporan_kerusakan(vessel, status, created_at, issued_iso)')
+        # get_oldest_open: laporan OPEN sudah urut day_iso, id
+        c.execute('CREATE INDEX IF NOT EXISTS idx_status_day_iso ON laporan_kerusakan(status, day_iso, id)')
+    
+    def _normalize_legacy_values(self, c):
+        c.execute(NORMALIZE_LEGACY_SQL)
+    
+    def _create_vessel_registry(self, c):
+        """Daftar kapal armada, termasuk kapal yang belum punya laporan (lihat add_vessel).
         
-        conn.commit()
-        conn.close()
-        # print(f"✅ Database initialized at: {self.db_path}")
+        Kapal dari laporan baru/edit didaftarkan otomatis oleh trigger. Id AUTOINCREMENT
+        tidak pernah dipakai ulang, jadi (COUNT, MAX id) cukup untuk mendeteksi perubahan.
+        """
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS vessel_registry (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                vessel TEXT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        for event, columns in (('insert', 'INSERT'), ('update', 'UPDATE OF vessel')):
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_vessel_registry_{event}
+                AFTER {columns} ON laporan_kerusakan
+                BEGIN
+                    INSERT OR IGNORE INTO vessel_registry (vessel) VALUES (NEW.vessel);
+                END
+            ''')
+        c.execute('''
+            INSERT OR IGNORE INTO vessel_registry (vessel)
+            SELECT DISTINCT vessel FROM laporan_kerusakan ORDER BY vessel
+        ''')
     
-    def get_connection(self):
+    def _migrate_derived_columns(self, c):
+        """Migrasi satu kali: tambah kolom turunan pada database lama lalu backfill"""
+        existing = {row[1] for row in c.execute('PRAGMA table_info(laporan_kerusakan)')}
+        missing = {name: spec for name, spec in DERIVED_COLUMNS.items() if name not in existing}
+        if not missing:
+            return
+        
+        for name, (column_type, _) in missing.items():
+            c.execute(f'ALTER TABLE laporan_kerusakan ADD COLUMN {name} {column_type}')
+        assignments = ', '.join(f'{name} = {expr}' for name, (_, expr) in missing.items())
+        c.execute(f'UPDATE laporan_kerusakan SET {assignments}')
+    
+    def _create_content_hash_index(self, c):
+        """UNIQUE index content_hash; duplikat lama dibiarkan tanpa hash (NULL), bukan dihapus"""
+        exists = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_content_hash'"
+        ).fetchone()
+        if exists:
+            return
+        c.execute('''
+            UPDATE laporan_kerusakan SET content_hash = NULL
+            WHERE content_hash IS NOT NULL
+              AND id NOT IN (SELECT MIN(id) FROM laporan_kerusakan GROUP BY content_hash)
+        ''')
+        c.execute('CREATE UNIQUE INDEX idx_content_hash ON laporan_kerusakan(content_hash)')
+    
+    def _refresh_content_hash(self, c):
+        """Hitung ulang content_hash yang berubah karena normalisasi nilai kosong.
+
+        Seperti _create_content_hash_index: jika beberapa laporan kini punya hash yang
+        sama, hanya id terkecil yang mendapat hash, sisanya NULL.
+        """
+        new_hash = 'laporan_content_hash(vessel, unit, day, permasalahan)'
+        c.execute(f'''
+            UPDATE laporan_kerusakan SET content_hash = NULL
+            WHERE content_hash IS NOT NULL AND content_hash != {new_hash}
+        ''')
+        c.execute(f'''
+            UPDATE laporan_kerusakan SET content_hash = {new_hash}
+            WHERE id IN (
+                SELECT MIN(id) FROM laporan_kerusakan
+                WHERE content_hash IS NULL
+                GROUP BY {new_hash}
+            )
+              AND NOT EXISTS (
+                SELECT 1 FROM laporan_kerusakan AS taken WHERE taken.content_hash = {new_hash}
+            )
+        ''')
+    
+    def _reparse_app_dates(self, c):
+        """Parse ulang tanggal ISO dari teks yang ditulis aplikasi sebagai DD/MM/YYYY.
+
+        Backfill lama mencoba M/D lebih dulu, jadi input '05/03/2025' tersimpan 3 Mei.
+        Export CSV lama (M/D/YYYY) tidak pernah memakai nol di depan, sedangkan
+        strftime(DATE_FORMAT) selalu dua digit: teks dengan nol di depan pasti dari
+        aplikasi. Teks tanpa nol di depan (misal '10/11/2025') tetap ambigu dan dibiarkan.
+        """
+        for column, iso_column in DATE_COLUMNS.items():
+            c.execute(f'''
+                UPDATE laporan_kerusakan SET {iso_column} = to_iso_date({column}, :format)
+                WHERE {column} GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+                  AND ({column} GLOB '0*' OR {column} GLOB '??/0*')
+                  AND {iso_column} IS NOT to_iso_date({column}, :format)
+            ''', {'format': DATE_FORMAT})
+    
+    def _create_vessel_summary(self, c):
+        """Tabel ringkasan per kapal per tahun (issued) yang dijaga trigger"""
+        is_new = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vessel_summary'"
+        ).fetchone() is None
+        
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS vessel_summary (
+                vessel TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                total_count INTEGER NOT NULL DEFAULT 0,
+                open_count INTEGER NOT NULL DEFAULT 0,
+                closed_count INTEGER NOT NULL DEFAULT 0,
+                last_issued TEXT,
+                PRIMARY KEY (vessel, year)
+            ) WITHOUT ROWID
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_vessel_summary_insert
+            AFTER INSERT ON laporan_kerusakan
+            BEGIN
+                {_summary_add_sql('NEW')}
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_vessel_summary_delete
+            AFTER DELETE ON laporan_kerusakan
+            BEGIN
+                {_summary_remove_sql('OLD')}
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_vessel_summary_update
+            AFTER UPDATE OF vessel, status, issued_iso ON laporan_kerusakan
+            BEGIN
+                {_summary_remove_sql('OLD')}
+                {_summary_add_sql('NEW')}
+            END
+        ''')
+        
+        if is_new:
+            self._rebuild_vessel_summary(c)
+    
+    def _rebuild_vessel_summary(self, c):
+        c.execute('DELETE FROM vessel_summary')
+        c.execute(f'''
+            INSERT INTO vessel_summary (vessel, year, total_count, open_count, closed_count, last_issued)
+            SELECT
+                vessel,
+                {_summary_year_sql('laporan_kerusakan')} AS year,
+                COUNT(*),
+                SUM(status = 'OPEN'),
+                SUM(status = 'CLOSED'),
+                MAX(issued_iso)
+            FROM laporan_kerusakan
+            GROUP BY vessel, year
+        ''')
+    
+    def _create_laporan_rollup(self, c):
+        """Rollup bulanan per (kapal, unit, bulan kejadian, status) untuk dashboard, dijaga trigger.
+        
+        Menyimpan jumlah laporan serta jumlah & banyaknya resolution days (MTTR = sum / count).
+        """
+        is_new = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'laporan_rollup'"
+        ).fetchone() is None
+        
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS laporan_rollup (
+                vessel TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                month TEXT NOT NULL,
+                status TEXT NOT NULL,
+                report_count INTEGER NOT NULL DEFAULT 0,
+                resolution_sum INTEGER NOT NULL DEFAULT 0,
+                resolution_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (vessel, unit, month, status)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_rollup_month ON laporan_rollup(month)')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_laporan_rollup_insert
+            AFTER INSERT ON laporan_kerusakan
+            BEGIN
+                {_rollup_add_sql('NEW')}
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_laporan_rollup_delete
+            AFTER DELETE ON laporan_kerusakan
+            BEGIN
+                {_rollup_remove_sql('OLD')}
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_laporan_rollup_update
+            AFTER UPDATE OF vessel, unit, status, day_iso, issued_iso, closed_iso ON laporan_kerusakan
+            BEGIN
+                {_rollup_remove_sql('OLD')}
+                {_rollup_add_sql('NEW')}
+            END
+        ''')
+        
+        if is_new:
+            self._rebuild_laporan_rollup(c)
+    
+    def _rebuild_laporan_rollup(self, c):
+        c.execute('DELETE FROM laporan_rollup')
+        c.execute(f'''
+            INSERT INTO laporan_rollup ({', '.join(ROLLUP_KEY_COLUMNS)}, report_count, resolution_sum, resolution_count)
+            SELECT
+                vessel, COALESCE(unit, '') AS unit, substr(day_iso, 1, 7) AS month, COALESCE(status, '') AS status,
+                COUNT(*),
+                COALESCE(SUM({RESOLUTION_DAYS_SQL}), 0),
+                COUNT({RESOLUTION_DAYS_SQL})
+            FROM laporan_kerusakan
+            WHERE day_iso IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ''')
+    
+    def _create_fulltext_index(self, c):
+        """Index FTS5 (external content) atas teks laporan, dijaga trigger"""
+        is_new = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'laporan_fts'"
+        ).fetchone() is None
+        
+        c.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS laporan_fts USING fts5(
+                {', '.join(FTS_COLUMNS)},
+                content='laporan_kerusakan', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+        columns = ', '.join(FTS_COLUMNS)
+        new_values = ', '.join(f'NEW.{col}' for col in FTS_COLUMNS)
+        old_values = ', '.join(f'OLD.{col}' for col in FTS_COLUMNS)
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_laporan_fts_insert
+            AFTER INSERT ON laporan_kerusakan
+            BEGIN
+                INSERT INTO laporan_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_laporan_fts_delete
+            AFTER DELETE ON laporan_kerusakan
+            BEGIN
+                INSERT INTO laporan_fts (laporan_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_laporan_fts_update
+            AFTER UPDATE OF {columns} ON laporan_kerusakan
+            BEGIN
+                INSERT INTO laporan_fts (laporan_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+                INSERT INTO laporan_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+            END
+        ''')
+        
+        if is_new:
+            c.execute("INSERT INTO laporan_fts (laporan_fts) VALUES ('rebuild')")
+    
+    def _create_change_log(self, c):
+        """Changelog laporan (I/U/D) dijaga trigger + index updated_at, dipakai get_changes_since.
+        
+        Baris op 'D' adalah tombstone: laporan yang dihapus tetap terlihat oleh delta fetch.
+        """
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS laporan_changes (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                laporan_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_changes_changed_at ON laporan_changes(changed_at)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_updated_at ON laporan_kerusakan(updated_at)')
+        for event, op, row in (('INSERT', 'I', 'NEW'), ('UPDATE', 'U', 'NEW'), ('DELETE', 'D', 'OLD')):
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_laporan_changes_{event.lower()}
+                AFTER {event} ON laporan_kerusakan
+                BEGIN
+                    INSERT INTO laporan_changes (laporan_id, op) VALUES ({row}.id, '{op}');
+                END
+            ''')
+    
+    def _drop_changes_changed_at_index(self, c):
+        """get_changes_since hanya memakai version sebagai watermark (changed_at per detik)"""
+        c.execute('DROP INDEX IF EXISTS idx_changes_changed_at')
+    
+    def rebuild_vessel_summary(self):
+        """Hitung ulang vessel_summary dari tabel laporan (misal setelah edit manual di luar aplikasi)"""
+        with self.transaction() as conn:
+            self._rebuild_vessel_summary(conn.cursor())
+    
+    def rebuild_laporan_rollup(self):
+        """Hitung ulang laporan_rollup dari tabel laporan"""
+        with self.transaction() as conn:
+            self._rebuild_laporan_rollup(conn.cursor())
+    
+    # Connection pool
+    def _connect(self):
+        """Buka koneksi baru dengan profil PRAGMA pool"""
         # Render.com bisa pakai thread berbeda
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+        # isolation_level=None: autocommit, transaksi dikelola oleh transaction()
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        for name, value in CONNECTION_PRAGMAS:
+            conn.execute(f'PRAGMA {name}={value}')
+        conn.create_function('to_iso_date', 1, to_iso_date, deterministic=True)
+        conn.create_function('to_iso_date', 2, to_iso_date, deterministic=True)
+        conn.create_function('laporan_content_hash', 4, laporan_content_hash, deterministic=True)
+        return conn
     
-    # CRUD Operations
-    def get_all_laporan(self):
-        """Get semua laporan"""
-        conn = self.get_connection()
-        try:
-            df = pd.read_sql('''
-                SELECT * FROM laporan_kerusakan 
-                ORDER BY 
-                    CASE WHEN status = 'OPEN' THEN 1 ELSE 2 END,
-                    created_at DESC
-            ''', conn)
-            return df
-        finally:
-            conn.close()
+    def _release_dead_threads(self):
+        """Pindahkan koneksi milik thread yang sudah mati ke daftar idle (lock harus dipegang)"""
+        for thread in [t for t in self._connections if not t.is_alive()]:
+            conn = self._connections.pop(thread)
+            if conn.in_transaction:
+                conn.rollback()
+            if len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+            else:
+                conn.close()
     
-    def get_laporan_by_vessel(self, vessel):
-        """Get laporan by vessel"""
-        conn = self.get_connection()
-        try:
-            df = pd.read_sql('''
-                SELECT * FROM laporan_kerusakan 
-                WHERE vessel = ? 
-                ORDER BY 
-                    CASE WHEN status = 'OPEN' THEN 1 ELSE 2 END,
-                    created_at DESC
-            ''', conn, params=[vessel.upper()])
-            return df
-        finally:
-            conn.close()
+    def get_connection(self):
+        """Koneksi milik thread saat ini, dipakai ulang selama thread hidup.
+        
+        Jangan di-close oleh pemanggil; gunakan close_all() saat shutdown.
+        """
+        thread = threading.current_thread()
+        conn = self._connections.get(thread)
+        if conn is not None:
+            return conn
+        
+        with self._pool_lock:
+            self._release_dead_threads()
+            conn = self._idle.pop() if self._idle else self._connect()
+            self._connections[thread] = conn
+        return conn
     
-    def add_laporan(self, data):
-        """Tambah laporan baru"""
+    @contextmanager
+    def transaction(self):
+        """Context manager transaksi tulis: BEGIN IMMEDIATE, COMMIT atau ROLLBACK.
+        
+        Transaksi bersarang ikut ke transaksi terluar.
+        """
         conn = self.get_connection()
-        c = conn.cursor()
+        if conn.in_transaction:
+            yield conn
+            return
+        
+        conn.execute('BEGIN IMMEDIATE')
         try:
-            c.execute('''
-                INSERT INTO laporan_kerusakan 
-                (day, vessel, permasalahan, penyelesaian, unit, issued_date, closed_date, keterangan, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                data.get('Day', ''),
-                data.get('Vessel', '').upper(),
-                data.get('Permasalahan', ''),
-                data.get('Penyelesaian', ''),
-                data.get('Unit', ''),
-                data.get('Issued Date', ''),
-                data.get('Closed Date', ''),
-                data.get('Keterangan', ''),
-                data.get('Status', 'OPEN')
-            ))
-            conn.commit()
-            return c.lastrowid
-        finally:
-            conn.close()
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        self._bump_data_generation()
+    
+    def _bump_data_generation(self):
+        with self._pool_lock:
+            self._data_generation += 1
     
-    def update_laporan(self, laporan_id, data):
-        """Update laporan existing"""
+    def data_token(self):
+        """Token versi data untuk query_cache.
+        
+        Tuple (commit lewat transaction() di proses ini, version laporan_changes
+        terakhir, id vessel_registry terakhir). Dua nilai terakhir dibaca dari
+        database (lihat DATA_TOKEN_SQL), jadi commit dari proses lain (misal
+        import_laporan.py) terlihat sama oleh koneksi mana pun, termasuk koneksi
+        pool yang baru dipakai thread rerun berikutnya.
+        """
+        changes, vessels = self.get_connection().execute(DATA_TOKEN_SQL).fetchone()
+        return (self._data_generation, changes, vessels)
+    
+    def clear_cache(self):
+        """Kosongkan cache hasil query (tombol refresh)"""
+        self.query_cache.clear()
+    
+    @contextmanager
+    def _read_transaction(self):
+        """Transaksi baca (BEGIN DEFERRED): beberapa SELECT melihat versi data yang sama"""
         conn = self.get_connection()
-        c = conn.cursor()
+        if conn.in_transaction:
+            yield conn
+            return
+        
+        conn.execute('BEGIN')
         try:
-            c.execute('''
-                UPDATE laporan_kerusakan 
-                SET day=?, vessel=?, permasalahan=?, penyelesaian=?, unit=?, 
-                    issued_date=?, closed_date=?, keterangan=?, status=?, updated_at=CURRENT_TIMESTAMP
-                WHERE id=?
-            ''', (
-                data.get('Day', ''),
-                data.get('Vessel', '').upper(),
-                data.get('Permasalahan', ''),
-                data.get('Penyelesaian', ''),
-                data.get('Unit', ''),
-                data.get('Issued Date', ''),
-                data.get('Closed Date', ''),
-                data.get('Keterangan', ''),
-                data.get('Status', 'OPEN'),
-                laporan_id
-            ))
-            conn.commit()
-            return True
+            yield conn
         finally:
-            conn.close()
+            conn.execute('COMMIT')
+    
+    def close_all(self):
+        """Tutup semua koneksi pool"""
+        with self._pool_lock:
+            for conn in list(self._connections.values()) + self._idle:
+                conn.close()
+            self._connections.clear()
+            self._idle.clear()
+    
+    # Filter tanggal (SQL, memakai kolom ISO ter-index)
+    def _date_filter(self, date_column='day', year=None, date_from=None, date_to=None, use_index=True):
+        """Klausa WHERE + params untuk filter tahun / rentang tanggal (inklusif).
+        
+        date_from/date_to boleh date, datetime, atau string 'YYYY-MM-DD'.
+        use_index=False: kolom ISO ditulis sebagai +kolom supaya SQLite tidak memakai
+        index tanggal dan memilih index listing (tanpa sort), lihat
+        _get_laporan_by_vessel_filtered.
+        """
+        iso_column = DATE_COLUMNS[date_column] if use_index else f'+{DATE_COLUMNS[date_column]}'
+        clauses, params = [], []
+        if year is not None:
+            clauses.append(f'{iso_column} >= ? AND {iso_column} < ?')
+            params += [f'{int(year):04d}-01-01', f'{int(year) + 1:04d}-01-01']
+        if date_from is not None:
+            clauses.append(f'{iso_column} >= ?')
+            params.append(str(date_from)[:10])
+        if date_to is not None:
+            clauses.append(f'{iso_column} <= ?')
+            params.append(str(date_to)[:10])
+        return clauses, params
+    
+    @staticmethod
+    def _where(clauses):
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+    
+    def _laporan_values(self, data, date_format=None):
+        """Nilai kolom INSERT/UPDATE termasuk kolom tanggal ISO ternormalisasi.
+
+        Kolom ISO yang sudah dihitung vektor (day_iso/issued_iso/closed_iso dari
+        importer.normalize_laporan_frame) dipakai langsung tanpa parse ulang.
+        date_format: format tanggal yang dicoba lebih dulu (lihat to_iso_date).
+        """
+        day = data.get('Day', '')
+        issued_date = data.get('Issued Date', '')
+        closed_date = data.get('Closed Date', '')
+        # Normalisasi saat tulis, supaya pembaca tidak perlu upper/strip setiap load
+        vessel = (data.get('Vessel') or '').strip().upper()
+        unit = (data.get('Unit') or '').strip().upper()
+        status = (data.get('Status') or '').strip().upper() or 'OPEN'
+        return (
+            day,
+            vessel,
+            data.get('Permasalahan', ''),
+            data.get('Penyelesaian', ''),
+            unit,
+            issued_date,
+            closed_date,
+            data.get('Keterangan', ''),
+            status,
+            data['day_iso'] if 'day_iso' in data else to_iso_date(day, date_format),
+            data['issued_iso'] if 'issued_iso' in data else to_iso_date(issued_date, date_format),
+            data['closed_iso'] if 'closed_iso' in data else to_iso_date(closed_date, date_format),
+            1 if status == 'OPEN' else 0,
+            laporan_content_hash(vessel, unit, day, data.get('Permasalahan', '')),
+        )
+    
+    # CRUD Operations
+    def _load_laporan_snapshot(self):
+        """Seluruh laporan + watermark changelog, dibaca dalam satu transaksi baca"""
+        with self._read_transaction() as conn:
+            watermark = self._changes_watermark(conn)
+            frame = self.query_metrics.read_sql('''
+                SELECT * FROM laporan_kerusakan 
+                ORDER BY status_rank DESC, created_at DESC, id DESC
+            ''', conn)
+        self._prune_changes(watermark)
+        return compact_laporan_frame(frame), watermark
+    
+    def _get_snapshot_changes(self, watermark):
+        changes = self.get_changes_since(watermark)
+        if changes is None:
+            return None
+        rows, deleted_ids, new_watermark = changes
+        self._prune_changes(new_watermark)
+        return compact_laporan_frame(rows), deleted_ids, new_watermark
+    
+    def _prune_changes(self, watermark):
+        """Hapus changelog yang sudah tercakup snapshot proses ini (version <= watermark).
+
+        Satu DELETE autocommit di luar transaction(): isi laporan tidak berubah, jadi
+        data_token tidak perlu naik. Pembaca lain dengan watermark lebih lama
+        mendapat None dari get_changes_since dan memuat ulang penuh.
+        """
+        self.get_connection().execute('DELETE FROM laporan_changes WHERE version <= ?', (int(watermark),))
+    
+    def get_laporan_snapshot(self):
+        """Seluruh laporan (dtype ringkas, lihat compact_laporan_frame) dari snapshot bersama.
+        
+        Read-only: jangan diubah in-place.
+        """
+        return self.laporan_snapshot.frame(self.data_token())
+    
+    def get_all_laporan(self, year=None, date_column='day', date_from=None, date_to=None):
+        """Get semua laporan (dtype ringkas), opsional difilter tahun / rentang tanggal"""
+        if year is None and date_from is None and date_to is None:
+            return self.get_laporan_snapshot().copy()
+        return self._get_all_laporan_filtered(year, date_column, date_from, date_to)
+    
+    @cached_query
+    def _get_all_laporan_filtered(self, year, date_column, date_from, date_to):
+        clauses, params = self._date_filter(date_column, year, date_from, date_to)
+        return compact_laporan_frame(self.query_metrics.read_sql(f'''
+            SELECT * FROM laporan_kerusakan 
+            {self._where(clauses)}
+            ORDER BY status_rank DESC, created_at DESC, id DESC
+        ''', self.get_connection(), params=params))
+    
+    def get_laporan_by_vessel(self, vessel, year=None, date_column='day', date_from=None, date_to=None):
+        """Get laporan by vessel (dtype ringkas), opsional difilter tahun / rentang tanggal.
+        
+        Tanpa filter, diambil dari snapshot bersama (tidak query ke SQLite selama data tidak berubah).
+        """
+        if year is None and date_from is None and date_to is None:
+            return self.laporan_snapshot.rows_for(vessel.upper(), self.data_token())
+        return self._get_laporan_by_vessel_filtered(vessel, year, date_column, date_from, date_to)
+    
+    @cached_query
+    def _get_laporan_by_vessel_filtered(self, vessel, year, date_column, date_from, date_to):
+        # Baris satu kapal dibaca lewat idx_vessel_listing (sudah terurut) dan filter tanggal
+        # dicek per baris; lewat idx_vessel_*_iso SQLite harus sort ulang (TEMP B-TREE)
+        clauses, params = self._date_filter(date_column, year, date_from, date_to, use_index=False)
+        return compact_laporan_frame(self.query_metrics.read_sql(f'''
+            SELECT * FROM laporan_kerusakan 
+            {self._where(['vessel = ?'] + clauses)}
+            ORDER BY status_rank DESC, created_at DESC, id DESC
+        ''', self.get_connection(), params=[vessel.upper()] + params))
+    
+    @cached_query
+    def get_laporan_page(self, vessel=None, status=None, unit=None, date_from=None, date_to=None,
+                         columns=None, cursor=None, limit=50):
+        """Satu halaman laporan dengan keyset pagination.
+
+        Urutan sama dengan get_all_laporan (OPEN dulu, terbaru dulu). Biaya per
+        halaman tidak bergantung pada jumlah baris karena posisi dilanjutkan
+        dari cursor lewat index idx_listing / idx_vessel_listing, bukan OFFSET.
+
+        cursor: None untuk halaman pertama, atau next_cursor dari halaman sebelumnya.
+        Return (df, next_cursor); next_cursor None jika tidak ada halaman berikutnya.
+        """
+        columns = list(columns) if columns else list(LAPORAN_COLUMNS)
+        unknown = set(columns) - set(LAPORAN_COLUMNS)
+        if unknown:
+            raise ValueError(f"Kolom tidak dikenal: {', '.join(sorted(unknown))}")
+
+        clauses, params = self._date_filter('day', None, date_from, date_to)
+        if vessel is not None:
+            clauses.append('vessel = ?')
+            params.append(vessel.upper())
+        if status is not None:
+            # status_rank ikut difilter supaya prefix index tetap terpakai
+            clauses.append('status_rank = ? AND status = ?')
+            params += [1 if status == 'OPEN' else 0, status]
+        if unit is not None:
+            clauses.append('unit = ?')
+            params.append(unit)
+        if cursor is not None:
+            clauses.append('(status_rank, created_at, id) < (?, ?, ?)')
+            params += list(cursor)
+
+        key_columns = ['status_rank', 'created_at', 'id']
+        select_columns = columns + [col for col in key_columns if col not in columns]
+        df = self.query_metrics.read_sql(f'''
+            SELECT {', '.join(select_columns)} FROM laporan_kerusakan
+            {self._where(clauses)}
+            ORDER BY status_rank DESC, created_at DESC, id DESC
+            LIMIT ?
+        ''', self.get_connection(), params=params + [limit + 1])
+
+        next_cursor = None
+        if len(df) > limit:
+            df = df.iloc[:limit]
+            last = df.iloc[-1]
+            next_cursor = (int(last['status_rank']), last['created_at'], int(last['id']))
+        return df[columns].reset_index(drop=True), next_cursor
+
+    @cached_query
+    def search_laporan(self, query, vessel=None, status=None, limit=50):
+        """Full-text search (FTS5) di permasalahan / penyelesaian / keterangan.
+
+        Setiap kata diperlakukan sebagai prefix ("pom" cocok dengan "pompa") dan
+        semua kata harus ada. Hasil diurutkan bm25; kolom snippet berisi potongan
+        teks dengan kata yang cocok diapit SNIPPET_START / SNIPPET_END.
+        """
+        match = _fts_match_expression(query)
+        if not match:
+            return pd.DataFrame(columns=['id', 'vessel', 'unit', 'status', 'day', 'permasalahan', 'snippet', 'rank'])
+
+        clauses, params = ['laporan_fts MATCH ?'], [match]
+        if vessel is not None:
+            clauses.append('l.vessel = ?')
+            params.append(vessel.upper())
+        if status is not None:
+            clauses.append('l.status = ?')
+            params.append(status)
+        return self.query_metrics.read_sql(f'''
+            SELECT
+                l.id, l.vessel, l.unit, l.status, l.day, l.permasalahan,
+                snippet(laporan_fts, -1, ?, ?, '…', 16) AS snippet,
+                bm25(laporan_fts) AS rank
+            FROM laporan_fts
+            JOIN laporan_kerusakan AS l ON l.id = laporan_fts.rowid
+            {self._where(clauses)}
+            ORDER BY rank
+            LIMIT ?
+        ''', self.get_connection(), params=[SNIPPET_START, SNIPPET_END] + params + [limit])
+
+    @cached_query
+    def get_available_years(self, date_column='day', vessel=None):
+        """Daftar tahun (desc) yang memiliki laporan, dihitung dari index kolom ISO"""
+        iso_column = DATE_COLUMNS[date_column]
+        clauses, params = [f'{iso_column} IS NOT NULL'], []
+        if vessel is not None:
+            clauses.append('vessel = ?')
+            params.append(vessel.upper())
+        # Skip-scan lewat index: setiap langkah mencari tanggal terbesar sebelum tahun
+        # sebelumnya, jadi biayanya ~ jumlah tahun x log(jumlah baris), tanpa DISTINCT/sort
+        where = ' AND '.join(clauses)
+        rows = self.get_connection().execute(f'''
+            WITH RECURSIVE years(year) AS (
+                SELECT (SELECT substr({iso_column}, 1, 4) FROM laporan_kerusakan
+                        WHERE {where} ORDER BY {iso_column} DESC LIMIT 1)
+                UNION ALL
+                SELECT (SELECT substr({iso_column}, 1, 4) FROM laporan_kerusakan
+                        WHERE {where} AND {iso_column} < years.year ORDER BY {iso_column} DESC LIMIT 1)
+                FROM years WHERE year IS NOT NULL
+            )
+            SELECT CAST(year AS INTEGER) FROM years WHERE year IS NOT NULL
+        ''', params + params).fetchall()
+        return [row[0] for row in rows]
+    
+    def add_laporan(self, data, date_format=None):
+        """Tambah laporan baru.
+
+        date_format: format teks tanggal, misal DATE_FORMAT untuk input halaman aplikasi;
+        None = urutan DATE_FORMATS (M/D dulu, seperti CSV lama).
+        """
+        with self.transaction() as conn:
+            c = conn.execute(INSERT_SQL, self._laporan_values(data, date_format))
+        return c.lastrowid
+    
+    def update_laporan(self, laporan_id, data, date_format=None):
+        """Update laporan existing.
+
+        date_format seperti add_laporan; teks tanggal yang tidak berubah tetap memakai
+        tanggal ISO yang tersimpan.
+        sqlite3.IntegrityError jika isinya menjadi sama dengan laporan lain (content_hash).
+        Duplikat lama (content_hash NULL sejak _create_content_hash_index) tetap bisa
+        disimpan: hash-nya dibiarkan NULL selama masih bentrok dengan laporan lain.
+        """
+        stored_columns = ['content_hash', *DATE_COLUMNS, *DATE_COLUMNS.values()]
+        with self.transaction() as conn:
+            stored = conn.execute(
+                f"SELECT {', '.join(stored_columns)} FROM laporan_kerusakan WHERE id = ?", (laporan_id,)
+            ).fetchone()
+            if stored is not None:
+                stored = dict(zip(stored_columns, stored))
+                data = dict(data)
+                # Teks tanggal yang tidak diubah (misal M/D/YYYY CSV lama) tidak di-parse ulang
+                for key, column in DATE_FIELDS.items():
+                    iso_column = DATE_COLUMNS[column]
+                    if iso_column not in data and key in data and data[key] == stored[column]:
+                        data[iso_column] = stored[iso_column]
+            values = self._laporan_values(data, date_format)
+            if stored is not None and stored['content_hash'] is None and conn.execute(
+                'SELECT 1 FROM laporan_kerusakan WHERE content_hash = ? AND id != ?', (values[-1], laporan_id)
+            ).fetchone():
+                values = values[:-1] + (None,)
+            conn.execute(UPDATE_SQL, values + (laporan_id,))
+        return True
+    
+    def add_laporan_many(self, rows, chunk_size=1000, first_row=1, row_numbers=None,
+                         on_conflict='update', on_chunk=None):
+        """Tambah banyak laporan sekaligus (executemany, satu transaksi per chunk).
+
+        Idempoten lewat content_hash: laporan yang sudah ada tidak diinsert lagi.
+        on_conflict='update' memperbarui kolom status/penyelesaian/tanggal jika berbeda,
+        on_conflict='skip' membiarkan laporan lama apa adanya.
+
+        rows: iterable dict dengan key yang sama seperti add_laporan.
+        first_row: nomor baris untuk elemen pertama (dipakai di pesan error).
+        row_numbers: opsional, nomor baris asli per elemen rows (menggantikan first_row).
+        on_chunk(rows_done): dipanggil sekali setelah setiap chunk selesai.
+        Chunk yang gagal di-rollback utuh dan dicatat; chunk berikutnya tetap jalan.
+        Return dict: inserted, updated, skipped, errors.
+        """
+        result = {'inserted': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+        rows_done = 0
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            if row_numbers is not None:
+                start, end = row_numbers[rows_done], row_numbers[rows_done + len(chunk) - 1]
+            else:
+                start, end = first_row + rows_done, first_row + rows_done + len(chunk) - 1
+            try:
+                values = [self._laporan_values(row) for row in chunk]
+                hashes = [value[-1] for value in values]
+                with self.transaction() as conn:
+                    # Satu lookup index per baris untuk memisahkan baris baru dan lama
+                    existing = {row[0] for row in conn.execute(
+                        'SELECT content_hash FROM laporan_kerusakan '
+                        'WHERE content_hash IN (SELECT value FROM json_each(?))',
+                        (json.dumps(hashes),)
+                    )}
+                    new_values, seen = [], set(existing)
+                    for value, content_hash in zip(values, hashes):
+                        if content_hash not in seen:
+                            seen.add(content_hash)
+                            new_values.append(value)
+                    inserted = conn.executemany(INSERT_IGNORE_SQL, new_values).rowcount if new_values else 0
+
+                    updated = 0
+                    if on_conflict == 'update' and existing:
+                        old_values = [value for value in values if value[-1] in existing]
+                        updated = conn.executemany(UPSERT_SQL, old_values).rowcount
+                result['inserted'] += inserted
+                result['updated'] += updated
+                result['skipped'] += len(chunk) - inserted - updated
+            except Exception as e:
+                result['errors'].append(f"Baris {start}-{end}: {e}")
+
+            rows_done += len(chunk)
+            if on_chunk is not None:
+                on_chunk(rows_done)
+        return result
+
+    def is_file_imported(self, file_hash):
+        """True jika file dengan hash konten ini sudah pernah diimport"""
+        return self.get_connection().execute(
+            'SELECT 1 FROM import_log WHERE file_hash = ?', (file_hash,)
+        ).fetchone() is not None
+
+    def record_file_import(self, file_hash, file_name, rows_read, rows_inserted):
+        """Catat file yang selesai diimport (dipakai agar import ulang melewatinya)"""
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO import_log (file_hash, file_name, rows_read, rows_inserted)
+                VALUES (?, ?, ?, ?)
+            ''', (file_hash, file_name, rows_read, rows_inserted))
+
+    def add_vessel(self, vessel):
+        """Daftarkan kode kapal ke vessel_registry; False jika sudah terdaftar"""
+        vessel = (vessel or '').strip().upper()
+        if not vessel:
+            raise ValueError('Kode kapal wajib diisi')
+        with self.transaction() as conn:
+            c = conn.execute('INSERT OR IGNORE INTO vessel_registry (vessel) VALUES (?)', (vessel,))
+        return c.rowcount == 1
+
+    @cached_query
+    def get_vessel_registry(self):
+        """Semua kode kapal terdaftar (urut)"""
+        rows = self.get_connection().execute('SELECT vessel FROM vessel_registry ORDER BY vessel').fetchall()
+        return [row[0] for row in rows]
+
+    def search_vessels(self, query):
+        """Cari kode kapal lewat index di memori: (daftar kode, fuzzy), lihat VesselSearchIndex.search.
+
+        Tidak membaca laporan: biaya per ketikan tergantung panjang query dan jumlah
+        hasil, bukan ukuran armada atau riwayat laporan.
+        """
+        self._refresh_vessel_index()
+        return self.vessel_index.search(query)
+
+    def _refresh_vessel_index(self):
+        """Bangun ulang vessel_index jika vessel_registry berubah sejak build terakhir.
+
+        Dicek hanya saat data_token berubah (ada commit); commit yang tidak menambah
+        kapal cukup satu query COUNT/MAX tanpa build ulang.
+        """
+        token = self.data_token()
+        if token == self._vessel_index_token:
+            return
+        with self._vessel_index_lock:
+            if token == self._vessel_index_token:
+                return
+            conn = self.get_connection()
+            signature = conn.execute('SELECT COUNT(*), MAX(id) FROM vessel_registry').fetchone()
+            if signature != self._vessel_index_signature:
+                self.vessel_index.build(row[0] for row in conn.execute('SELECT vessel FROM vessel_registry'))
+                self._vessel_index_signature = signature
+            self._vessel_index_token = token
+
+    @staticmethod
+    def _changes_watermark(conn):
+        """Version changelog terakhir (sqlite_sequence, tetap benar setelah changelog dipangkas)"""
+        return conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'laporan_changes'"
+        ).fetchone()[0]
+
+    def get_changes_since(self, watermark=0):
+        """Delta laporan sejak watermark untuk menambal DataFrame/cache tanpa memuat ulang semua.
+        
+        watermark: version changelog (int), misal new_watermark dari panggilan sebelumnya.
+        Return (rows, deleted_ids, new_watermark): rows = isi terkini laporan yang
+        ditambah/diubah (urut id), deleted_ids = id yang sudah dihapus (tombstone),
+        new_watermark = version terakhir yang sudah tercakup. None jika sebagian
+        changelog sesudah watermark sudah dipangkas (_prune_changes): muat ulang penuh.
+        """
+        watermark = int(watermark)
+        with self._read_transaction() as conn:
+            new_watermark = self._changes_watermark(conn)
+            # version berurutan tanpa celah selain yang dipangkas dari bawah
+            oldest = conn.execute('SELECT MIN(version) FROM laporan_changes').fetchone()[0]
+            if watermark + 1 < (new_watermark + 1 if oldest is None else oldest):
+                return None
+            rows = self.query_metrics.read_sql('''
+                SELECT * FROM laporan_kerusakan
+                WHERE id IN (SELECT laporan_id FROM laporan_changes WHERE version > ?)
+                ORDER BY id
+            ''', conn, params=[watermark])
+            # id AUTOINCREMENT tidak pernah dipakai ulang: paling banyak satu tombstone per id
+            deleted_ids = [row[0] for row in conn.execute('''
+                SELECT laporan_id FROM laporan_changes
+                WHERE version > ? AND op = 'D'
+                  AND laporan_id NOT IN (SELECT id FROM laporan_kerusakan)
+            ''', [watermark])]
+        return rows, deleted_ids, new_watermark
     
     def delete_laporan(self, laporan_id):
         """Hapus laporan"""
-        conn = self.get_connection()
-        c = conn.cursor()
-        try:
-            c.execute('DELETE FROM laporan_kerusakan WHERE id = ?', (laporan_id,))
-            conn.commit()
-            return True
-        finally:
-            conn.close()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM laporan_kerusakan WHERE id = ?', (laporan_id,))
+        return True
     
+    @cached_query
     def get_stats(self):
         """Get statistics untuk dashboard"""
-        conn = self.get_connection()
-        try:
-            query = '''
-                SELECT 
-                    vessel,
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'OPEN' THEN 1 ELSE 0 END) as open_count,
-                    SUM(CASE WHEN status = 'CLOSED' THEN 1 ELSE 0 END) as closed_count,
-                    MAX(created_at) as last_activity
-                FROM laporan_kerusakan 
-                GROUP BY vessel
-                ORDER BY vessel
-            '''
-            return pd.read_sql(query, conn)
-        finally:
-            conn.close()
+        query = '''
+            SELECT 
+                vessel,
+                COUNT(*) as total,
+                SUM(CASE WHEN status = 'OPEN' THEN 1 ELSE 0 END) as open_count,
+                SUM(CASE WHEN status = 'CLOSED' THEN 1 ELSE 0 END) as closed_count,
+                MAX(created_at) as last_activity,
+                MAX(issued_iso) as last_issued
+            FROM laporan_kerusakan 
+            GROUP BY vessel
+            ORDER BY vessel
+        '''
+        return self.query_metrics.read_sql(query, self.get_connection())
     
-    def get_dashboard_data(self):
-        """Get data khusus untuk dashboard analytics"""
-        conn = self.get_connection()
-        try:
-            return pd.read_sql('''
-                SELECT 
-                    id, day, vessel, permasalahan, penyelesaian, unit,
-                    issued_date, closed_date, keterangan, status, created_at
-                FROM laporan_kerusakan 
-                ORDER BY created_at DESC
-            ''', conn)
-        finally:
-            conn.close()
+    @cached_query
+    def get_vessel_summary(self, year=None):
+        """Jumlah OPEN/CLOSED per kapal dari vessel_summary (tanpa membaca tabel laporan).
+
+        year: filter tahun Issued Date, None untuk semua tahun.
+        last_issued selalu tanggal issued terakhir kapal di semua tahun.
+        """
+        clauses, params = [], []
+        if year is not None:
+            clauses.append('year = ?')
+            params.append(int(year))
+        return self.query_metrics.read_sql(f'''
+            SELECT
+                vessel,
+                SUM(total_count) as total_count,
+                SUM(open_count) as open_count,
+                SUM(closed_count) as closed_count,
+                (SELECT MAX(last_issued) FROM vessel_summary AS all_years
+                 WHERE all_years.vessel = vessel_summary.vessel) as last_issued
+            FROM vessel_summary
+            {self._where(clauses)}
+            GROUP BY vessel
+            ORDER BY vessel
+        ''', self.get_connection(), params=params)
+
+    @cached_query
+    def get_vessel_cards(self, year=None, vessels=None, status=None, sort='vessel', offset=0, limit=30):
+        """Satu halaman kartu kapal (vessel_registry + vessel_summary) dengan filter & urutan di SQL.
+
+        Tanpa filter tahun/status semua kapal terdaftar ikut, termasuk yang belum punya
+        laporan (0/0). Dengan filter, hanya kapal yang punya laporan cocok; kecuali
+        status='empty' yang justru memilih kapal tanpa laporan (di tahun itu).
+        vessels: daftar kode hasil search_vessels, None untuk semua kapal;
+        status: kunci VESSEL_CARD_STATUS_FILTERS atau None; sort: kunci VESSEL_CARD_SORTS.
+        Mengembalikan (DataFrame vessel/open_count/closed_count/last_issued, jumlah kapal cocok).
+        """
+        join_params, clauses, params = [], [], []
+        year_join, having = '', ''
+        if (year is not None or status) and status != 'empty':
+            # Kapal registry tanpa baris vessel_summary yang cocok tidak ikut
+            having = 'HAVING COUNT(summary.vessel) > 0'
+        if year is not None:
+            year_join = 'AND summary.year = ?'
+            join_params.append(int(year))
+        if vessels is not None:
+            clauses.append('registry.vessel IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps(list(vessels)))
+        params = join_params + params
+        status_clause = VESSEL_CARD_STATUS_FILTERS[status] if status else '1'
+        cards = f'''
+            WITH cards AS (
+                SELECT
+                    registry.vessel,
+                    COALESCE(SUM(summary.open_count), 0) as open_count,
+                    COALESCE(SUM(summary.closed_count), 0) as closed_count,
+                    (SELECT MAX(last_issued) FROM vessel_summary AS all_years
+                     WHERE all_years.vessel = registry.vessel) as last_issued
+                FROM vessel_registry AS registry
+                LEFT JOIN vessel_summary AS summary
+                    ON summary.vessel = registry.vessel {year_join}
+                {self._where(clauses)}
+                GROUP BY registry.vessel
+                {having}
+            )
+        '''
+        con = self.get_connection()
+        matched = con.execute(
+            f'{cards} SELECT COUNT(*) FROM cards WHERE {status_clause}', params
+        ).fetchone()[0]
+        page = self.query_metrics.read_sql(f'''
+            {cards}
+            SELECT vessel, open_count, closed_count, last_issued
+            FROM cards
+            WHERE {status_clause}
+            ORDER BY {VESSEL_CARD_SORTS[sort]}
+            LIMIT ? OFFSET ?
+        ''', con, params=params + [int(limit), int(offset)])
+        return page, matched
+
+    @cached_query
+    def get_laporan_totals(self, year=None):
+        """Total laporan, jumlah kapal, OPEN, dan CLOSED (agregat dari vessel_summary)
+
+        year: filter tahun Issued Date, None untuk semua tahun.
+        """
+        clauses, params = [], []
+        if year is not None:
+            clauses.append('year = ?')
+            params.append(int(year))
+        total, vessels, open_count, closed_count = self.get_connection().execute(f'''
+            SELECT
+                COALESCE(SUM(total_count), 0),
+                COUNT(DISTINCT vessel),
+                COALESCE(SUM(open_count), 0),
+                COALESCE(SUM(closed_count), 0)
+            FROM vessel_summary
+            {self._where(clauses)}
+        ''', params).fetchone()
+        return {'total': total, 'vessels': vessels, 'open': open_count, 'closed': closed_count}
+
+    @cached_query
+    def get_summary_years(self):
+        """Daftar tahun Issued Date (desc) dari vessel_summary"""
+        rows = self.get_connection().execute(
+            'SELECT DISTINCT year FROM vessel_summary WHERE year > 0 ORDER BY year DESC'
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    @cached_query
+    def get_dashboard_data(self,year=None, date_from=None, date_to=None):
+        """Get data khusus untuk dashboard analytics.
+        
+        resolution_days (MTTR) dihitung di SQL: hari kalender inklusif (+1)
+        antara issued_iso dan closed_iso, NULL jika tidak valid.
+        """
+        clauses, params = self._date_filter('day', year, date_from, date_to)
+        return self.query_metrics.read_sql(f'''
+            SELECT 
+                id, day, vessel, permasalahan, penyelesaian, unit,
+                issued_date, closed_date, keterangan, status, created_at,
+                day_iso, issued_iso, closed_iso,
+                {RESOLUTION_DAYS_SQL} AS resolution_days
+            FROM laporan_kerusakan 
+            {self._where(clauses)}
+            ORDER BY created_at DESC
+        ''', self.get_connection(), params=params)
+
+    # Agregasi dashboard analisis: setiap panel dihitung di SQL, hasilnya kecil.
+    # Panel hitungan/tren/MTTR membaca laporan_rollup (biaya ~ bulan x unit, bukan jumlah laporan).
+    def _dashboard_filter(self, year=None, vessels=None):
+        """Klausa WHERE dashboard: tanggal kejadian valid, tahun, dan himpunan kapal.
+        
+        vessels None = semua kapal; list kosong = tidak ada kapal (hasil kosong).
+        """
+        clauses, params = self._date_filter('day', year)
+        clauses.insert(0, 'day_iso IS NOT NULL')
+        if vessels is not None:
+            clauses.append('vessel IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([vessel.upper() for vessel in vessels]))
+        return clauses, params
+
+    def _rollup_filter(self, year=None, vessels=None):
+        """Seperti _dashboard_filter, untuk laporan_rollup (tahun = prefix kolom month)"""
+        clauses, params = [], []
+        if year is not None:
+            clauses.append('month >= ? AND month < ?')
+            params += [f'{int(year):04d}-01', f'{int(year) + 1:04d}-01']
+        if vessels is not None:
+            clauses.append('vessel IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([vessel.upper() for vessel in vessels]))
+        return clauses, params
+
+    @cached_query
+    def get_dashboard_vessels(self):
+        """Daftar kapal (urut nama) yang memiliki laporan dengan tanggal kejadian valid"""
+        rows = self.get_connection().execute('''
+            SELECT DISTINCT vessel FROM laporan_kerusakan
+            WHERE day_iso IS NOT NULL
+            ORDER BY vessel
+        ''').fetchall()
+        return [row[0] for row in rows]
+
+    @cached_query
+    def get_dashboard_kpis(self, year=None, vessels=None):
+        """Total, OPEN, CLOSED, dan rata-rata MTTR (None jika tidak ada laporan CLOSED valid)"""
+        clauses, params = self._rollup_filter(year, vessels)
+        total, open_count, closed_count, avg_resolution = self.get_connection().execute(f'''
+            SELECT
+                COALESCE(SUM(report_count), 0),
+                COALESCE(SUM(CASE WHEN status = 'OPEN' THEN report_count END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' THEN report_count END), 0),
+                CAST(SUM(CASE WHEN status = 'CLOSED' THEN resolution_sum END) AS REAL)
+                    / NULLIF(SUM(CASE WHEN status = 'CLOSED' THEN resolution_count END), 0)
+            FROM laporan_rollup
+            {self._where(clauses)}
+        ''', params).fetchone()
+        return {'total': total, 'open': open_count, 'closed': closed_count, 'avg_resolution_days': avg_resolution}
+
+    @cached_query
+    def get_unit_counts(self, year=None, vessels=None, limit=None):
+        """Jumlah laporan per unit (terbanyak dulu): kolom unit, count"""
+        clauses, params = self._rollup_filter(year, vessels)
+        return self.query_metrics.read_sql(f'''
+            SELECT unit, SUM(report_count) AS count
+            FROM laporan_rollup
+            {self._where(clauses)}
+            GROUP BY unit
+            ORDER BY count DESC, unit
+            LIMIT ?
+        ''', self.get_connection(), params=params + [-1 if limit is None else limit])
+
+    @cached_query
+    def get_status_counts_for_units(self, units, year=None, vessels=None):
+        """Jumlah laporan per status, hanya untuk unit-unit tertentu: kolom status, count"""
+        clauses, params = self._rollup_filter(year, vessels)
+        clauses.append('unit IN (SELECT value FROM json_each(?))')
+        params.append(json.dumps(list(units)))
+        return self.query_metrics.read_sql(f'''
+            SELECT status, SUM(report_count) AS count
+            FROM laporan_rollup
+            {self._where(clauses)}
+            GROUP BY status
+            ORDER BY count DESC, status
+        ''', self.get_connection(), params=params)
+
+    @cached_query
+    def get_vessel_counts(self, year=None, vessels=None, status=None):
+        """Jumlah laporan per kapal (terbanyak dulu), opsional hanya satu status: kolom vessel, count"""
+        clauses, params = self._rollup_filter(year, vessels)
+        if status is not None:
+            clauses.append('status = ?')
+            params.append(status)
+        return self.query_metrics.read_sql(f'''
+            SELECT vessel, SUM(report_count) AS count
+            FROM laporan_rollup
+            {self._where(clauses)}
+            GROUP BY vessel
+            ORDER BY count DESC, vessel
+        ''', self.get_connection(), params=params)
+
+    @cached_query
+    def get_monthly_trend(self, year=None, vessels=None):
+        """Jumlah laporan per bulan kejadian dan status: kolom month ('YYYY-MM'), status, count"""
+        clauses, params = self._rollup_filter(year, vessels)
+        return self.query_metrics.read_sql(f'''
+            SELECT month, status, SUM(report_count) AS count
+            FROM laporan_rollup
+            {self._where(clauses)}
+            GROUP BY month, status
+            ORDER BY month, status
+        ''', self.get_connection(), params=params)
+
+    def get_oldest_open(self, year=None, vessels=None, limit=15):
+        """Laporan OPEN dengan tanggal kejadian paling lama.
+        
+        duration_days = jumlah hari penuh sejak day_iso sampai sekarang (waktu lokal);
+        tidak di-cache karena hasilnya bergantung pada waktu sekarang.
+        """
+        clauses, params = self._dashboard_filter(year, vessels)
+        clauses.append("status = 'OPEN'")
+        return self.query_metrics.read_sql(f'''
+            SELECT
+                id, vessel, permasalahan, day_iso,
+                CAST(julianday('now', 'localtime') - julianday(day_iso) AS INTEGER) AS duration_days
+            FROM laporan_kerusakan
+            {self._where(clauses)}
+            ORDER BY day_iso, id
+            LIMIT ?
+        ''', self.get_connection(), params=params + [limit])
+
+    @cached_query
+    def get_mttr_by_unit(self, year=None, vessels=None):
+        """MTTR per unit yang punya laporan CLOSED (tercepat dulu).
+        
+        Kolom unit, mttr_days (rata-rata laporan CLOSED, NULL jika tanggalnya tidak valid),
+        total_count (semua laporan unit tersebut).
+        """
+        clauses, params = self._rollup_filter(year, vessels)
+        return self.query_metrics.read_sql(f'''
+            SELECT
+                unit,
+                CAST(SUM(CASE WHEN status = 'CLOSED' THEN resolution_sum END) AS REAL)
+                    / NULLIF(SUM(CASE WHEN status = 'CLOSED' THEN resolution_count END), 0) AS mttr_days,
+                SUM(report_count) AS total_count
+            FROM laporan_rollup
+            {self._where(clauses)}
+            GROUP BY unit
+            HAVING SUM(CASE WHEN status = 'CLOSED' THEN report_count END) > 0
+            ORDER BY mttr_days IS NULL, mttr_days, unit
+        ''', self.get_connection(), params=params)
+
+class LazyDatabaseManager:
+    """Proxy DatabaseManager yang baru dibuat saat atribut pertama kali dipakai.
+    
+    Import database.py (setiap page script) tidak membuka koneksi atau mengecek schema.
+    """
+    def __init__(self, db_path=None):
+        self._db_path = db_path
+        self._instance = None
+        self._lock = threading.Lock()
+    
+    def _get_instance(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    path = self._db_path or os.environ.get('LAPORAN_DB_PATH', 'data/laporan_kerusakan.db')
+                    self._instance = DatabaseManager(path)
+        return self._instance
+    
+    def __getattr__(self, name):
+        return getattr(self._get_instance(), name)
 
-# Global instance
-db = DatabaseManager()
+# Global instance (lazy); path bisa diganti lewat env LAPORAN_DB_PATH
+db = LazyDatabaseManager()
@@ -0,0 +1,91 @@
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Format tampilan/input di aplikasi
+DATE_FORMAT = '%d/%m/%Y'
+# Format penyimpanan kolom tanggal ternormalisasi (day_iso, issued_iso, closed_iso)
+ISO_FORMAT = '%Y-%m-%d'
+
+# Urutan percobaan format sama dengan parse_date di halaman-halaman lama:
+# data hasil migrasi CSV memakai M/D/YYYY, input aplikasi memakai DD/MM/YYYY.
+# Tanggal yang ditulis aplikasi di-parse dengan first_format=DATE_FORMAT (lihat to_iso_date).
+DATE_FORMATS = ['%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%y-%m-%d', '%Y/%m/%d']
+
+# Teks yang dianggap kosong (bukan tanggal salah format), misal hasil str(NaN) dari CSV lama
+BLANK_VALUES = {'', 'nan', 'NaN', 'NaT', 'None'}
+
+
+@lru_cache(maxsize=65536)
+def _parse_date_text(text, first_format=None):
+    formats = DATE_FORMATS if first_format is None else [first_format] + DATE_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return pd.NaT
+
+
+def parse_date(date_str, first_format=None):
+    """Parse satu nilai tanggal teks, return datetime atau pd.NaT (hasil di-memo per teks).
+
+    first_format: format yang dicoba sebelum DATE_FORMATS, misal DATE_FORMAT untuk
+    tanggal yang ditulis aplikasi ('05/03/2025' = 5 Maret, bukan 3 Mei).
+    """
+    if date_str is None or pd.isna(date_str) or str(date_str).strip() == '':
+        return pd.NaT
+    return _parse_date_text(str(date_str).strip(), first_format)
+
+
+def to_iso_date(date_str, first_format=None):
+    """Normalisasi tanggal teks ke 'YYYY-MM-DD', None jika tidak bisa di-parse (lihat parse_date)"""
+    parsed = parse_date(date_str, first_format)
+    if pd.isna(parsed):
+        return None
+    return parsed.strftime(ISO_FORMAT)
+
+
+def parse_date_series(series):
+    """Versi vektor parse_date untuk satu kolom.
+
+    Setiap teks unik hanya di-parse sekali. Format dicoba berurutan dengan
+    pd.to_datetime(format=...) hanya pada nilai yang belum berhasil di-parse,
+    sehingga hasilnya sama dengan parse_date per sel.
+    Return (Series datetime64, index baris berisi teks yang bukan tanggal valid).
+    """
+    text = series.astype('string').str.strip()
+    codes, uniques = pd.factorize(text)
+    uniques = pd.Series(uniques.astype(object))
+    blank = uniques.isin(BLANK_VALUES).to_numpy()
+
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[us]')
+    remaining = pd.Series(~blank, index=uniques.index)
+    for fmt in DATE_FORMATS:
+        if not remaining.any():
+            break
+        attempt = pd.to_datetime(uniques[remaining], format=fmt, errors='coerce')
+        matched = attempt.index[attempt.notna()]
+        parsed[matched] = attempt[matched]
+        remaining[matched] = False
+
+    # Kode -1 (NA) menunjuk ke slot NaT tambahan di akhir
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'us'))
+    result = pd.Series(values[codes], index=series.index)
+    invalid = series.index[remaining.to_numpy()[codes] & (codes >= 0)]
+    return result, invalid
+
+
+def to_iso_date_series(series):
+    """Versi vektor to_iso_date: Series teks 'YYYY-MM-DD' (None jika tidak valid)"""
+    parsed, _ = parse_date_series(series)
+    return parsed.dt.strftime(ISO_FORMAT).astype(object).where(parsed.notna(), None)
+
+
+def iso_to_display(iso_str):
+    """'YYYY-MM-DD' -> 'DD/MM/YYYY' untuk tampilan, 'N/A' jika kosong"""
+    if not iso_str or pd.isna(iso_str):
+        return 'N/A'
+    return datetime.strptime(iso_str, ISO_FORMAT).strftime(DATE_FORMAT)
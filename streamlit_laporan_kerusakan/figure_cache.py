@@ -0,0 +1,33 @@
+import plotly.io as pio
+
+from query_cache import QueryCache
+
+# Batas cache figure per proses (JSON satu figure dashboard ~10-100 KB)
+FIGURE_CACHE_ENTRIES = 128
+FIGURE_CACHE_BYTES = 32 * 1024 * 1024
+
+# Cache JSON figure Plotly, dibagi semua sesi dalam proses ini
+figure_cache = QueryCache(max_entries=FIGURE_CACHE_ENTRIES, max_bytes=FIGURE_CACHE_BYTES)
+
+
+def figure_key(panel, year=None, vessels=None):
+    """Key cache: (panel, tahun, tuple kapal terurut); vessels None = semua kapal"""
+    return (panel, year, None if vessels is None else tuple(sorted(vessels)))
+
+
+def cached_figure(panel, year, vessels, token, build):
+    """Figure Plotly untuk kombinasi filter pada versi data token (LRU, lihat QueryCache).
+
+    build() -> go.Figure, atau None jika tidak ada data, hanya dipanggil saat miss.
+    Yang disimpan adalah JSON figure, jadi sesi lain dengan filter yang sama
+    tidak menjalankan query maupun plotly.express lagi.
+    """
+    figure_json = figure_cache.get_or_load(
+        figure_key(panel, year, vessels), token,
+        lambda: _to_json(build())
+    )
+    return None if figure_json is None else pio.from_json(figure_json)
+
+
+def _to_json(figure):
+    return None if figure is None else pio.to_json(figure, validate=False)
@@ -0,0 +1,190 @@
+"""Import massal laporan kerusakan dari CSV/XLSX tanpa Streamlit.
+
+File di-parse paralel di process pool; setiap chunk hasil parse dikirim lewat
+antrian terbatas ke satu proses penulis (proses utama) yang menyimpannya ke
+SQLite. File yang sudah pernah diimport (hash konten sama) dilewati dan
+setiap laporan di-dedup lewat content_hash, jadi perintah yang sama aman
+dijalankan ulang, misalnya dari cron untuk export armada harian:
+
+    python import_laporan.py /data/export_armada/ --db data/laporan_kerusakan.db
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import queue as queue_module
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from database import DatabaseManager
+from importer import (CSV_EXTENSIONS, EXCEL_EXTENSIONS, import_chunks, iter_file_chunks,
+                      new_import_result)
+
+# Chunk yang menunggu ditulis per worker; membatasi memori saat penulis lebih lambat
+QUEUE_CHUNKS_PER_WORKER = 2
+# Interval cek worker yang mati (BrokenProcessPool/OOM) saat antrian kosong
+QUEUE_POLL_SECONDS = 1.0
+
+
+def collect_files(paths):
+    """Kumpulkan file CSV/XLSX dari daftar file atau folder (tidak rekursif)"""
+    extensions = CSV_EXTENSIONS + EXCEL_EXTENSIONS
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(extensions)
+            )
+        elif path.lower().endswith(extensions):
+            files.append(path)
+        else:
+            print(f"⚠️  Dilewati (bukan CSV/XLSX): {path}")
+    return files
+
+
+def file_hash(path):
+    """SHA-256 isi file, dipakai sebagai kunci import_log"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_file_worker(path, chunksize, queue):
+    """Dijalankan di process pool: parse + normalisasi file, kirim chunk ke penulis"""
+    try:
+        for first_row, normalized in iter_file_chunks(path, chunksize):
+            queue.put(('chunk', path, first_row, normalized))
+        queue.put(('done', path, None, None))
+    except Exception as e:
+        queue.put(('error', path, None, str(e)))
+
+
+def run_import(db, files, workers, chunksize, force=False, on_conflict='update'):
+    """Parse paralel di process pool, tulis serial di proses ini.
+
+    Return (hasil per file, daftar file yang gagal di-parse atau belum tersimpan utuh).
+    """
+    pending = {}
+    for path in files:
+        digest = file_hash(path)
+        if not force and db.is_file_imported(digest):
+            print(f"⏭️  Sudah pernah diimport: {path}")
+            continue
+        pending[path] = digest
+    if not pending:
+        return {}, []
+
+    results = {path: new_import_result() for path in pending}
+    failed_files = []
+
+    with multiprocessing.Manager() as manager:
+        queue = manager.Queue(maxsize=workers * QUEUE_CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            started = {}
+            futures = {}
+            for path in pending:
+                started[path] = time.perf_counter()
+                futures[path] = pool.submit(parse_file_worker, path, chunksize, queue)
+
+            unfinished = set(pending)
+
+            def handle(message):
+                """Simpan satu chunk, atau tutup file saat pesan 'done'/'error'"""
+                kind, path, first_row, payload = message
+                result = results[path]
+                if kind == 'chunk':
+                    import_chunks(db, [(first_row, payload)], result=result, on_conflict=on_conflict)
+                    return
+
+                unfinished.discard(path)
+                if kind == 'error':
+                    # Tidak dicatat di import_log, jadi file ini dicoba lagi pada run berikutnya
+                    failed_files.append(path)
+                    print(f"❌ {path}: {payload} ({result['inserted']} baris sempat tersimpan)")
+                    return
+
+                elapsed = time.perf_counter() - started[path]
+                if result['failed']:
+                    # Ada chunk yang di-rollback: jangan dicatat supaya baris gagal diimport ulang
+                    failed_files.append(path)
+                    status = '⚠️ '
+                else:
+                    db.record_file_import(pending[path], os.path.basename(path), result['rows'], result['inserted'])
+                    status = '✅'
+                print(f"{status} {path}: {result['rows']} baris dalam {elapsed:.1f} detik "
+                      f"({result['rows'] / max(elapsed, 1e-9):,.0f} baris/detik): {result['inserted']} baru, "
+                      f"{result['updated']} diperbarui, {result['skipped']} dilewati (duplikat), "
+                      f"{result['invalid'] + result['failed']} gagal, "
+                      f"{result['unparsed_dates']} tanggal tidak dikenali")
+                if result['failed']:
+                    print(f"     {result['failed']} baris gagal disimpan; file tidak dicatat di import_log "
+                          f"dan akan diimport ulang pada run berikutnya")
+                for error in result['errors'][:5]:
+                    print(f"     {error}")
+
+            while unfinished:
+                try:
+                    message = queue.get(timeout=QUEUE_POLL_SECONDS)
+                except queue_module.Empty:
+                    pass
+                else:
+                    handle(message)
+                    continue
+                # Worker mengirim semua pesannya (put sinkron) sebelum future-nya selesai:
+                # ambil dulu daftar future yang selesai, lalu habiskan antrian. File yang
+                # masih terbuka setelah itu berarti worker-nya mati sebelum sempat mengirim.
+                finished = [path for path in unfinished if futures[path].done()]
+                while True:
+                    try:
+                        handle(queue.get_nowait())
+                    except queue_module.Empty:
+                        break
+                for path in finished:
+                    error = futures[path].exception()
+                    if path not in unfinished or error is None:
+                        continue
+                    unfinished.discard(path)
+                    failed_files.append(path)
+                    print(f"❌ {path}: worker parser gagal: {error!r} "
+                          f"({results[path]['inserted']} baris sempat tersimpan)")
+    return results, failed_files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import massal laporan kerusakan (CSV/XLSX) ke SQLite.')
+    parser.add_argument('paths', nargs='+', help='file CSV/XLSX atau folder berisi file tersebut')
+    parser.add_argument('--db', default='data/laporan_kerusakan.db', help='path database SQLite')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='jumlah proses parser')
+    parser.add_argument('--chunksize', type=int, default=5000, help='baris per chunk parse/insert')
+    parser.add_argument('--force', action='store_true', help='import ulang file yang sudah tercatat di import_log')
+    parser.add_argument('--on-conflict', choices=['update', 'skip'], default='update',
+                        help='laporan yang sudah ada (hash sama): perbarui status/penyelesaian atau lewati')
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    if not files:
+        print("Tidak ada file CSV/XLSX untuk diimport.")
+        return 1
+
+    db = DatabaseManager(args.db)
+    started = time.perf_counter()
+    results, failed_files = run_import(
+        db, files, max(args.workers, 1), args.chunksize, args.force, args.on_conflict
+    )
+    elapsed = time.perf_counter() - started
+
+    rows = sum(result['rows'] for result in results.values())
+    totals = {key: sum(result[key] for result in results.values()) for key in ('inserted', 'updated', 'skipped')}
+    print(f"\nSelesai: {len(results)} file, {rows} baris dalam {elapsed:.1f} detik "
+          f"({rows / max(elapsed, 1e-9):,.0f} baris/detik): {totals['inserted']} baru, "
+          f"{totals['updated']} diperbarui, {totals['skipped']} dilewati")
+    db.close_all()
+    return 1 if failed_files else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import pandas as pd
+
+from date_utils import BLANK_VALUES, to_iso_date_series
+
+# Kolom CSV lama -> key data yang dipakai DatabaseManager.add_laporan
+CSV_FIELDS = ['Day', 'Vessel', 'Permasalahan', 'Penyelesaian', 'Unit',
+              'Issued Date', 'Closed Date', 'Keterangan', 'Status']
+
+# Kolom yang dinormalisasi ke huruf besar
+UPPER_FIELDS = ['Vessel', 'Unit', 'Status']
+
+# Kolom tanggal CSV -> kolom ISO yang dihitung sekali per chunk (lihat DatabaseManager._laporan_values)
+DATE_FIELDS = {'Day': 'day_iso', 'Issued Date': 'issued_iso', 'Closed Date': 'closed_iso'}
+
+
+def normalize_laporan_frame(df):
+    """Normalisasi DataFrame hasil baca CSV secara vektor (per kolom, bukan per baris).
+
+    Kolom yang tidak ada diisi string kosong, NaN menjadi '', semua nilai di-strip,
+    Vessel/Unit/Status di-uppercase, dan Status kosong menjadi 'OPEN'.
+    Tanggal di-parse vektor ke kolom day_iso/issued_iso/closed_iso.
+    Return DataFrame dengan kolom CSV_FIELDS + kolom ISO dan index yang sama dengan input.
+    """
+    normalized = pd.DataFrame(index=df.index)
+    for field in CSV_FIELDS:
+        if field in df.columns:
+            normalized[field] = df[field].fillna('').astype(str).str.strip()
+        else:
+            normalized[field] = ''
+
+    for field in UPPER_FIELDS:
+        normalized[field] = normalized[field].str.upper()
+    normalized.loc[normalized['Status'] == '', 'Status'] = 'OPEN'
+
+    for field, iso_field in DATE_FIELDS.items():
+        normalized[iso_field] = to_iso_date_series(normalized[field])
+    return normalized
+
+
+def frame_to_records(normalized):
+    """DataFrame ternormalisasi -> list dict untuk add_laporan_many"""
+    return normalized.to_dict('records')
+
+
+# Ekstensi file yang bisa diimport (lihat iter_file_chunks)
+CSV_EXTENSIONS = ('.csv',)
+# .xls tidak didukung: butuh xlrd yang tidak ada di requirements
+EXCEL_EXTENSIONS = ('.xlsx',)
+
+# Kolom wajib (NOT NULL / tidak boleh kosong)
+REQUIRED_FIELDS = ['Vessel', 'Permasalahan']
+
+# Batas jumlah pesan error yang disimpan, supaya memori tetap terbatas
+MAX_ERROR_MESSAGES = 1000
+
+
+def validate_laporan_frame(normalized, first_row=1):
+    """Pisahkan baris valid dan tidak valid dari DataFrame ternormalisasi.
+
+    Return (valid_df, nomor_baris_valid, pesan_error); nomor baris dihitung dari first_row.
+    """
+    invalid = pd.Series(False, index=normalized.index)
+    messages = []
+    for field in REQUIRED_FIELDS:
+        empty = normalized[field] == ''
+        invalid |= empty
+        for position in empty.to_numpy().nonzero()[0]:
+            messages.append(f"Baris {int(first_row + position)}: {field} kosong")
+    row_numbers = [int(first_row + position) for position in (~invalid).to_numpy().nonzero()[0]]
+    return normalized[~invalid], row_numbers, messages
+
+
+def unparsed_date_messages(normalized, first_row=1):
+    """Baris yang tanggalnya terisi tetapi tidak bisa di-parse (tetap disimpan, kolom ISO kosong).
+
+    Return (jumlah, pesan peringatan).
+    """
+    count = 0
+    messages = []
+    for field, iso_field in DATE_FIELDS.items():
+        unparsed = ~normalized[field].isin(BLANK_VALUES) & normalized[iso_field].isna()
+        count += int(unparsed.sum())
+        for position in unparsed.to_numpy().nonzero()[0]:
+            value = normalized[field].iat[position]
+            messages.append(f"Baris {int(first_row + position)}: {field} '{value}' bukan tanggal yang dikenali")
+    return count, messages
+
+
+def iter_csv_chunks(source, chunksize=5000):
+    """Generator: baca CSV per chunk, yield (nomor_baris_pertama, DataFrame ternormalisasi).
+
+    Semua kolom dibaca sebagai string; hanya satu chunk yang ada di memori.
+    """
+    first_row = 1
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+        yield first_row, normalize_laporan_frame(chunk)
+        first_row += len(chunk)
+
+
+def new_import_result():
+    return {'rows': 0, 'inserted': 0, 'updated': 0, 'skipped': 0, 'invalid': 0, 'failed': 0,
+            'unparsed_dates': 0, 'errors': []}
+
+
+def import_chunks(db, chunks, on_chunk=None, result=None, on_conflict='update'):
+    """Validasi lalu insert setiap (first_row, DataFrame ternormalisasi) dari generator.
+
+    Laporan yang sudah ada (content_hash sama) dilewati atau diperbarui sesuai
+    on_conflict, lihat DatabaseManager.add_laporan_many.
+    on_chunk(rows_read) dipanggil sekali per chunk.
+    result: dict hasil sebelumnya untuk diakumulasi (default hasil baru).
+    Return dict: rows (dibaca), inserted, updated, skipped, invalid, failed,
+    unparsed_dates (tanggal tidak dikenali), errors (maks MAX_ERROR_MESSAGES).
+    """
+    result = new_import_result() if result is None else result
+    for first_row, normalized in chunks:
+        valid, row_numbers, messages = validate_laporan_frame(normalized, first_row)
+        result['invalid'] += len(normalized) - len(valid)
+        _collect_errors(result, messages)
+        unparsed, warnings = unparsed_date_messages(normalized, first_row)
+        result['unparsed_dates'] += unparsed
+        _collect_errors(result, warnings)
+
+        db_result = db.add_laporan_many(
+            frame_to_records(valid), chunk_size=max(len(valid), 1), row_numbers=row_numbers,
+            on_conflict=on_conflict
+        )
+        stored = 0
+        for key in ('inserted', 'updated', 'skipped'):
+            result[key] += db_result[key]
+            stored += db_result[key]
+        result['failed'] += len(valid) - stored
+        _collect_errors(result, db_result['errors'])
+
+        result['rows'] += len(normalized)
+        if on_chunk is not None:
+            on_chunk(result['rows'])
+    return result
+
+
+def iter_file_chunks(path, chunksize=5000):
+    """Seperti iter_csv_chunks, tetapi juga menerima file Excel (.xlsx).
+
+    Excel tidak bisa dibaca bertahap, jadi sheet pertama dibaca utuh lalu dipotong per chunk.
+    """
+    if path.lower().endswith(EXCEL_EXTENSIONS):
+        df = pd.read_excel(path, dtype=str)
+        for start in range(0, len(df), chunksize):
+            yield start + 1, normalize_laporan_frame(df.iloc[start:start + chunksize])
+    else:
+        yield from iter_csv_chunks(path, chunksize)
+
+
+def import_csv_stream(db, source, chunksize=5000, on_chunk=None, on_conflict='update'):
+    """Import CSV secara streaming: baca, validasi, normalisasi, insert per chunk"""
+    return import_chunks(db, iter_csv_chunks(source, chunksize), on_chunk=on_chunk, on_conflict=on_conflict)
+
+
+def _collect_errors(result, messages):
+    room = MAX_ERROR_MESSAGES - len(result['errors'])
+    if room > 0:
+        result['errors'].extend(messages[:room])
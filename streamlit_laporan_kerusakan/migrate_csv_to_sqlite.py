@@ -1,8 +1,12 @@
 import pandas as pd
 import streamlit as st
 from database import db
+from importer import import_csv_stream
 import os
 
+# Jumlah baris CSV per chunk baca + transaksi insert (progress bar di-update per chunk)
+CHUNK_SIZE = 1000
+
 def migrate_csv_to_sqlite_app():
     st.title("🔄 Migrasi Data CSV ke SQLite")
     st.write("Tool untuk memindahkan data existing dari CSV ke database SQLite")
@@ -11,75 +15,68 @@ def migrate_csv_to_sqlite_app():
     
     if uploaded_file is not None:
         try:
-            # Read CSV file
-            df = pd.read_csv(uploaded_file)
+            # Preview hanya membaca beberapa baris pertama; file lengkap dibaca streaming saat migrasi
+            df_preview = pd.read_csv(uploaded_file, nrows=5, dtype=str)
+            uploaded_file.seek(0)
             
             st.subheader("Preview Data CSV")
-            st.write(f"Total baris: {len(df)}")
+            st.write(f"Ukuran file: {uploaded_file.size / 1024:,.0f} KB")
             st.write("Kolom yang terdeteksi:")
-            st.write(df.columns.tolist())
-            st.dataframe(df.head(5))
+            st.write(df_preview.columns.tolist())
+            st.dataframe(df_preview)
+            
+            on_conflict_label = st.radio(
+                "Jika laporan sudah ada di database (kapal, unit, tanggal, dan permasalahan sama):",
+                ["Perbarui status/penyelesaian", "Lewati"],
+                horizontal=True
+            )
+            on_conflict = 'update' if on_conflict_label == "Perbarui status/penyelesaian" else 'skip'
             
             if st.button("🚀 Mulai Migrasi ke SQLite"):
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                success_count = 0
-                error_count = 0
-                errors = []
+                def update_progress(rows_done):
+                    # Dipanggil sekali per chunk; progress dari posisi baca file
+                    progress_bar.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0))
+                    status_text.text(f"Processing... {rows_done} baris")
                 
-                for i, row in df.iterrows():
-                    try:
-                        # Map CSV columns to database fields
-                        data = {
-                            'Day': str(row.get('Day', '')),
-                            'Vessel': str(row.get('Vessel', '')).upper().strip(),
-                            'Permasalahan': str(row.get('Permasalahan', '')),
-                            'Penyelesaian': str(row.get('Penyelesaian', '')),
-                            'Unit': str(row.get('Unit', '')).upper().strip(),
-                            'Issued Date': str(row.get('Issued Date', '')),
-                            'Closed Date': str(row.get('Closed Date', '')),
-                            'Keterangan': str(row.get('Keterangan', '')),
-                            'Status': str(row.get('Status', 'OPEN')).upper().strip()
-                        }
-                        
-                        # Insert to database
-                        db.add_laporan(data)
-                        success_count += 1
-                        
-                    except Exception as e:
-                        error_count += 1
-                        errors.append(f"Baris {i+1}: {str(e)}")
-                    
-                    # Update progress
-                    progress = (i + 1) / len(df)
-                    progress_bar.progress(progress)
-                    status_text.text(f"Processing... {i+1}/{len(df)}")
+                # Baca, validasi, normalisasi, dan insert per chunk (memori terbatas)
+                result = import_csv_stream(
+                    db, uploaded_file, chunksize=CHUNK_SIZE, on_chunk=update_progress, on_conflict=on_conflict
+                )
+                progress_bar.progress(1.0)
+                error_count = result['invalid'] + result['failed']
                 
-                st.success(f"✅ Migrasi selesai!")
-                st.info(f"**Berhasil:** {success_count} baris")
+                st.success(f"✅ Migrasi selesai! ({result['rows']} baris dibaca)")
+                st.info(f"**Baru:** {result['inserted']} baris")
+                st.info(f"**Diperbarui:** {result['updated']} baris")
+                st.info(f"**Dilewati (sudah ada):** {result['skipped']} baris")
                 st.info(f"**Gagal:** {error_count} baris")
+                if result['unparsed_dates']:
+                    st.warning(f"**Tanggal tidak dikenali:** {result['unparsed_dates']} sel (tetap disimpan, lihat detail)")
                 
-                if errors:
+                if result['errors']:
                     with st.expander("Detail Error:"):
-                        for error in errors[:10]:  # Show first 10 errors
+                        for error in result['errors'][:10]:  # Show first 10 errors
                             st.error(error)
                 
-                # Show migrated data
-                all_data = db.get_all_laporan()
+                # Ringkasan dari agregat SQL, tanpa memuat ulang seluruh tabel
+                totals = db.get_laporan_totals()
                 st.subheader("Data di Database Setelah Migrasi")
-                st.write(f"Total records: {len(all_data)}")
+                st.write(f"Total records: {totals['total']}")
                 
                 # Show summary
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("Total Vessels", all_data['vessel'].nunique())
+                    st.metric("Total Vessels", totals['vessels'])
                 with col2:
-                    st.metric("Open Reports", (all_data['status'] == 'OPEN').sum())
+                    st.metric("Open Reports", totals['open'])
                 with col3:
-                    st.metric("Closed Reports", (all_data['status'] == 'CLOSED').sum())
+                    st.metric("Closed Reports", totals['closed'])
                 
-                st.dataframe(all_data[['id', 'vessel', 'unit', 'status', 'created_at']].head(10))
+                latest, _ = db.get_laporan_page(columns=['id', 'vessel', 'unit', 'status', 'created_at'], limit=10)
+                st.dataframe(latest)
                 
         except Exception as e:
             st.error(f"Error membaca file: {e}")
@@ -0,0 +1,170 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Path file JSON lines untuk export profil setiap rerun (kosong = tidak diexport)
+PROFILE_LOG_ENV = 'LAPORAN_PROFILE_LOG'
+# Jumlah rerun terakhir per sesi yang disimpan untuk overlay/unduhan
+PROFILE_HISTORY_SIZE = 20
+
+_log_lock = threading.Lock()
+# Profil yang sedang berjalan di thread script ini: [halaman, fragment di dalamnya...]
+_active = threading.local()
+
+
+def _active_profiles():
+    if not hasattr(_active, 'profiles'):
+        _active.profiles = []
+    return _active.profiles
+
+
+class PageProfile:
+    """Waktu per fase untuk satu rerun page script.
+
+    Dua cara mencatat fase (waktu fase dengan nama sama dijumlahkan):
+      - with profile.phase('data load'): ...  (fungsi: decorator @profile_phase, supaya
+        tercatat ke profil fragment jika dipanggil dari fragment)
+      - profile.lap('widget emission'): waktu sejak lap sebelumnya di luar phase(),
+        untuk kode top-level yang panjang tanpa perlu di-indent ulang.
+    """
+
+    def __init__(self, page, sidebar_overlay=True):
+        self.page = page
+        # Fragment tidak boleh menulis ke st.sidebar: overlay-nya di body fragment
+        self.sidebar_overlay = sidebar_overlay
+        self.timestamp = time.time()
+        self.phases = {}  # nama fase -> ms, urut pertama kali muncul
+        self._started = time.perf_counter()
+        self._mark = self._started
+        self._phase_time = 0.0  # waktu di dalam phase() sejak lap terakhir
+        self._depth = 0
+
+    def _add(self, name, elapsed):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed * 1000
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            elapsed = time.perf_counter() - started
+            if self._depth == 0:
+                # Phase bersarang sudah tercakup oleh phase luarnya
+                self._add(name, elapsed)
+                self._phase_time += elapsed
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self._add(name, now - self._mark - self._phase_time)
+        self._mark = now
+        self._phase_time = 0.0
+
+    def to_record(self):
+        total_ms = (time.perf_counter() - self._started) * 1000
+        return {
+            'ts': datetime.fromtimestamp(self.timestamp).isoformat(timespec='milliseconds'),
+            'page': self.page,
+            'total_ms': round(total_ms, 3),
+            'phases': {name: round(ms, 3) for name, ms in self.phases.items()},
+            'other_ms': round(max(total_ms - sum(self.phases.values()), 0.0), 3),
+        }
+
+    def finish(self):
+        """Tutup profil rerun ini: simpan ke riwayat sesi, export JSONL, tampilkan overlay jika aktif"""
+        record = self.to_record()
+        active = _active_profiles()
+        if self in active:
+            active.remove(self)
+        history = st.session_state.setdefault('page_profiles', [])
+        history.append(record)
+        del history[:-PROFILE_HISTORY_SIZE]
+
+        path = os.environ.get(PROFILE_LOG_ENV)
+        if path:
+            with _log_lock, open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+        if profiler_enabled():
+            render_overlay(record, history, st.sidebar if self.sidebar_overlay else st)
+        return record
+
+
+def start_page_profile(page):
+    """Mulai profil rerun page script; panggil profile.finish() di akhir script.
+
+    Menggantikan profil aktif sisa rerun sebelumnya (yang berhenti di tengah
+    karena st.rerun/st.switch_page dan tidak sempat finish()).
+    """
+    profile = PageProfile(page)
+    _active.profiles = [profile]
+    return profile
+
+
+def start_fragment_profile(page):
+    """Mulai profil satu rerun fragment (misal 'homepage:fragment'); panggil finish()
+    di akhir body fragment.
+
+    Rerun fragment saja tidak menjalankan ulang module halaman, jadi profil
+    halaman sudah selesai; selama profil ini aktif, current_profile() dan
+    profile_phase mencatat ke sini.
+    """
+    profile = PageProfile(page, sidebar_overlay=False)
+    _active_profiles().append(profile)
+    return profile
+
+
+def current_profile():
+    """Profil terdalam yang sedang berjalan (fragment atau halaman)"""
+    active = _active_profiles()
+    if not active:
+        # Dipanggil di luar halaman yang diprofil: profil sementara yang tidak disimpan
+        active.append(PageProfile('unprofiled'))
+    return active[-1]
+
+
+def profile_phase(name):
+    """Decorator fungsi: waktu fungsi dicatat sebagai fase current_profile() saat dipanggil"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with current_profile().phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profiler_enabled():
+    """Overlay aktif lewat toggle di halaman Monitor Sistem atau URL ?profile=1"""
+    return st.session_state.get('show_page_profile', False) or st.query_params.get('profile') == '1'
+
+
+def render_overlay(record, history, container):
+    """Overlay debug (sidebar, atau body fragment): rincian fase rerun ini + riwayat total rerun sesi"""
+    phases = dict(record['phases'], lainnya=record['other_ms'])
+    breakdown = pd.DataFrame({'Fase': list(phases), 'ms': list(phases.values())})
+    breakdown['%'] = breakdown['ms'] / max(record['total_ms'], 1e-9) * 100
+
+    with container.expander(f"⏱️ Profil Render {record['page']}: {record['total_ms']:,.0f} ms", expanded=True):
+        st.dataframe(
+            breakdown, hide_index=True, use_container_width=True,
+            column_config={'ms': st.column_config.NumberColumn(format="%.1f"),
+                           '%': st.column_config.NumberColumn(format="%.0f%%")},
+        )
+        page_history = [item['total_ms'] for item in history if item['page'] == record['page']]
+        if len(page_history) > 1:
+            st.caption("Total per rerun (ms): " + ", ".join(f"{ms:,.0f}" for ms in page_history[-10:]))
+        st.download_button(
+            "Unduh JSONL", data='\n'.join(json.dumps(item) for item in history) + '\n',
+            file_name='profil_halaman.jsonl', mime='application/jsonl', use_container_width=True,
+            key=f"profile_download_{record['page']}",
+        )
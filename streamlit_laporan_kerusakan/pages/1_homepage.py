@@ -1,85 +1,93 @@
 import streamlit as st
 import pandas as pd
+import html
 from datetime import datetime
-from database import db
+from database import db, SNIPPET_START, SNIPPET_END
+from date_utils import iso_to_display
+from page_profiler import profile_phase, start_fragment_profile, start_page_profile
 
 # --- Logika Autentikasi Halaman ---
 if 'logged_in' not in st.session_state or not st.session_state.logged_in:
     st.error("Anda harus login untuk mengakses halaman ini. Silakan kembali ke halaman utama.")
     st.stop() 
 
-DATE_FORMAT = '%d/%m/%Y'
-
-def get_processed_data_for_display(selected_year=None):
-    """Memuat, memproses, dan memfilter data dari SQLite - TANPA CACHE"""
-    
-    df = db.get_all_laporan()
-    
-    if df.empty:
-        return pd.DataFrame(), 0, 0, []
-
-    # Processing dates
-    df['Date_Issued'] = pd.to_datetime(df['issued_date'], format='%d/%m/%Y', errors='coerce')
-    
-    # Filter by year if selected
-    df_filtered = df.copy()
-    if selected_year and selected_year != 'All':
-        df_filtered = df_filtered[df_filtered['Date_Issued'].dt.year == int(selected_year)]
-
-    total_open_global = (df_filtered['status'] == 'OPEN').sum()
-    total_closed_global = (df_filtered['status'] == 'CLOSED').sum()
-
-    # Group by vessel untuk stats
-    stats = df_filtered.groupby('vessel')['status'].value_counts().unstack(fill_value=0)
-    stats['OPEN'] = stats.get('OPEN', 0)
-    stats['CLOSED'] = stats.get('CLOSED', 0)
-    
-    last_inspection = df.groupby('vessel')['Date_Issued'].max().dt.strftime(DATE_FORMAT)
-
-    result = stats[['OPEN', 'CLOSED']].reset_index()
-    result['last_inspection'] = result['vessel'].map(last_inspection)
-    
-    valid_years = df['Date_Issued'].dt.year.dropna().astype(int).unique().tolist()
-    
-    return result, total_open_global, total_closed_global, valid_years
+# Profil waktu render per fase (overlay: toggle di Monitor Sistem atau URL ?profile=1)
+profile = start_page_profile('homepage')
+
+# Jumlah kartu kapal per halaman grid (kelipatan 3 kolom)
+SHIP_CARDS_PER_PAGE = 30
+
+# Label filter status -> kunci VESSEL_CARD_STATUS_FILTERS di database
+STATUS_FILTERS = {
+    'Semua Status': None,
+    'Ada Laporan OPEN': 'open',
+    'Semua CLOSED': 'all_closed',
+    'Belum Ada Laporan': 'empty',
+}
+
+# Label urutan kartu -> kunci VESSEL_CARD_SORTS di database
+SHIP_SORTS = {
+    'Kode Kapal (A-Z)': 'vessel',
+    'OPEN Terbanyak': 'open_desc',
+    'Update Terbaru': 'last_issued_desc',
+}
+
+@profile_phase('data load')
+def find_vessels(search_query):
+    """Kode kapal yang cocok dengan pencarian (index prefix/n-gram di memori).
+
+    Mengembalikan (daftar kode atau None jika pencarian kosong, fuzzy): fuzzy True
+    berarti tidak ada yang cocok persis dan hasilnya kapal dengan kode mirip.
+    """
+    if not search_query.strip():
+        return None, False
+    return db.search_vessels(search_query)
+
+@profile_phase('data load')
+def get_processed_data_for_display(selected_year, vessels, status_filter, sort_label, page):
+    """Memuat satu halaman kartu kapal + total OPEN/CLOSED dari vessel_summary.
+
+    Filter, urutan, dan potongan halaman dikerjakan di SQL (di-cache per versi data),
+    jadi biaya rerun tidak tumbuh dengan jumlah kapal di armada.
+    """
+    year = int(selected_year) if selected_year and selected_year != 'All' else None
+    page_df, matched = db.get_vessel_cards(
+        year, vessels=vessels, status=STATUS_FILTERS[status_filter],
+        sort=SHIP_SORTS[sort_label], offset=page * SHIP_CARDS_PER_PAGE, limit=SHIP_CARDS_PER_PAGE,
+    )
+    return page_df, matched, db.get_laporan_totals(year)
 
 # --- FUNGSI UTAMA UNTUK DATA CARD ---
-def get_ship_list(df_stats):
-    """Mengambil data status Open/Closed NC secara dinamis dari DataFrame statistik."""
-    ship_list = []
-    if not df_stats.empty:
-        for _, row in df_stats.iterrows():
-            ship_list.append({
-                "code": row['vessel'],
-                "open_nc": int(row['OPEN']),
-                "closed_nc": int(row['CLOSED']),
-                "last_inspection": row['last_inspection'] if pd.notna(row['last_inspection']) else 'N/A'
-            })
-    return ship_list
-
-def filter_ship_list(ship_list, search_query, status_filter):
-    """Filter daftar kapal berdasarkan search query dan status filter"""
-    filtered_ships = ship_list
-    
-    # Filter berdasarkan search query
-    if search_query:
-        search_query = search_query.upper().strip()
-        filtered_ships = [ship for ship in filtered_ships if search_query in ship['code'].upper()]
-    
-    # Filter berdasarkan status
-    if status_filter != 'Semua Status':
-        if status_filter == 'Ada Laporan OPEN':
-            filtered_ships = [ship for ship in filtered_ships if ship['open_nc'] > 0]
-        elif status_filter == 'Semua CLOSED':
-            filtered_ships = [ship for ship in filtered_ships if ship['open_nc'] == 0 and ship['closed_nc'] > 0]
-        elif status_filter == 'Belum Ada Laporan':
-            filtered_ships = [ship for ship in filtered_ships if ship['open_nc'] == 0 and ship['closed_nc'] == 0]
-    
-    return filtered_ships
-
-# --- FUNGSI DISPLAY CARD DENGAN HTML/CSS KUSTOM ---
-def display_ship_cards(ship_list):
-    """Menampilkan daftar kapal dalam format card kustom."""
+@profile_phase('grouping')
+def get_ship_list(df_page):
+    """Mengambil data status Open/Closed NC dari satu halaman kartu kapal."""
+    return [
+        {
+            "code": vessel,
+            "open_nc": int(open_nc),
+            "closed_nc": int(closed_nc),
+            "last_inspection": iso_to_display(last_issued) if pd.notna(last_issued) else 'N/A',
+        }
+        for vessel, open_nc, closed_nc, last_issued in df_page[
+            ['vessel', 'open_count', 'closed_count', 'last_issued']
+        ].itertuples(index=False)
+    ]
+
+def set_ship_page(page):
+    """Callback tombol halaman grid kapal (dijalankan sebelum rerun fragment)"""
+    st.session_state.ship_page = page
+
+def reset_ship_page_on_filter_change(signature):
+    """Kembali ke halaman pertama setiap kali pencarian/filter/urutan berubah"""
+    if st.session_state.get('ship_filter_signature') != signature:
+        st.session_state.ship_filter_signature = signature
+        st.session_state.ship_page = 0
+    return st.session_state.get('ship_page', 0)
+
+# --- CSS KUSTOM HALAMAN ---
+def inject_homepage_css():
+    """CSS card & metrik; dipanggil sekali per full rerun di luar fragment, jadi tidak
+    dikirim ulang setiap kali fragment filter/grid kapal di-rerun."""
     st.markdown("""
         <style>
             .ship-card-content {
@@ -191,11 +199,14 @@ def display_ship_cards(ship_list):
         </style>
     """, unsafe_allow_html=True)
 
+# --- FUNGSI DISPLAY CARD DENGAN HTML/CSS KUSTOM ---
+@profile_phase('widget emission')
+def display_ship_cards(ship_list):
+    """Menampilkan daftar kapal dalam format card kustom."""
     if not ship_list:
         st.warning("🚫 Tidak ada kapal yang sesuai dengan filter pencarian.")
         return
 
-    ship_list.sort(key=lambda x: x['code']) 
     num_cols = 3 
     cols = st.columns(num_cols)
     
@@ -242,10 +253,59 @@ def display_ship_cards(ship_list):
                 
             st.markdown(f'<div style="margin-bottom: 20px;"></div>', unsafe_allow_html=True)
 
+@profile_phase('widget emission')
+def display_ship_pager(page, page_count, matched, position):
+    """Navigasi halaman grid kapal; position 'top'/'bottom' membedakan key tombol."""
+    if page_count <= 1:
+        return
+
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    col_prev.button("◀ Sebelumnya", key=f"ship_page_prev_{position}", disabled=page == 0,
+                    on_click=set_ship_page, args=(page - 1,), use_container_width=True)
+    first = page * SHIP_CARDS_PER_PAGE + 1
+    last = min(first + SHIP_CARDS_PER_PAGE - 1, matched)
+    col_info.markdown(
+        f"<div style='text-align: center; padding-top: 8px;'>Halaman {page + 1} dari {page_count} · "
+        f"kapal {first}–{last} dari {matched}</div>",
+        unsafe_allow_html=True,
+    )
+    col_next.button("Berikutnya ▶", key=f"ship_page_next_{position}", disabled=page >= page_count - 1,
+                    on_click=set_ship_page, args=(page + 1,), use_container_width=True)
+
+# --- FUNGSI PENCARIAN TEKS LAPORAN (FTS) ---
+def format_snippet(snippet):
+    """Escape HTML lalu ubah penanda highlight FTS menjadi <mark>."""
+    text = html.escape(snippet or '')
+    return text.replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+@profile_phase('widget emission')
+def display_report_search(results):
+    """Menampilkan hasil pencarian teks laporan di seluruh armada."""
+    if results.empty:
+        st.info("Tidak ada laporan yang cocok dengan kata kunci.")
+        return
+
+    st.caption(f"{len(results)} laporan teratas, diurutkan berdasarkan relevansi.")
+    for _, row in results.iterrows():
+        col_text, col_action = st.columns([5, 1])
+        status_color = "#FF4B4B" if row['status'] == 'OPEN' else "#00BA38"
+        header = (
+            f"**{html.escape(str(row['vessel']))}** · {html.escape(str(row['unit']))} · "
+            f"<span style='color: {status_color}; font-weight: bold;'>{html.escape(str(row['status']))}</span> · "
+            f"{html.escape(str(row['day']))}"
+        )
+        col_text.markdown(f"{header}<br>{format_snippet(row['snippet'])}", unsafe_allow_html=True)
+
+        if col_action.button("Buka Kapal", key=f"search_open_{row['id']}", use_container_width=True):
+            st.session_state.selected_ship_code = row['vessel']
+            st.session_state.selected_ship_name = row['vessel']
+            st.switch_page("pages/2_Laporan_Aktif_&_Input.py")
+
 # --- MAIN LOGIC ---
 st.set_page_config(page_title="Homepage", layout="wide")
 
 st.sidebar.success(f"Selamat Datang, {st.session_state.username}!")
+inject_homepage_css()
 
 # --- HEADER DENGAN REFRESH ---
 col_title, col_refresh = st.columns([4, 1])
@@ -258,106 +318,160 @@ with col_refresh:
 
 st.write("---")
 
-# --- FILTER UTAMA ---
-df_stats_temp, _, _, valid_years_list_temp = get_processed_data_for_display()
-year_options = ['All'] + sorted(valid_years_list_temp, reverse=True)
+# --- FILTER + GRID KAPAL (FRAGMENT) ---
+@st.fragment
+def render_ship_browser():
+    """Filter, metrik global, dan grid kartu kapal per halaman.
+
+    Fragment: mengetik di pencarian kapal, mengganti filter status/tahun/urutan, atau
+    pindah halaman hanya me-rerun bagian ini, bukan header, CSS, pencarian laporan,
+    dan footer. Hanya SHIP_CARDS_PER_PAGE kartu yang dirender per rerun.
+    Rerun fragment diprofil terpisah sebagai 'homepage:fragment'.
+    """
+    fragment_profile = start_fragment_profile('homepage:fragment')
+
+    # --- FILTER UTAMA ---
+    fragment_profile.lap('widget emission')
+    year_options = ['All'] + db.get_summary_years()
+    fragment_profile.lap('data load')
 
-# --- SEARCH AND FILTER SECTION ---
-st.markdown("### 🔍 Cari & Filter Kapal")
+    # --- SEARCH AND FILTER SECTION ---
+    st.markdown("### 🔍 Cari & Filter Kapal")
 
-with st.container():
-    col_search, col_status, col_year = st.columns([2, 1.5, 1])
+    with st.container():
+        col_search, col_status, col_year, col_sort = st.columns([2, 1.5, 1, 1.5])
     
-    with col_search:
-        search_query = st.text_input(
-            "Cari nama kapal...",
-            placeholder="Masukkan nama kapal...",
-            key="search_ship"
-        )
+        with col_search:
+            search_query = st.text_input(
+                "Cari nama kapal...",
+                placeholder="Masukkan nama kapal...",
+                key="search_ship"
+            )
+    
+        with col_status:
+            status_options = ['Semua Status', 'Ada Laporan OPEN', 'Semua CLOSED', 'Belum Ada Laporan']
+            status_filter = st.selectbox(
+                "Filter Status",
+                options=status_options,
+                key="status_filter"
+            )
     
-    with col_status:
-        status_options = ['Semua Status', 'Ada Laporan OPEN', 'Semua CLOSED', 'Belum Ada Laporan']
-        status_filter = st.selectbox(
-            "Filter Status",
-            options=status_options,
-            key="status_filter"
+        with col_year:
+            selected_year = st.selectbox("Filter Tahun", year_options, key="filter_tahun_homepage")
+
+        with col_sort:
+            sort_label = st.selectbox("Urutkan", list(SHIP_SORTS), key="sort_ship")
+
+    # --- LOAD DATA (SETELAH FILTER DITERAPKAN) ---
+    page = reset_ship_page_on_filter_change((search_query, status_filter, selected_year, sort_label))
+    matched_vessels, fuzzy_match = find_vessels(search_query)
+    df_page, filtered_ship_count, totals = get_processed_data_for_display(
+        selected_year, matched_vessels, status_filter, sort_label, page
+    )
+    page_count = -(-filtered_ship_count // SHIP_CARDS_PER_PAGE)
+    if page >= page_count > 0:
+        # Halaman tersimpan di luar jangkauan (data berkurang sejak rerun sebelumnya)
+        page = st.session_state.ship_page = page_count - 1
+        df_page, filtered_ship_count, totals = get_processed_data_for_display(
+            selected_year, matched_vessels, status_filter, sort_label, page
         )
+    total_open, total_closed = totals['open'], totals['closed']
+
+    # --- MENAMPILKAN METRIK GLOBAL ---
+    st.markdown("### 📊 Ringkasan Status Global")
+
+    col_open, col_closed, col_total, col_filtered = st.columns(4)
+
+    with col_open:
+        st.markdown(f"""
+            <div class="global-metric-box" style="border-top: 5px solid #FF4B4B;">
+                <div class="global-label">TOTAL LAPORAN OPEN</div>
+                <div class="global-value-open">{total_open}</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col_closed:
+        st.markdown(f"""
+            <div class="global-metric-box" style="border-top: 5px solid #00BA38;">
+                <div class="global-label">TOTAL LAPORAN CLOSED</div>
+                <div class="global-value-closed">{total_closed}</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col_total:
+        st.markdown(f"""
+            <div class="global-metric-box" style="border-top: 5px solid #005691;">
+                <div class="global-label">TOTAL SELURUH LAPORAN</div>
+                <div class="global-value-total">{total_open + total_closed}</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col_filtered:
+        st.markdown(f"""
+            <div class="global-metric-box" style="border-top: 5px solid #8B5CF6;">
+                <div class="global-label">KAPAL DITEMUKAN</div>
+                <div class="global-value-total">{filtered_ship_count}</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    # --- TAMPILAN FILTER AKTIF ---
+    if search_query or status_filter != 'Semua Status':
+        st.markdown("#### 🎯 Filter Aktif:")
+        filter_info = ""
+        if search_query:
+            filter_info += f"<span class='filter-badge'>Pencarian: '{search_query}'</span> "
+        if status_filter != 'Semua Status':
+            filter_info += f"<span class='filter-badge'>Status: {status_filter}</span> "
+        if selected_year != 'All':
+            filter_info += f"<span class='filter-badge'>Tahun: {selected_year}</span>"
     
-    with col_year:
-        selected_year = st.selectbox("Filter Tahun", year_options, key="filter_tahun_homepage")
-
-# --- LOAD DATA (SETELAH FILTER DITERAPKAN) ---
-df_stats, total_open, total_closed, _ = get_processed_data_for_display(selected_year)
-
-# --- MENAMPILKAN METRIK GLOBAL ---
-st.markdown("### 📊 Ringkasan Status Global")
-
-col_open, col_closed, col_total, col_filtered = st.columns(4)
+        st.markdown(filter_info, unsafe_allow_html=True)
 
-with col_open:
-    st.markdown(f"""
-        <div class="global-metric-box" style="border-top: 5px solid #FF4B4B;">
-            <div class="global-label">TOTAL LAPORAN OPEN</div>
-            <div class="global-value-open">{total_open}</div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown("---")
 
-with col_closed:
-    st.markdown(f"""
-        <div class="global-metric-box" style="border-top: 5px solid #00BA38;">
-            <div class="global-label">TOTAL LAPORAN CLOSED</div>
-            <div class="global-value-closed">{total_closed}</div>
-        </div>
-    """, unsafe_allow_html=True)
+    # --- TAMPILAN CARD KAPAL DENGAN FILTER ---
+    st.markdown(f"### 🚢 Daftar Kapal ({filtered_ship_count} kapal ditemukan)")
 
-with col_total:
-    st.markdown(f"""
-        <div class="global-metric-box" style="border-top: 5px solid #005691;">
-            <div class="global-label">TOTAL SELURUH LAPORAN</div>
-            <div class="global-value-total">{total_open + total_closed}</div>
-        </div>
-    """, unsafe_allow_html=True)
+    if fuzzy_match and matched_vessels:
+        st.caption(f"Tidak ada kode kapal yang memuat '{search_query.strip().upper()}'; "
+                   "menampilkan kapal dengan kode mirip.")
 
-with col_filtered:
-    # Hitung jumlah kapal setelah filter
-    if df_stats.empty:
-        filtered_ship_count = 0
+    if filtered_ship_count == 0 and matched_vessels is None and STATUS_FILTERS[status_filter] is None:
+        st.warning("Tidak ada data kapal yang valid ditemukan untuk filter ini.")
     else:
-        final_ship_list = get_ship_list(df_stats)
-        filtered_ships = filter_ship_list(final_ship_list, search_query, status_filter)
-        filtered_ship_count = len(filtered_ships)
-    
-    st.markdown(f"""
-        <div class="global-metric-box" style="border-top: 5px solid #8B5CF6;">
-            <div class="global-label">KAPAL DITEMUKAN</div>
-            <div class="global-value-total">{filtered_ship_count}</div>
-        </div>
-    """, unsafe_allow_html=True)
+        display_ship_pager(page, page_count, filtered_ship_count, 'top')
+        display_ship_cards(get_ship_list(df_page))
+        display_ship_pager(page, page_count, filtered_ship_count, 'bottom')
 
-# --- TAMPILAN FILTER AKTIF ---
-if search_query or status_filter != 'Semua Status':
-    st.markdown("#### 🎯 Filter Aktif:")
-    filter_info = ""
-    if search_query:
-        filter_info += f"<span class='filter-badge'>Pencarian: '{search_query}'</span> "
-    if status_filter != 'Semua Status':
-        filter_info += f"<span class='filter-badge'>Status: {status_filter}</span> "
-    if selected_year != 'All':
-        filter_info += f"<span class='filter-badge'>Tahun: {selected_year}</span>"
-    
-    st.markdown(filter_info, unsafe_allow_html=True)
+    fragment_profile.lap('widget emission')
+    fragment_profile.finish()
 
-st.markdown("---")
-
-# --- TAMPILAN CARD KAPAL DENGAN FILTER ---
-st.markdown(f"### 🚢 Daftar Kapal ({filtered_ship_count} kapal ditemukan)")
+with profile.phase('ship browser (fragment)'):
+    render_ship_browser()
 
-if df_stats.empty:
-    st.warning("Tidak ada data kapal yang valid ditemukan untuk filter ini.")
-else:
-    final_ship_list = get_ship_list(df_stats)
-    filtered_ships = filter_ship_list(final_ship_list, search_query, status_filter)
-    display_ship_cards(filtered_ships)
+# --- PENCARIAN TEKS LAPORAN (SELURUH ARMADA) ---
+st.markdown("---")
+st.markdown("### 🔎 Cari Teks Laporan (Seluruh Armada)")
+
+col_report_query, col_report_status = st.columns([3, 1])
+with col_report_query:
+    report_query = st.text_input(
+        "Cari di permasalahan / penyelesaian / keterangan...",
+        placeholder="contoh: pompa bocor",
+        key="search_report_fleet"
+    )
+with col_report_status:
+    report_status = st.selectbox("Status Laporan", ['Semua', 'OPEN', 'CLOSED'], key="search_report_status")
+
+if report_query.strip():
+    profile.lap('widget emission')
+    results = db.search_laporan(
+        report_query,
+        status=None if report_status == 'Semua' else report_status,
+        limit=20
+    )
+    profile.lap('data load')
+    display_report_search(results)
 
 # --- FOOTER INFO ---
 st.markdown("---")
@@ -377,4 +491,10 @@ with col_actions:
         st.session_state.search_ship = ""
         st.session_state.status_filter = "Semua Status"
         st.session_state.filter_tahun_homepage = "All"
-        st.rerun()
\ No newline at end of file
+        st.session_state.sort_ship = "Kode Kapal (A-Z)"
+        st.session_state.ship_page = 0
+        st.session_state.search_report_fleet = ""
+        st.rerun()
+
+profile.lap('widget emission')
+profile.finish()
@@ -3,7 +3,9 @@ import pandas as pd
 from datetime import datetime
 import time 
 import numpy as np 
+import sqlite3
 from database import db
+from page_profiler import profile_phase, start_fragment_profile, start_page_profile
 
 # --- Logika Autentikasi Halaman ---
 if 'logged_in' not in st.session_state or not st.session_state.logged_in:
@@ -18,6 +20,9 @@ if 'selected_ship_code' not in st.session_state or st.session_state.selected_shi
 SELECTED_SHIP_CODE = st.session_state.selected_ship_code
 SELECTED_SHIP_NAME = st.session_state.get('selected_ship_name', SELECTED_SHIP_CODE)
 
+# Profil waktu render per fase (overlay: toggle di Monitor Sistem atau URL ?profile=1)
+profile = start_page_profile('laporan_aktif')
+
 # --- INISIALISASI SESSION STATE UNTUK INPUT DAN EDIT ---
 if 'show_new_report_form_v2' not in st.session_state:
     st.session_state.show_new_report_form_v2 = False
@@ -28,14 +33,17 @@ if 'confirm_delete_id' not in st.session_state:
 
 # --- Konfigurasi Format ---
 DATE_FORMAT = '%d/%m/%Y'
+DUPLICATE_MESSAGE = "Laporan yang sama (unit, tanggal kejadian, dan permasalahan) sudah ada untuk kapal ini."
 
 # -------------------------------------------------------------------------------------
 # --- FUNGSI LOAD DATA (MEMBACA DARI SQLITE) ---
 # -------------------------------------------------------------------------------------
+@profile_phase('data load')
 def load_data():
     """Memuat data untuk kapal terpilih dari SQLite."""
     return db.get_laporan_by_vessel(SELECTED_SHIP_CODE)
 
+@profile_phase('grouping')
 def get_report_stats(df, year=None):
     """Menghitung total, open, dan closed report, difilter berdasarkan tahun."""
     df_filtered = df.copy()
@@ -51,9 +59,12 @@ def get_report_stats(df, year=None):
 def add_new_data(new_entry):
     """Menambahkan baris data baru ke SQLite."""
     try:
-        laporan_id = db.add_laporan(new_entry)
+        laporan_id = db.add_laporan(new_entry, date_format=DATE_FORMAT)
         st.success(f"✅ Laporan baru berhasil ditambahkan (ID: {laporan_id})")
         return True
+    except sqlite3.IntegrityError:
+        st.error(f"❌ {DUPLICATE_MESSAGE}")
+        return False
     except Exception as e:
         st.error(f"❌ Gagal menambah laporan: {e}")
         return False
@@ -72,39 +83,35 @@ def delete_data(laporan_id):
     except Exception as e:
         st.error(f"❌ Error saat menghapus: {e}")
 
+def set_edit_id(laporan_id):
+    """Callback tombol Edit/Batal: laporan yang sedang diedit inline (None = tidak ada)"""
+    st.session_state.edit_id = laporan_id
+
 def start_delete_confirmation(unique_id):
     """Setel state untuk menampilkan modal konfirmasi."""
     st.session_state.confirm_delete_id = unique_id
     st.rerun()
 
-# --- Fungsi Pembantu: Parsing Tanggal ---
-def parse_date(date_str):
-    if pd.isna(date_str) or str(date_str).strip() == '':
-        return pd.NaT
-    for fmt in ['%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%y-%m-%d', '%Y/%m/%d', DATE_FORMAT]:
-        try:
-            return datetime.strptime(str(date_str).strip(), fmt)
-        except (ValueError, TypeError):
-            continue
-    return pd.NaT
-
 # --- Tampilan Utama ---
 st.title(f'📝 Laporan Kerusakan Aktif & Input Data: {SELECTED_SHIP_NAME} ({SELECTED_SHIP_CODE})')
 
+profile.lap('widget emission')
 df_filtered_ship = load_data() 
 
-# Processing dates untuk filtering
-df_filtered_ship['Date_Day'] = df_filtered_ship['day'].apply(parse_date)
-df_filtered_ship['Date_Issued'] = df_filtered_ship['issued_date'].apply(parse_date)
+# Processing dates untuk filtering (kolom ISO sudah dinormalisasi saat tulis)
+df_filtered_ship['Date_Day'] = pd.to_datetime(df_filtered_ship['day_iso'])
+df_filtered_ship['Date_Issued'] = pd.to_datetime(df_filtered_ship['issued_iso'])
+profile.lap('date parsing')
 
 # Pastikan unit_options dibuat dari data yang sudah dimuat
 unit_options = sorted(df_filtered_ship['unit'].dropna().unique().tolist())
+profile.lap('grouping')
 
 # =========================================================
 # === DASHBOARD STATISTIK DENGAN FILTER TAHUN ===
 # =========================================================
-valid_years = df_filtered_ship['Date_Day'].dropna().dt.year.astype(int).unique()
-year_options = ['All'] + sorted(valid_years.tolist(), reverse=True)
+year_options = ['All'] + db.get_available_years('day', vessel=SELECTED_SHIP_CODE)
+profile.lap('data load')
 
 with st.container(border=True): 
     col_filter, col_spacer_top = st.columns([1, 4])
@@ -185,15 +192,23 @@ st.subheader("📋 Laporan Kerusakan Aktif (OPEN)")
 
 confirmation_placeholder = st.empty()
 
-if df_filtered_ship.empty:
-    st.info("Belum ada data notulensi kerusakan tersimpan untuk kapal ini.")
-else:
-    df_active = df_filtered_ship[df_filtered_ship['status'].str.upper() == 'OPEN'].copy()
+@st.fragment
+def render_active_reports(df_ship, selected_year, unit_options):
+    """Daftar laporan OPEN dengan edit inline & hapus.
+
+    Fragment: Edit/Batal (callback) hanya me-rerun daftar ini. Simpan dan Hapus me-rerun
+    seluruh halaman karena mengubah data (ringkasan) atau membuka konfirmasi
+    hapus di luar fragment. Rerun fragment diprofil terpisah sebagai 'laporan_aktif:fragment'.
+    """
+    fragment_profile = start_fragment_profile('laporan_aktif:fragment')
+    fragment_profile.lap('widget emission')
+    df_active = df_ship[df_ship['status'].str.upper() == 'OPEN'].copy()
 
     if selected_year and selected_year != 'All':
           df_active = df_active[df_active['Date_Day'].dt.year == int(selected_year)]
           
     df_active = df_active.sort_values(by='Date_Day', ascending=False)
+    fragment_profile.lap('grouping')
     
     # ------------------- HEADER CUSTOM TABLE ----------------------
     col_id, col_masalah, col_unit, col_status_date, col_action = st.columns([0.5, 3, 1, 1.5, 1.5])
@@ -227,9 +242,9 @@ else:
             action_col = cols[4]
             btn_edit, btn_delete = action_col.columns(2)
             
-            if btn_edit.button("✏️ Edit", key=f"edit_{laporan_id}", use_container_width=True):
-                st.session_state.edit_id = laporan_id
-                st.rerun()
+            # Callback (bukan st.rerun) supaya klik hanya me-rerun fragment ini
+            btn_edit.button("✏️ Edit", key=f"edit_{laporan_id}", use_container_width=True,
+                            on_click=set_edit_id, args=(laporan_id,))
                 
             if btn_delete.button("🗑️ Hapus", key=f"delete_{laporan_id}", use_container_width=True):
                 start_delete_confirmation(laporan_id) 
@@ -300,20 +315,30 @@ else:
                     }
                     
                     try:
-                        db.update_laporan(laporan_id, updated_data)
+                        db.update_laporan(laporan_id, updated_data, date_format=DATE_FORMAT)
                         st.success("✅ Perubahan berhasil disimpan!")
                         st.session_state.edit_id = None
                         time.sleep(1)
                         st.rerun()
+                    except sqlite3.IntegrityError:
+                        st.error(f"❌ {DUPLICATE_MESSAGE}")
                     except Exception as e:
                         st.error(f"❌ Gagal menyimpan perubahan: {e}")
 
-                if btn_cancel.button("❌ Batal", key=key_prefix + 'cancel', use_container_width=True):
-                    st.session_state.edit_id = None
-                    st.rerun()
+                btn_cancel.button("❌ Batal", key=key_prefix + 'cancel', use_container_width=True,
+                                  on_click=set_edit_id, args=(None,))
         
             st.markdown("---") 
 
+    fragment_profile.lap('widget emission')
+    fragment_profile.finish()
+
+if df_filtered_ship.empty:
+    st.info("Belum ada data notulensi kerusakan tersimpan untuk kapal ini.")
+else:
+    with profile.phase('daftar laporan (fragment)'):
+        render_active_reports(df_filtered_ship, selected_year, unit_options)
+
 # =========================================================
 # === LOGIKA MODAL KONFIRMASI HAPUS ===
 # =========================================================
@@ -435,17 +460,20 @@ st.markdown("---")
 # =========================================================
 
 with st.expander("📁 Lihat Riwayat Laporan (CLOSED)"):
+    profile.lap('widget emission')
     df_closed = df_filtered_ship[df_filtered_ship['status'].str.upper() == 'CLOSED'].copy()
 
     if selected_year and selected_year != 'All':
           df_closed = df_closed[df_closed['Date_Day'].dt.year == int(selected_year)]
+    profile.lap('grouping')
 
     if df_closed.empty:
         st.info("Belum ada laporan yang berstatus CLOSED untuk kapal ini.")
     else:
         st.caption("Klik dua kali pada sel di tabel untuk **Edit Inline**. Tanggal harus dalam format **DD/MM/YYYY**.")
 
-        df_closed_display = df_closed.copy()
+        # Kolom category (load bertipe) -> teks biasa supaya bisa diedit bebas di data_editor
+        df_closed_display = df_closed.astype({column: object for column in ['day', 'vessel', 'unit', 'status']})
         df_closed_display.insert(0, 'ID Laporan', df_closed_display['id'].apply(lambda x: f"ID{x}"))
 
         editable_columns_closed = {
@@ -470,7 +498,12 @@ with st.expander("📁 Lihat Riwayat Laporan (CLOSED)"):
             key='closed_report_editor' 
         )
         
-        if not df_closed_display[display_columns].equals(edited_df_closed):
+        original_closed = df_closed_display[display_columns]
+        # Hanya baris yang benar-benar diubah yang divalidasi dan disimpan
+        unchanged = edited_df_closed.eq(original_closed) | (edited_df_closed.isna() & original_closed.isna())
+        changed_closed = edited_df_closed[~unchanged.all(axis=1)]
+
+        if not changed_closed.empty:
             st.warning("⚠️ Perubahan riwayat terdeteksi. Silakan klik tombol 'Simpan Perubahan Riwayat' untuk menyimpan data.")
             
             col_save, col_spacer_save = st.columns([1, 5])
@@ -479,7 +512,7 @@ with st.expander("📁 Lihat Riwayat Laporan (CLOSED)"):
                     
                     has_error = False
 
-                    for index, edited_row in edited_df_closed.iterrows():
+                    for index, edited_row in changed_closed.iterrows():
                         
                         unique_id_str = edited_row['ID Laporan']
                         unique_id = int(unique_id_str.replace('ID', ''))  # Extract ID from "IDxxx"
@@ -518,7 +551,7 @@ with st.expander("📁 Lihat Riwayat Laporan (CLOSED)"):
                     
                     # Apply all updates
                     success_count = 0
-                    for index, edited_row in edited_df_closed.iterrows():
+                    for index, edited_row in changed_closed.iterrows():
                         unique_id_str = edited_row['ID Laporan']
                         unique_id = int(unique_id_str.replace('ID', ''))
                         
@@ -535,11 +568,17 @@ with st.expander("📁 Lihat Riwayat Laporan (CLOSED)"):
                         }
                         
                         try:
-                            db.update_laporan(unique_id, updated_data)
+                            db.update_laporan(unique_id, updated_data, date_format=DATE_FORMAT)
                             success_count += 1
+                        except sqlite3.IntegrityError:
+                            st.error(f"Gagal update ID {unique_id}: {DUPLICATE_MESSAGE}")
                         except Exception as e:
                             st.error(f"Gagal update ID {unique_id}: {e}")
                     
                     st.success(f"✅ {success_count} laporan berhasil diupdate!")
-                    time.sleep(2)
-                    st.rerun()
\ No newline at end of file
+                    if success_count == len(changed_closed):
+                        time.sleep(2)
+                        st.rerun()
+
+profile.lap('widget emission')
+profile.finish()
@@ -1,60 +1,28 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
-import numpy as np 
+from datetime import date, datetime
 from database import db
+from figure_cache import cached_figure, figure_cache
+from page_profiler import current_profile, profile_phase, start_fragment_profile, start_page_profile
 
 # --- Logika Autentikasi Halaman ---
 if 'logged_in' not in st.session_state or not st.session_state.logged_in:
     st.error("Anda harus login untuk mengakses halaman ini. Silakan kembali ke halaman utama.")
     st.stop() 
 
-# --- Fungsi Pembantu: Parsing Tanggal ---
-DATE_FORMAT = '%d/%m/%Y'
-
-def parse_date(date_str):
-    if pd.isna(date_str) or str(date_str).strip() == '':
-        return pd.NaT
-    for fmt in ['%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%y-%m-%d', '%Y/%m/%d', DATE_FORMAT]:
-        try:
-            return datetime.strptime(str(date_str).strip(), fmt)
-        except (ValueError, TypeError):
-            continue
-    return pd.NaT
+# Profil waktu render per fase (overlay: toggle di Monitor Sistem atau URL ?profile=1)
+profile = start_page_profile('analisis_dashboard')
 
 # --- Fungsi Manajemen Data ---
-def load_data_dashboard():
-    """Memuat SEMUA data dari SQLite dan melakukan pre-processing untuk analisis GLOBAL."""
+@profile_phase('data load')
+def load_dashboard_filters():
+    """Memuat pilihan filter (tahun & kapal). Agregasi panel dihitung di SQL per panel."""
     try:
-        df = db.get_dashboard_data()
+        return db.get_available_years('day'), db.get_dashboard_vessels()
     except Exception as e:
         st.error(f"Gagal memuat data dari database: {e}")
-        return pd.DataFrame()
-    
-    if df.empty:
-        return pd.DataFrame()
-    
-    # Data cleaning dan processing
-    df['vessel'] = df['vessel'].astype(str).str.upper().str.strip()
-    df['status'] = df.get('status', 'OPEN').astype(str).str.upper()
-    df['unit'] = df['unit'].astype(str).str.upper().str.strip().fillna('TIDAK DITENTUKAN')
-
-    # Konversi tanggal
-    df['Date_Day'] = df['day'].apply(parse_date)
-    df['Date_Issue'] = df['issued_date'].apply(parse_date)
-    df['Date_Closed'] = df['closed_date'].apply(parse_date) 
-
-    # Hapus baris di mana Date_Day tidak valid atau Vessel kosong
-    df = df.dropna(subset=['Date_Day', 'vessel']).reset_index(drop=True)
-    
-    # Hitung Resolution Time (MTTR) dengan hari kalender INKLUSIF (+1)
-    df['Resolution_Time_Days'] = (df['Date_Closed'] - df['Date_Issue']).dt.days + 1
-    
-    # Bersihkan Resolution_Time_Days yang tidak valid
-    df.loc[df['Resolution_Time_Days'] <= 0, 'Resolution_Time_Days'] = np.nan
-    
-    return df
+        return [], []
 
 # --- Fungsi Callback untuk Tombol Select/Clear All ---
 def toggle_all_vessels():
@@ -72,16 +40,17 @@ def toggle_all_vessels():
 
 st.title("📊 Dashboard Analisis Kerusakan Kapal (Global)")
 
-df = load_data_dashboard()
+valid_years, all_vessels = load_dashboard_filters()
 
-if df.empty:
+if not all_vessels:
     st.info("Data laporan kerusakan tidak ditemukan atau kosong. Silakan input data di halaman Laporan Aktif & Input.")
+    # Profil tetap dicatat untuk rerun yang berhenti lebih awal
+    profile.lap('widget emission')
+    profile.finish()
     st.stop() 
 
 # --- Filter Global Tahun dan Kapal ---
-valid_years = df['Date_Day'].dt.year.dropna().astype(int).unique()
-year_options = ['All'] + sorted(valid_years.tolist(), reverse=True)
-all_vessels = sorted(df['vessel'].dropna().unique().tolist())
+year_options = ['All'] + valid_years
 
 # Inisialisasi session state untuk daftar kapal global jika belum ada
 if 'all_vessels_list' not in st.session_state:
@@ -110,33 +79,18 @@ with st.container(border=True):
             use_container_width=True
         )
 
-    # Filter data utama
-    df_filtered = df.copy()
-    
-    # Filter berdasarkan Tahun
-    if selected_year and selected_year != 'All':
-        df_filtered = df_filtered[df_filtered['Date_Day'].dt.year == int(selected_year)]
-
-    # Filter berdasarkan Kapal
-    if selected_vessels:
-        df_filtered = df_filtered[df_filtered['vessel'].isin(selected_vessels)]
-    else:
-        df_filtered = pd.DataFrame()
+    # Filter untuk semua query agregasi
+    filter_year = int(selected_year) if selected_year and selected_year != 'All' else None
+    filter_vessels = selected_vessels or []
 
     # === Bagian 1: Ringkasan Metrik & KPI ===
-    if df_filtered.empty:
-        total = open_count = closed_count = 0
-        avg_res_time = "N/A"
-    else:
-        total = len(df_filtered)
-        open_count = len(df_filtered[df_filtered['status'] == 'OPEN'])
-        closed_count = len(df_filtered[df_filtered['status'] == 'CLOSED'])
-        
-        df_closed = df_filtered[df_filtered['status'] == 'CLOSED'].copy()
-        if not df_closed.empty and df_closed['Resolution_Time_Days'].notna().any():
-            avg_res_time = df_closed[df_closed['Resolution_Time_Days'] > 0]['Resolution_Time_Days'].mean() 
-        else:
-            avg_res_time = "N/A"
+    profile.lap('widget emission')
+    kpis = db.get_dashboard_kpis(filter_year, filter_vessels)
+    profile.lap('data load')
+    total = kpis['total']
+    open_count = kpis['open']
+    closed_count = kpis['closed']
+    avg_res_time = kpis['avg_resolution_days'] if kpis['avg_resolution_days'] is not None else "N/A"
 
     st.markdown("##### Ringkasan Status Laporan (Total: **{}**) - Data real-time".format(total))
     
@@ -150,26 +104,15 @@ with st.container(border=True):
 st.markdown("---")
 
 # =========================================================
-# === Bagian 2: Analisis Detail Menggunakan Tabs ===
+# === Bagian 2: Analisis Detail (Panel Lazy) ===
 # =========================================================
+# Hanya panel yang dipilih yang menjalankan query agregasi dan membangun figure
+# Plotly, jadi ganti filter tahun/kapal = biaya satu panel, bukan empat.
 
-tab_unit, tab_vessel, tab_time, tab_kpi = st.tabs(["📊 Analisis Unit/Sistem", "⚓ Kinerja Kapal", "📈 Tren Kerusakan", "🏆 Metrik Efisiensi (MTTR)"])
-
-# --- Cek data kosong global untuk semua tab ---
-if df_filtered.empty:
-    with tab_unit: st.info("Tidak ada data untuk kombinasi filter yang dipilih.")
-    with tab_vessel: st.info("Tidak ada data untuk kombinasi filter yang dipilih.")
-    with tab_time: st.info("Tidak ada data untuk kombinasi filter yang dipilih.")
-    with tab_kpi: st.info("Tidak ada data untuk kombinasi filter yang dipilih.")
-    st.stop()
-
-# --- TAB 1: ANALISIS UNIT/SISTEM ---
-with tab_unit:
-    st.subheader("Penyebaran Kerusakan berdasarkan Unit/Sistem")
-    
-    col_bar, col_spacer, col_pie = st.columns([2, 0.1, 1])
-
-    unit_counts = df_filtered['unit'].value_counts().reset_index()
+# --- PANEL 1: ANALISIS UNIT/SISTEM ---
+# build_*_figure menjalankan query + plotly.express; hanya dipanggil saat cache figure miss
+def build_unit_bar_figure(filter_year, filter_vessels):
+    unit_counts = db.get_unit_counts(filter_year, filter_vessels, limit=10)
     unit_counts.columns = ['Unit', 'Jumlah Kerusakan']
     
     fig_unit_bar = px.bar(
@@ -182,32 +125,47 @@ with tab_unit:
         orientation='h'
     )
     fig_unit_bar.update_layout(xaxis_title="Jumlah Kerusakan", yaxis_title="")
-    col_bar.plotly_chart(fig_unit_bar, use_container_width=True)
+    return fig_unit_bar
+
+def build_unit_pie_figure(filter_year, filter_vessels):
+    top_units = db.get_unit_counts(filter_year, filter_vessels, limit=5)['unit'].tolist()
+    if not top_units:
+        return None
+    status_counts_top_unit = db.get_status_counts_for_units(top_units, filter_year, filter_vessels)
+    status_counts_top_unit.columns = ['Status', 'Count']
     
-    top_units = unit_counts['Unit'].head(5).tolist()
-    if top_units:
-        df_top_unit = df_filtered[df_filtered['unit'].isin(top_units)]
-        
-        status_counts_top_unit = df_top_unit['status'].value_counts().reset_index()
-        status_counts_top_unit.columns = ['Status', 'Count']
-        
-        fig_unit_pie = px.pie(
-            status_counts_top_unit,
-            values='Count',
-            names='Status',
-            title=f'Status Laporan pada Top {len(top_units)} Unit',
-            hole=0.3,
-            color_discrete_map={'OPEN':'red', 'CLOSED':'green'}
-        )
+    return px.pie(
+        status_counts_top_unit,
+        values='Count',
+        names='Status',
+        title=f'Status Laporan pada Top {len(top_units)} Unit',
+        hole=0.3,
+        color_discrete_map={'OPEN':'red', 'CLOSED':'green'}
+    )
+
+def render_unit_panel(filter_year, filter_vessels):
+    """Top 10 unit paling bermasalah + komposisi status pada top 5 unit"""
+    st.subheader("Penyebaran Kerusakan berdasarkan Unit/Sistem")
+    
+    col_bar, col_spacer, col_pie = st.columns([2, 0.1, 1])
+
+    current_profile().lap('widget emission')
+    token = db.data_token()
+    fig_unit_bar = cached_figure('unit_bar', filter_year, filter_vessels, token,
+                                 lambda: build_unit_bar_figure(filter_year, filter_vessels))
+    fig_unit_pie = cached_figure('unit_pie', filter_year, filter_vessels, token,
+                                 lambda: build_unit_pie_figure(filter_year, filter_vessels))
+    current_profile().lap('figure construction')
+
+    col_bar.plotly_chart(fig_unit_bar, use_container_width=True)
+    if fig_unit_pie is not None:
         col_pie.plotly_chart(fig_unit_pie, use_container_width=True)
     else:
         col_pie.info("Tidak cukup data untuk analisis Top Unit.")
 
-# --- TAB 2: KINERJA KAPAL ---
-with tab_vessel:
-    st.subheader("Analisis Kinerja Kerusakan per Kapal")
-
-    vessel_counts = df_filtered['vessel'].value_counts().reset_index()
+# --- PANEL 2: KINERJA KAPAL ---
+def build_vessel_bar_figure(filter_year, filter_vessels):
+    vessel_counts = db.get_vessel_counts(filter_year, filter_vessels)
     vessel_counts.columns = ['Vessel', 'Total Kerusakan']
     
     fig_vessel_bar = px.bar(
@@ -220,11 +178,23 @@ with tab_vessel:
         orientation='h'
     )
     fig_vessel_bar.update_layout(xaxis_title="Jumlah Kerusakan", yaxis_title="")
+    return fig_vessel_bar
+
+def render_vessel_panel(filter_year, filter_vessels):
+    """Total kerusakan per kapal + tabel laporan OPEN per kapal"""
+    st.subheader("Analisis Kinerja Kerusakan per Kapal")
+
+    current_profile().lap('widget emission')
+    fig_vessel_bar = cached_figure('vessel_bar', filter_year, filter_vessels, db.data_token(),
+                                   lambda: build_vessel_bar_figure(filter_year, filter_vessels))
+    current_profile().lap('figure construction')
     st.plotly_chart(fig_vessel_bar, use_container_width=True)
 
     st.markdown("##### Laporan OPEN Terbanyak per Kapal")
-    df_vessel_open = df_filtered[df_filtered['status'] == 'OPEN']
-    vessel_open_counts = df_vessel_open.groupby('vessel').size().sort_values(ascending=False).reset_index(name='Jumlah OPEN')
+    current_profile().lap('widget emission')
+    vessel_open_counts = db.get_vessel_counts(filter_year, filter_vessels, status='OPEN')
+    vessel_open_counts.columns = ['vessel', 'Jumlah OPEN']
+    current_profile().lap('data load')
     
     st.data_editor(
         vessel_open_counts,
@@ -242,14 +212,10 @@ with tab_vessel:
         disabled=True 
     )
 
-# --- TAB 3: TREN KERUSAKAN ---
-with tab_time:
-    st.subheader("Tren Laporan Kerusakan dari Waktu ke Waktu")
-    
-    df_filtered['Month'] = df_filtered['Date_Day'].dt.to_period('M')
-    
-    monthly_trend = df_filtered.groupby(['Month', 'status']).size().reset_index(name='Jumlah')
-    monthly_trend['Month'] = monthly_trend['Month'].astype(str)
+# --- PANEL 3: TREN KERUSAKAN ---
+def build_trend_figure(filter_year, filter_vessels):
+    monthly_trend = db.get_monthly_trend(filter_year, filter_vessels)
+    monthly_trend.columns = ['Month', 'status', 'Jumlah']
     
     fig_trend = px.line(
         monthly_trend,
@@ -261,54 +227,68 @@ with tab_time:
         color_discrete_map={'OPEN':'red', 'CLOSED':'green'}
     )
     fig_trend.update_layout(xaxis_title="Bulan", yaxis_title="Jumlah Laporan")
+    return fig_trend
+
+def build_timeline_figure(filter_year, filter_vessels):
+    df_open_timeline = db.get_oldest_open(filter_year, filter_vessels, limit=15)
+    if df_open_timeline.empty:
+        return None
+
+    df_open_timeline['Date_Day'] = pd.to_datetime(df_open_timeline['day_iso'])
+    df_open_timeline['Duration'] = df_open_timeline['duration_days']
+    
+    df_open_timeline['Current_Time'] = datetime.now()
+    
+    df_open_timeline['Label'] = df_open_timeline['vessel'] + ' - ' + df_open_timeline['permasalahan'].str.slice(0, 30) + '...'
+
+    fig_timeline = px.timeline(
+        df_open_timeline,
+        x_start="Date_Day",
+        x_end="Current_Time", 
+        y="Label",
+        color="vessel",
+        title="Timeline Durasi 15 Laporan OPEN Terlama",
+        text="Duration"
+    )
+    fig_timeline.update_yaxes(autorange="reversed") 
+    fig_timeline.update_traces(textposition='inside', marker_line_width=0, opacity=0.8) 
+    fig_timeline.update_layout(xaxis_title="Tanggal", yaxis_title="")
+    return fig_timeline
+
+def render_trend_panel(filter_year, filter_vessels):
+    """Tren bulanan OPEN vs CLOSED + timeline 15 laporan OPEN terlama"""
+    st.subheader("Tren Laporan Kerusakan dari Waktu ke Waktu")
+    
+    current_profile().lap('widget emission')
+    token = db.data_token()
+    fig_trend = cached_figure('trend', filter_year, filter_vessels, token,
+                              lambda: build_trend_figure(filter_year, filter_vessels))
+    # Durasi timeline dihitung sampai hari ini: figure berlaku per tanggal
+    fig_timeline = cached_figure(f"timeline:{date.today().isoformat()}", filter_year, filter_vessels, token,
+                                 lambda: build_timeline_figure(filter_year, filter_vessels))
+    current_profile().lap('figure construction')
+
     st.plotly_chart(fig_trend, use_container_width=True)
     
     st.markdown("##### Timeline 15 Permasalahan Aktif (OPEN) Terlama")
     
-    df_open_timeline = df_filtered[df_filtered['status'] == 'OPEN'].copy()
-    
-    if not df_open_timeline.empty:
-        df_open_timeline['Duration'] = (datetime.now() - df_open_timeline['Date_Day']).dt.days
-        df_open_timeline = df_open_timeline.sort_values('Duration', ascending=False).head(15).copy()
-        
-        df_open_timeline['Current_Time'] = datetime.now()
-        
-        df_open_timeline['Label'] = df_open_timeline['vessel'] + ' - ' + df_open_timeline['permasalahan'].str.slice(0, 30) + '...'
-
-        fig_timeline = px.timeline(
-            df_open_timeline,
-            x_start="Date_Day",
-            x_end="Current_Time", 
-            y="Label",
-            color="vessel",
-            title="Timeline Durasi 15 Laporan OPEN Terlama",
-            text="Duration"
-        )
-        fig_timeline.update_yaxes(autorange="reversed") 
-        fig_timeline.update_traces(textposition='inside', marker_line_width=0, opacity=0.8) 
-        fig_timeline.update_layout(xaxis_title="Tanggal", yaxis_title="")
+    if fig_timeline is not None:
         st.plotly_chart(fig_timeline, use_container_width=True)
     else:
         st.info("Tidak ada laporan yang berstatus OPEN dalam kombinasi filter ini.")
 
-# --- TAB 4: METRIK EFISIENSI (MTTR) ---
-with tab_kpi:
+# --- PANEL 4: METRIK EFISIENSI (MTTR) ---
+def render_mttr_panel(filter_year, filter_vessels):
+    """MTTR per unit (tercepat dulu)"""
     st.subheader("🏆 Metrik Efisiensi Perbaikan (MTTR)")
     
-    df_closed_mttr = df_filtered[df_filtered['status'] == 'CLOSED'].copy()
+    current_profile().lap('widget emission')
+    mttr_display = db.get_mttr_by_unit(filter_year, filter_vessels)
+    current_profile().lap('data load')
 
-    if not df_closed_mttr.empty:
-        # 1. Hitung MTTR (rata-rata Resolution_Time_Days) per Unit
-        mttr_unit = df_closed_mttr.groupby('unit')['Resolution_Time_Days'].mean().reset_index(name='MTTR (Hari)')
-
-        # 2. Hitung Jumlah Kerusakan (untuk konteks)
-        failure_counts = df_filtered.groupby('unit').size().reset_index(name='Jumlah Kerusakan')
-        
-        # 3. Gabungkan dan sort
-        mttr_display = pd.merge(mttr_unit, failure_counts, on='unit', how='left').fillna({'Jumlah Kerusakan': 0})
-        
-        # SORTING: Diurutkan dari yang tercepat (MTTR terkecil/Ascending)
-        mttr_display = mttr_display.sort_values(by='MTTR (Hari)', ascending=True).reset_index(drop=True)
+    if not mttr_display.empty:
+        # MTTR per Unit + jumlah kerusakan (konteks), sudah diurutkan dari yang tercepat
+        mttr_display.columns = ['unit', 'MTTR (Hari)', 'Jumlah Kerusakan']
 
         st.info("Analisis **MTTR (Mean Time to Repair)** dihitung dari laporan yang sudah CLOSED dan diurutkan berdasarkan **waktu perbaikan tercepat**.")
 
@@ -336,10 +316,46 @@ with tab_kpi:
     else:
         st.warning("Tidak ada laporan yang berstatus CLOSED dalam kombinasi filter ini, sehingga MTTR per Unit tidak dapat dihitung.")
 
+PANELS = {
+    "📊 Analisis Unit/Sistem": render_unit_panel,
+    "⚓ Kinerja Kapal": render_vessel_panel,
+    "📈 Tren Kerusakan": render_trend_panel,
+    "🏆 Metrik Efisiensi (MTTR)": render_mttr_panel,
+}
+
+@st.fragment
+def render_selected_panel(filter_year, filter_vessels):
+    """Pemilih panel + panel terpilih; ganti panel hanya me-rerun fragment ini.
+
+    Rerun fragment diprofil terpisah sebagai 'analisis_dashboard:fragment'.
+    """
+    fragment_profile = start_fragment_profile('analisis_dashboard:fragment')
+    selected_panel = st.radio(
+        "Panel Analisis", list(PANELS), horizontal=True,
+        key="dashboard_panel", label_visibility="collapsed"
+    )
+    PANELS[selected_panel](filter_year, filter_vessels)
+    fragment_profile.lap('widget emission')
+    fragment_profile.finish()
+
+# --- Cek data kosong global ---
+if total == 0:
+    st.info("Tidak ada data untuk kombinasi filter yang dipilih.")
+    profile.lap('widget emission')
+    profile.finish()
+    st.stop()
+
+with profile.phase('panel analisis (fragment)'):
+    render_selected_panel(filter_year, filter_vessels)
+
 # --- PERBAIKAN: Tambahkan tombol refresh ---
 st.markdown("---")
 if st.button("🔄 Refresh Dashboard", use_container_width=True):
-    st.cache_data.clear()
+    db.clear_cache()
+    figure_cache.clear()
     st.rerun()
 
-st.info("ℹ️ Dashboard menampilkan data real-time dari database. Gunakan tombol refresh untuk data terbaru.")
\ No newline at end of file
+st.info("ℹ️ Dashboard menampilkan data real-time dari database. Gunakan tombol refresh untuk data terbaru.")
+
+profile.lap('widget emission')
+profile.finish()
@@ -0,0 +1,124 @@
+import streamlit as st
+from datetime import datetime
+from database import db
+from figure_cache import figure_cache
+
+# --- Logika Autentikasi Halaman (khusus admin) ---
+if 'logged_in' not in st.session_state or not st.session_state.logged_in:
+    st.error("Anda harus login untuk mengakses halaman ini. Silakan kembali ke halaman utama.")
+    st.stop() 
+
+if not st.session_state.get('is_admin', False):
+    st.error("Halaman ini hanya untuk admin.")
+    st.stop()
+
+def format_bytes(size):
+    """Byte -> teks singkat (KB/MB)"""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):,.1f} MB"
+    return f"{size / 1024:,.1f} KB"
+
+st.title("🛠️ Monitor Sistem (Admin)")
+
+# Overlay profil render halaman (page_profiler), berlaku untuk sesi admin ini
+st.session_state.show_page_profile = st.toggle(
+    "Tampilkan profil render halaman (overlay debug di sidebar)",
+    value=st.session_state.get('show_page_profile', False),
+    help="Rincian waktu per fase setiap rerun di Homepage, Laporan Aktif, dan Analisis Dashboard. "
+         "Set env LAPORAN_PROFILE_LOG=path.jsonl untuk export ke file JSON lines.",
+)
+
+# --- Snapshot bersama ---
+st.markdown("##### Snapshot Data Laporan (dibagi semua sesi)")
+snapshot = db.laporan_snapshot.stats()
+col_rows, col_mem, col_hit, col_loads = st.columns(4)
+col_rows.metric("Baris", f"{snapshot['rows']:,}")
+col_mem.metric("Memori", format_bytes(snapshot['bytes']))
+col_hit.metric("Hit Rate", f"{snapshot['hit_rate']:.1%}")
+col_loads.metric("Dimuat Ulang", snapshot['loads'])
+if snapshot['loaded_at']:
+    st.caption(f"Terakhir dimuat: {datetime.fromtimestamp(snapshot['loaded_at']).strftime('%d/%m/%Y %H:%M:%S')} "
+               f"({snapshot['keys']} kapal, {snapshot['hits']:,} hit, {snapshot['patches']:,} kali ditambal delta, "
+               f"watermark changelog {snapshot['watermark']})")
+else:
+    st.caption("Snapshot belum dimuat oleh sesi mana pun.")
+
+# --- Cache hasil query ---
+st.markdown("##### Cache Hasil Query")
+cache = db.query_cache.stats()
+col_entries, col_cache_mem, col_cache_hit, col_evict = st.columns(4)
+col_entries.metric("Entri", cache['entries'])
+col_cache_mem.metric("Memori", f"{format_bytes(cache['bytes'])} / {format_bytes(cache['max_bytes'])}")
+col_cache_hit.metric("Hit Rate", f"{cache['hit_rate']:.1%}")
+col_evict.metric("Eviction", cache['evictions'])
+st.caption(f"{cache['hits']:,} hit, {cache['misses']:,} miss sejak proses dimulai.")
+
+figures = figure_cache.stats()
+st.caption(f"Cache figure dashboard: {figures['entries']} figure, {format_bytes(figures['bytes'])}, "
+           f"hit rate {figures['hit_rate']:.1%} ({figures['hits']:,} hit, {figures['misses']:,} miss, "
+           f"{figures['evictions']:,} eviction).")
+
+# --- Registry & index pencarian kapal ---
+st.markdown("##### Registry Kapal & Index Pencarian")
+with st.form("form_add_vessel", clear_on_submit=True):
+    col_code, col_submit = st.columns([3, 1])
+    new_vessel = col_code.text_input("Kode kapal baru", placeholder="contoh: KM SINAR", label_visibility="collapsed")
+    if col_submit.form_submit_button("➕ Daftarkan Kapal", use_container_width=True):
+        if not new_vessel.strip():
+            st.error("Kode kapal wajib diisi.")
+        elif db.add_vessel(new_vessel):
+            st.success(f"Kapal {new_vessel.strip().upper()} didaftarkan; tampil di Homepage walau belum ada laporan.")
+        else:
+            st.info(f"Kapal {new_vessel.strip().upper()} sudah terdaftar.")
+registry = db.get_vessel_registry()
+db.search_vessels('')  # pastikan index sudah mengikuti registry terbaru
+index = db.vessel_index.stats()
+st.caption(f"{len(registry):,} kapal terdaftar · index {index['vessels']:,} kode, {index['grams']:,} n-gram, "
+           f"dibangun {index['builds']}× (terakhir {index['build_ms']:,.1f} ms).")
+
+# --- Latensi query ---
+st.markdown("##### Latensi Query (jendela terakhir per query)")
+metrics = db.query_metrics
+threshold = st.number_input("Ambang query lambat (ms)", min_value=1.0, value=float(metrics.slow_query_ms), step=50.0)
+if threshold != metrics.slow_query_ms:
+    metrics.slow_query_ms = threshold
+
+summary = metrics.summary()
+if summary.empty:
+    st.caption("Belum ada query yang tercatat sejak proses dimulai.")
+else:
+    st.dataframe(
+        summary.rename(columns={
+            'kind': 'Jenis', 'name': 'Query', 'calls': 'Panggilan', 'p50_ms': 'p50 (ms)', 'p95_ms': 'p95 (ms)',
+            'p99_ms': 'p99 (ms)', 'max_ms': 'Max (ms)', 'avg_rows': 'Rata-rata Baris', 'bytes': 'Total Byte',
+            'slow': 'Lambat',
+        }),
+        hide_index=True, use_container_width=True,
+        column_config={column: st.column_config.NumberColumn(format="%.1f")
+                       for column in ['p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Max (ms)', 'Rata-rata Baris']},
+    )
+    st.caption("Jenis 'method' = panggilan DatabaseManager (termasuk hit cache), "
+               "'sql' = pd.read_sql yang benar-benar dijalankan ke SQLite.")
+
+    labels = [f"{row.kind} · {row.name}" for row in summary.itertuples()]
+    selected = st.selectbox("Histogram latensi", range(len(labels)), format_func=lambda i: labels[i])
+    histogram = metrics.histogram(summary.at[selected, 'kind'], summary.at[selected, 'name'])
+    st.bar_chart(histogram, x='bucket', y='count', x_label='Latensi', y_label='Jumlah', sort=False)
+
+slow_queries = list(metrics.slow_queries)
+if slow_queries:
+    st.markdown(f"**Query lambat terakhir** (≥ {metrics.slow_query_ms:,.0f} ms)")
+    for entry in reversed(slow_queries[-10:]):
+        st.caption(f"{datetime.fromtimestamp(entry['time']).strftime('%H:%M:%S')} · {entry['kind']} "
+                   f"{entry['name']} · {entry['ms']:,.1f} ms · {entry['rows']} baris")
+        st.code(entry['detail'], language='sql')
+
+st.markdown("---")
+col_clear, col_reset = st.columns(2)
+if col_clear.button("🧹 Kosongkan Cache", use_container_width=True):
+    db.clear_cache()
+    figure_cache.clear()
+    st.rerun()
+if col_reset.button("📉 Reset Statistik Query", use_container_width=True):
+    metrics.reset()
+    st.rerun()
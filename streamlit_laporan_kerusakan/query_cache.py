@@ -0,0 +1,227 @@
+import copy
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# Batas default cache hasil query per proses
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Perkiraan ukuran memori (byte) hasil query: DataFrame, tuple/list/dict, atau skalar"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """Argumen query -> bentuk hashable untuk key cache (list/set/dict menjadi tuple)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class QueryCache:
+    """Cache LRU hasil query dengan batas jumlah entri dan memori.
+
+    Setiap entri berlaku untuk satu token versi data; begitu token berubah
+    (ada penulisan) seluruh isi cache dibuang. Hasil yang dikembalikan selalu
+    salinan, jadi pemanggil bebas memodifikasi DataFrame-nya.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._token = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, token, loader):
+        """Ambil hasil untuk key pada versi data token, atau jalankan loader() lalu simpan"""
+        with self._lock:
+            if token != self._token:
+                self._clear_locked()
+                self._token = token
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+
+        value = loader()
+        size = estimate_size(value)
+        with self._lock:
+            # Data berubah selama loader berjalan: hasil tidak disimpan
+            if token == self._token and size <= self.max_bytes:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[1]
+                self._entries[key] = (copy.deepcopy(value), size)
+                self._bytes += size
+                self._evict_locked()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self):
+        """Statistik cache untuk monitoring: entri, byte, hit, miss, eviction, hit rate"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict_locked(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+class SharedSnapshot:
+    """Snapshot read-only satu tabel (DataFrame) yang dibagi semua sesi dalam proses.
+
+    loader() -> (frame, watermark) memuat tabel lengkap. Jika delta_loader
+    diberikan, perubahan berikutnya ditambal dari delta_loader(watermark) ->
+    (baris berubah, id terhapus, watermark baru) alih-alih memuat ulang semua;
+    delta yang terlalu besar (> max_delta_ratio dari jumlah baris) atau None
+    (delta tidak lagi tersedia) tetap memuat ulang.
+    Snapshot baru dibangun lalu ditukar dengan satu assignment, jadi pembaca
+    tidak pernah melihat snapshot setengah jadi dan pembaca lama tetap memegang
+    versi sebelumnya. Frame snapshot jangan diubah in-place; ambil subset lewat rows_for().
+    """
+
+    def __init__(self, key_column, loader, delta_loader=None, id_column='id',
+                 sort_by=None, ascending=True, max_delta_ratio=0.25):
+        self.key_column = key_column
+        self.loader = loader
+        self.delta_loader = delta_loader
+        self.id_column = id_column
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self.max_delta_ratio = max_delta_ratio
+        self._load_lock = threading.Lock()   # hanya satu thread yang memuat ulang
+        self._stats_lock = threading.Lock()
+        # (token, frame, posisi baris per key, ukuran byte, waktu muat, watermark)
+        self._state = None
+        self.hits = 0
+        self.loads = 0
+        self.patches = 0
+
+    def _get_state(self, token):
+        state = self._state
+        if state is None or state[0] != token:
+            with self._load_lock:
+                state = self._state
+                if state is None or state[0] != token:
+                    state = self._refresh(token, state)
+                    self._state = state
+                    return state
+        with self._stats_lock:
+            self.hits += 1
+        return state
+
+    def _refresh(self, token, state):
+        frame = None
+        if state is not None and self.delta_loader is not None:
+            delta = self.delta_loader(state[5])
+            if delta is not None:
+                rows, deleted_ids, watermark = delta
+            if delta is not None and len(rows) + len(deleted_ids) <= self.max_delta_ratio * max(len(state[1]), 1):
+                frame = self._patch(state[1], rows, deleted_ids)
+                with self._stats_lock:
+                    self.patches += 1
+        if frame is None:
+            frame, watermark = self.loader()
+            with self._stats_lock:
+                self.loads += 1
+        positions = frame.groupby(self.key_column, sort=False).indices if len(frame) else {}
+        return (token, frame, positions, estimate_size(frame), time.time(), watermark)
+
+    def _patch(self, frame, rows, deleted_ids):
+        """Buang baris yang berubah/terhapus, tambahkan versi terkininya, urutkan ulang"""
+        if not len(rows) and not len(deleted_ids):
+            return frame
+        stale = set(deleted_ids) | set(rows[self.id_column])
+        kept = frame[~frame[self.id_column].isin(stale)]
+        if not len(rows):
+            patched = kept
+        elif not len(kept):
+            patched = rows
+        else:
+            patched = pd.concat([kept, rows], ignore_index=True)
+        # concat category dengan kategori berbeda menghasilkan object: kembalikan ke category
+        for column, dtype in frame.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype) and not isinstance(patched[column].dtype, pd.CategoricalDtype):
+                patched[column] = patched[column].astype('category')
+        if self.sort_by:
+            patched = patched.sort_values(self.sort_by, ascending=self.ascending, kind='stable')
+        return patched.reset_index(drop=True)
+
+    def frame(self, token):
+        """Frame snapshot lengkap (dibagi, read-only)"""
+        return self._get_state(token)[1]
+
+    def rows_for(self, key, token):
+        """Salinan baris dengan key_column == key, urutan sama dengan snapshot"""
+        state = self._get_state(token)
+        return state[1].take(state[2].get(key, [])).reset_index(drop=True)
+
+    def stats(self):
+        """Statistik snapshot untuk monitoring: baris, byte, hit, load, patch, hit rate, waktu muat"""
+        state = self._state
+        with self._stats_lock:
+            requests = self.hits + self.loads + self.patches
+            return {
+                'rows': len(state[1]) if state else 0,
+                'keys': len(state[2]) if state else 0,
+                'bytes': state[3] if state else 0,
+                'loaded_at': state[4] if state else None,
+                'watermark': state[5] if state else None,
+                'hits': self.hits,
+                'loads': self.loads,
+                'patches': self.patches,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+
+def cached_query(method):
+    """Decorator method baca DatabaseManager: hasil di-cache per (nama method, argumen).
+
+    Memakai self.query_cache dan self.data_token() sebagai versi data.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, _freeze(args), _freeze(kwargs))
+        return self.query_cache.get_or_load(key, self.data_token(), lambda: method(self, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,159 @@
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Ambang query lambat (ms), bisa diganti lewat env LAPORAN_SLOW_QUERY_MS atau halaman admin
+DEFAULT_SLOW_QUERY_MS = 250
+# Jumlah latensi terakhir per query yang disimpan untuk persentil/histogram
+DEFAULT_WINDOW = 1000
+# Jumlah query lambat terakhir yang ditampilkan di halaman admin
+SLOW_LOG_SIZE = 50
+# Batas atas bucket histogram latensi (ms)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Method DatabaseManager yang sedang berjalan (paling dalam), untuk memberi nama SQL di read_sql
+_current_query = contextvars.ContextVar('current_query', default=None)
+
+
+def _result_rows(result):
+    """Jumlah baris hasil method: DataFrame/list, atau elemen pertama tuple (df, cursor)"""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    return None
+
+
+def _short(value, limit=300):
+    text = ' '.join(str(value).split())
+    return text if len(text) <= limit else text[:limit] + '…'
+
+
+class QueryMetrics:
+    """Statistik latensi per query dalam proses: method DatabaseManager dan SQL pd.read_sql.
+
+    Setiap (jenis, nama) menyimpan total panggilan/baris/byte dan jendela
+    latensi terakhir (rolling) untuk persentil dan histogram. Panggilan yang
+    melewati slow_query_ms dicatat ke logger modul ini beserta SQL/argumennya.
+    """
+
+    def __init__(self, slow_query_ms=None, window=DEFAULT_WINDOW):
+        if slow_query_ms is None:
+            slow_query_ms = float(os.environ.get('LAPORAN_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS))
+        self.slow_query_ms = slow_query_ms
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats = {}  # (jenis, nama) -> dict statistik
+        self.slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+
+    def record(self, kind, name, seconds, rows=None, nbytes=None, detail=None):
+        """Catat satu panggilan; kind 'method' atau 'sql'.
+
+        detail: fungsi -> teks SQL/argumen, hanya dipanggil jika query lambat.
+        """
+        elapsed_ms = seconds * 1000
+        slow = elapsed_ms >= self.slow_query_ms
+        detail = detail() if slow and detail is not None else None
+        with self._lock:
+            stats = self._stats.get((kind, name))
+            if stats is None:
+                stats = self._stats[(kind, name)] = {
+                    'calls': 0, 'total_ms': 0.0, 'rows': 0, 'bytes': 0, 'slow': 0,
+                    'latencies': deque(maxlen=self.window),
+                }
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['rows'] += rows or 0
+            stats['bytes'] += nbytes or 0
+            stats['slow'] += slow
+            stats['latencies'].append(elapsed_ms)
+            if slow:
+                self.slow_queries.append({
+                    'time': time.time(), 'kind': kind, 'name': name,
+                    'ms': elapsed_ms, 'rows': rows, 'detail': detail,
+                })
+        if slow:
+            logger.warning("Query lambat %.1f ms [%s %s]: %s", elapsed_ms, kind, name, detail)
+
+    def read_sql(self, sql, con, params=None):
+        """pd.read_sql yang dicatat latensi, jumlah baris, dan byte hasilnya"""
+        started = time.perf_counter()
+        frame = pd.read_sql(sql, con, params=params)
+        elapsed = time.perf_counter() - started
+        self.record('sql', _current_query.get() or 'read_sql', elapsed, rows=len(frame),
+                    nbytes=int(frame.memory_usage(index=True, deep=True).sum()),
+                    detail=lambda: f"{_short(sql)} params={_short(params)}")
+        return frame
+
+    def summary(self):
+        """DataFrame per query: panggilan, p50/p95/p99/max (ms, dari jendela terakhir),
+        rata-rata baris, total byte, jumlah lambat; urut p95 terbesar"""
+        with self._lock:
+            items = [(key, dict(stats, latencies=np.array(stats['latencies'])))
+                     for key, stats in self._stats.items()]
+        records = []
+        for (kind, name), stats in items:
+            p50, p95, p99 = np.percentile(stats['latencies'], [50, 95, 99])
+            records.append({
+                'kind': kind, 'name': name, 'calls': stats['calls'],
+                'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': stats['latencies'].max(),
+                'avg_rows': stats['rows'] / stats['calls'], 'bytes': stats['bytes'], 'slow': stats['slow'],
+            })
+        columns = ['kind', 'name', 'calls', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'avg_rows', 'bytes', 'slow']
+        return pd.DataFrame(records, columns=columns).sort_values('p95_ms', ascending=False, ignore_index=True)
+
+    def histogram(self, kind, name):
+        """Histogram jendela latensi satu query: DataFrame bucket ('≤ N ms') dan count"""
+        with self._lock:
+            stats = self._stats.get((kind, name))
+            latencies = np.array(stats['latencies']) if stats else np.array([])
+        edges = np.array((0,) + LATENCY_BUCKETS_MS + (np.inf,))
+        counts, _ = np.histogram(latencies, bins=edges)
+        labels = [f"≤ {edge} ms" for edge in LATENCY_BUCKETS_MS] + [f"> {LATENCY_BUCKETS_MS[-1]} ms"]
+        return pd.DataFrame({'bucket': labels, 'count': counts})
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries.clear()
+
+
+def instrument_methods(exclude=()):
+    """Class decorator: catat latensi dan jumlah baris setiap method publik ke self.query_metrics.
+
+    Method di exclude (helper murah/infrastruktur) tidak dibungkus.
+    """
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(method):
+                continue
+            setattr(cls, name, _timed_method(method))
+        return cls
+    return decorate
+
+
+def _timed_method(method):
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        token = _current_query.set(name)
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            _current_query.reset(token)
+        elapsed = time.perf_counter() - started
+        self.query_metrics.record('method', name, elapsed, rows=_result_rows(result),
+                                  detail=lambda: f"args={_short(args)} kwargs={_short(kwargs)}")
+        return result
+    return wrapper
@@ -0,0 +1,163 @@
+"""Benchmark throughput baca/tulis DatabaseManager dengan 1, 8, dan 32 thread.
+
+Membandingkan connection pool (WAL + PRAGMA tuning) dengan pola lama:
+sqlite3.connect/close di setiap query dengan rollback journal default.
+Skenario baca menjalankan SQL yang sama di kedua sisi lewat koneksi pool
+(PooledReader), tanpa query cache maupun snapshot bersama, jadi yang diukur
+tetap baca SQLite, bukan hit cache.
+
+Jalankan dari folder streamlit_laporan_kerusakan:
+    python scripts/bench_connection_pool.py --rows 2000 --seconds 3
+"""
+import argparse
+import itertools
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from database import DatabaseManager
+
+VESSELS = [f'KM{i:02d}' for i in range(40)]
+THREAD_COUNTS = (1, 8, 32)
+# Nomor urut di permasalahan: content_hash UNIQUE menolak laporan yang isinya sama
+_sample_ids = itertools.count(1)
+
+# Query baca yang dibandingkan (sama untuk legacy dan pool)
+READ_BY_VESSEL_SQL = '''
+    SELECT * FROM laporan_kerusakan WHERE vessel = ?
+    ORDER BY CASE WHEN status = 'OPEN' THEN 1 ELSE 2 END, created_at DESC
+'''
+
+
+def sample_laporan():
+    return {
+        'Day': '01/02/2024',
+        'Vessel': random.choice(VESSELS),
+        'Permasalahan': f'Pompa pendingin bocor #{next(_sample_ids)}',
+        'Penyelesaian': 'Ganti seal pompa',
+        'Unit': 'PUMP',
+        'Issued Date': '01/02/2024',
+        'Closed Date': '',
+        'Keterangan': '',
+        'Status': random.choice(['OPEN', 'CLOSED']),
+    }
+
+
+class LegacyManager:
+    """Pola sebelum connection pool: satu koneksi baru per operasi"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def get_laporan_by_vessel(self, vessel):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            return pd.read_sql(READ_BY_VESSEL_SQL, conn, params=[vessel])
+        finally:
+            conn.close()
+
+    def add_laporan(self, data):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        try:
+            c = conn.execute('''
+                INSERT INTO laporan_kerusakan
+                (day, vessel, permasalahan, penyelesaian, unit, issued_date, closed_date, keterangan, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (data['Day'], data['Vessel'], data['Permasalahan'], data['Penyelesaian'], data['Unit'],
+                  data['Issued Date'], data['Closed Date'], data['Keterangan'], data['Status']))
+            conn.commit()
+            return c.lastrowid
+        finally:
+            conn.close()
+
+
+class PooledReader:
+    """DatabaseManager dengan baca langsung ke SQLite lewat koneksi pool.
+
+    get_laporan_by_vessel DatabaseManager dilayani snapshot bersama / query cache,
+    jadi di sini SQL dijalankan sendiri di get_connection(). Tulis tetap add_laporan.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def get_laporan_by_vessel(self, vessel):
+        return pd.read_sql(READ_BY_VESSEL_SQL, self.manager.get_connection(), params=[vessel])
+
+    def add_laporan(self, data):
+        return self.manager.add_laporan(data)
+
+
+def run_threads(n_threads, seconds, operation):
+    """Jalankan operation() berulang di n_threads thread, return ops/detik"""
+    counts = [0] * n_threads
+    errors = []
+    deadline = time.perf_counter() + seconds
+
+    def worker(idx):
+        while time.perf_counter() < deadline:
+            try:
+                operation()
+                counts[idx] += 1
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed, len(errors)
+
+
+def seed(manager, rows):
+    for _ in range(rows):
+        manager.add_laporan(sample_laporan())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000, help='jumlah laporan awal')
+    parser.add_argument('--seconds', type=float, default=3.0, help='durasi per skenario')
+    args = parser.parse_args()
+    # Tulis 32 thread memang antre lock; jangan dicatat sebagai query lambat
+    logging.getLogger('query_metrics').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pooled = DatabaseManager(os.path.join(tmp, 'pooled.db'))
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        DatabaseManager(legacy_path).close_all()
+        sqlite3.connect(legacy_path).execute('PRAGMA journal_mode=DELETE').fetchone()
+        legacy = LegacyManager(legacy_path)
+        seed(pooled, args.rows)
+        seed(legacy, args.rows)
+
+        print(f"{'skenario':<8} {'thread':>6} {'legacy ops/s':>14} {'pool ops/s':>12} {'speedup':>8}  locked(legacy/pool)")
+        for label, op_name in (('read', 'get_laporan_by_vessel'), ('write', 'add_laporan')):
+            for n in THREAD_COUNTS:
+                results = []
+                for manager in (legacy, PooledReader(pooled)):
+                    method = getattr(manager, op_name)
+                    if op_name == 'add_laporan':
+                        operation = lambda method=method: method(sample_laporan())
+                    else:
+                        operation = lambda method=method: method(random.choice(VESSELS))
+                    results.append(run_threads(n, args.seconds, operation))
+                (legacy_ops, legacy_err), (pool_ops, pool_err) = results
+                print(f"{label:<8} {n:>6} {legacy_ops:>14.0f} {pool_ops:>12.0f} {pool_ops / legacy_ops:>7.1f}x  {legacy_err}/{pool_err}")
+
+        pooled.close_all()
+
+
+if __name__ == '__main__':
+    main()
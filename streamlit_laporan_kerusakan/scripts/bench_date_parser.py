@@ -0,0 +1,84 @@
+"""Benchmark parse tanggal: Series.apply(parse_date) lama vs date_utils.parse_date_series.
+
+Data sintetis campuran format seperti data asli: M/D/YYYY (migrasi CSV),
+DD/MM/YYYY (input aplikasi), YYYY-MM-DD, sel kosong/'nan', dan sedikit teks rusak.
+
+Jalankan dari folder streamlit_laporan_kerusakan:
+    python scripts/bench_date_parser.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from date_utils import parse_date_series
+
+
+def legacy_parse_date(date_str):
+    """parse_date lama di pages/2 dan pages/3 (tanpa memo, dipanggil per sel)"""
+    if pd.isna(date_str) or date_str == '':
+        return pd.NaT
+    date_str = str(date_str).strip()
+    formats = ['%m/%d/%Y', '%d/%m/%Y', '%d/%m/%Y', '%Y-%m-%d', '%y-%m-%d', '%Y/%m/%d']
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return pd.NaT
+
+
+def sample_dates(rows, seed=42):
+    rng = random.Random(seed)
+    start = date(2019, 1, 1)
+    days = [start + timedelta(days=i) for i in range(365 * 7)]
+    values = []
+    for _ in range(rows):
+        d = rng.choice(days)
+        pick = rng.random()
+        if pick < 0.55:
+            values.append(f'{d.month}/{d.day}/{d.year}')
+        elif pick < 0.85:
+            values.append(d.strftime('%d/%m/%Y'))
+        elif pick < 0.92:
+            values.append(d.isoformat())
+        elif pick < 0.99:
+            values.append(rng.choice(['', 'nan']))
+        else:
+            values.append(rng.choice(['TBA', '31/02/2023', '2023-13-01']))
+    return pd.Series(values, dtype=object)
+
+
+def timed(func):
+    started = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    series = sample_dates(args.rows)
+    print(f"{args.rows:,} baris, {series.nunique():,} teks unik")
+
+    legacy, legacy_seconds = timed(lambda: series.apply(legacy_parse_date))
+    (vector, unparsed), vector_seconds = timed(lambda: parse_date_series(series))
+
+    legacy = pd.to_datetime(legacy)
+    same = ((legacy == vector) | (legacy.isna() & vector.isna())).all()
+    print(f"apply(parse_date)   : {legacy_seconds:8.2f} s")
+    print(f"parse_date_series   : {vector_seconds:8.2f} s  ({legacy_seconds / vector_seconds:,.0f}x lebih cepat)")
+    print(f"hasil identik       : {'ya' if same else 'TIDAK'}")
+    print(f"tidak bisa di-parse : {len(unparsed):,} baris")
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Benchmark waktu rerun Homepage (grid kartu kapal) untuk 50, 500, dan 5000 kapal.
+
+Membandingkan grid berhalaman (SHIP_CARDS_PER_PAGE kartu per rerun, filter &
+urutan di SQL) dengan semua kartu dalam satu halaman (setara grid sebelum
+paginasi). Setiap ukuran armada dijalankan di proses terpisah dengan database
+sementara, lewat streamlit.testing AppTest.
+
+Jalankan dari folder streamlit_laporan_kerusakan:
+    python scripts/bench_ship_grid.py --reports-per-vessel 3 --repeat 5
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HOMEPAGE = os.path.join(APP_DIR, 'pages', '1_homepage.py')
+FLEET_SIZES = (50, 500, 5000)
+UNITS = ['PUMP', 'ENGINE', 'GENERATOR', 'BOILER', 'STEERING']
+
+
+def seed(db_path, vessels, reports_per_vessel):
+    from database import DatabaseManager
+
+    # Insert massal seed memang lambat; jangan dicatat sebagai query lambat
+    logging.getLogger('query_metrics').setLevel(logging.ERROR)
+    manager = DatabaseManager(db_path)
+    rows = []
+    for i in range(vessels):
+        for j in range(reports_per_vessel):
+            day = f'{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/{random.choice((2023, 2024))}'
+            rows.append({
+                'Day': day, 'Vessel': f'KM{i:04d}', 'Permasalahan': f'Kerusakan {j} kapal {i}',
+                'Penyelesaian': '', 'Unit': random.choice(UNITS), 'Issued Date': day,
+                'Closed Date': '', 'Keterangan': '', 'Status': random.choice(['OPEN', 'CLOSED']),
+            })
+    manager.add_laporan_many(rows)
+    manager.close_all()
+
+
+def homepage_test(cards_per_page):
+    """AppTest Homepage; cards_per_page None = konstanta halaman apa adanya"""
+    from streamlit.testing.v1 import AppTest
+
+    if cards_per_page is None:
+        at = AppTest.from_file(HOMEPAGE, default_timeout=600)
+    else:
+        with open(HOMEPAGE, encoding='utf-8') as f:
+            source = re.sub(r'^SHIP_CARDS_PER_PAGE = \d+', f'SHIP_CARDS_PER_PAGE = {cards_per_page}',
+                            f.read(), flags=re.M)
+        at = AppTest.from_string(source, default_timeout=600)
+    at.session_state.logged_in = True
+    at.session_state.username = 'bench'
+    return at
+
+
+def timed(action):
+    started = time.perf_counter()
+    action()
+    return (time.perf_counter() - started) * 1000
+
+
+def child(vessels, repeat, cards_per_page):
+    """Ukur satu mode grid di proses ini (database global `db` sudah menunjuk ke DB benchmark)"""
+    at = homepage_test(cards_per_page)
+    cold = timed(at.run)
+    rerun = statistics.median(timed(at.run) for _ in range(repeat))
+    elements = len(at.markdown) + len(at.button)
+    search = timed(lambda: at.text_input(key='search_ship').input('KM00').run())
+    at.text_input(key='search_ship').input('').run()
+    next_buttons = [b for b in at.button if b.key == 'ship_page_next_top']
+    next_page = timed(lambda: next_buttons[0].click().run()) if next_buttons else None
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    print(json.dumps({'cold_ms': cold, 'rerun_ms': rerun, 'search_ms': search,
+                      'next_page_ms': next_page, 'elements': elements}))
+
+
+def run_child(db_path, vessels, repeat, cards_per_page):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', str(vessels), '--repeat', str(repeat)]
+    if cards_per_page is not None:
+        cmd += ['--cards-per-page', str(cards_per_page)]
+    env = dict(os.environ, LAPORAN_DB_PATH=db_path)
+    output = subprocess.run(cmd, cwd=APP_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports-per-vessel', type=int, default=3, help='jumlah laporan per kapal')
+    parser.add_argument('--repeat', type=int, default=5, help='jumlah rerun untuk median')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(FLEET_SIZES), help='jumlah kapal')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--cards-per-page', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    if args.child is not None:
+        child(args.child, args.repeat, args.cards_per_page)
+        return
+
+    print(f"{'kapal':>6} {'mode':<10} {'elemen':>7} {'cold ms':>9} {'rerun ms':>9} {'cari ms':>9} {'hal. 2 ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for vessels in args.sizes:
+            db_path = os.path.join(tmp, f'fleet_{vessels}.db')
+            seed(db_path, vessels, args.reports_per_vessel)
+            for mode, cards_per_page in (('berhalaman', None), ('semua', vessels)):
+                result = run_child(db_path, vessels, args.repeat, cards_per_page)
+                next_page = '-' if result['next_page_ms'] is None else f"{result['next_page_ms']:.0f}"
+                print(f"{vessels:>6} {mode:<10} {result['elements']:>7} {result['cold_ms']:>9.0f} "
+                      f"{result['rerun_ms']:>9.0f} {result['search_ms']:>9.0f} {next_page:>9}")
+
+
+if __name__ == '__main__':
+    main()
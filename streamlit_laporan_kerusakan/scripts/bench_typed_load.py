@@ -0,0 +1,95 @@
+"""Benchmark memori dan latensi load laporan: object string vs dtype ringkas.
+
+Membandingkan pola lama (pd.read_sql kolom object lalu normalisasi
+.astype(str).str.upper().str.strip() dan pd.to_datetime setiap load) dengan
+compact_laporan_frame (category / datetime64 / integer kecil) pada 100k dan 1M baris.
+
+Jalankan dari folder streamlit_laporan_kerusakan:
+    python scripts/bench_typed_load.py --rows 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from database import DatabaseManager, compact_laporan_frame
+
+VESSELS = [f'K{i:02d}' for i in range(60)]
+UNITS = ['MAIN ENGINE', 'AE', 'PUMP', 'CRANE', 'HATCH COVER', 'NAVIGATION', 'ELECTRICAL', 'BOILER',
+         'FUEL SYSTEM', 'STEERING SYSTEM', 'GENERAL', 'LSA', 'MOORING SYSTEM', 'PIPE', 'VALVE']
+QUERY = 'SELECT * FROM laporan_kerusakan ORDER BY status_rank DESC, created_at DESC, id DESC'
+
+
+def sample_rows(rows, seed=7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        day = f'{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(2019, 2025)}'
+        closed = rng.random() < 0.8
+        yield {
+            'Day': day,
+            'Vessel': rng.choice(VESSELS),
+            'Permasalahan': f'kerusakan {i} pada sistem',
+            'Penyelesaian': 'perbaikan selesai' if closed else '',
+            'Unit': rng.choice(UNITS),
+            'Issued Date': day,
+            'Closed Date': f'{rng.randint(1, 12)}/{rng.randint(1, 28)}/2025' if closed else '',
+            'Keterangan': '',
+            'Status': 'CLOSED' if closed else 'OPEN',
+        }
+
+
+def legacy_load(conn):
+    df = pd.read_sql(QUERY, conn)
+    for column in ('vessel', 'unit', 'status'):
+        df[column] = df[column].astype(str).str.upper().str.strip()
+    for column in ('day_iso', 'issued_iso', 'closed_iso'):
+        df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def typed_load(conn):
+    return compact_laporan_frame(pd.read_sql(QUERY, conn))
+
+
+def measure(load, conn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = load(conn)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return df.memory_usage(index=True, deep=True).sum(), best
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        started = time.perf_counter()
+        db.add_laporan_many(sample_rows(rows), chunk_size=10000)
+        print(f"\n{rows:,} baris (isi database {time.perf_counter() - started:.0f} s)")
+
+        conn = db.get_connection()
+        legacy_bytes, legacy_seconds = measure(legacy_load, conn)
+        typed_bytes, typed_seconds = measure(typed_load, conn)
+        print(f"  {'':24}{'memori':>12}{'load':>10}")
+        print(f"  {'object + normalisasi':24}{legacy_bytes / 2**20:>10.1f}MB{legacy_seconds:>9.2f}s")
+        print(f"  {'compact_laporan_frame':24}{typed_bytes / 2**20:>10.1f}MB{typed_seconds:>9.2f}s")
+        print(f"  memori {legacy_bytes / typed_bytes:.1f}x lebih kecil")
+        db.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    for rows in args.rows:
+        run(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark latensi pencarian kapal Homepage untuk 50, 500, dan 5000 kapal.
+
+Membandingkan index di memori (DatabaseManager.search_vessels: trie + n-gram)
+dengan pola lama: ringkasan semua kapal dari get_vessel_summary (cache hangat),
+dijadikan list dict, lalu dicek substring satu per satu setiap ketikan.
+
+Jalankan dari folder streamlit_laporan_kerusakan:
+    python scripts/bench_vessel_search.py --reports-per-vessel 3 10 --repeat 200
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from database import DatabaseManager
+
+FLEET_SIZES = (50, 500, 5000)
+PREFIXES = ('KM', 'TB', 'MV', 'LCT')
+# (jenis, query): prefix, substring, dan salah ketik (transposisi / huruf tertukar)
+QUERIES = (('prefix', 'KM 0'), ('substring', '012'), ('typo', 'KM 0O12'), ('typo', 'TB 1020X'))
+
+
+def vessel_code(i):
+    return f'{PREFIXES[i % len(PREFIXES)]} {i:04d}'
+
+
+def seed(manager, vessels, reports_per_vessel):
+    rows = []
+    for i in range(vessels):
+        for j in range(reports_per_vessel):
+            day = f'{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/2024'
+            rows.append({
+                'Day': day, 'Vessel': vessel_code(i), 'Permasalahan': f'Kerusakan {j} kapal {i}',
+                'Penyelesaian': '', 'Unit': 'PUMP', 'Issued Date': day, 'Closed Date': '',
+                'Keterangan': '', 'Status': random.choice(['OPEN', 'CLOSED']),
+            })
+    manager.add_laporan_many(rows)
+
+
+def legacy_search(manager, query):
+    """Pola sebelum index: get_ship_list + filter_ship_list lama"""
+    summary = manager.get_vessel_summary(None)
+    ships = [{'code': row['vessel'], 'open_nc': int(row['open_count']), 'closed_nc': int(row['closed_count'])}
+             for _, row in summary.iterrows()]
+    query = query.upper().strip()
+    return [ship for ship in ships if query in ship['code'].upper()]
+
+
+def median_us(operation, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports-per-vessel', type=int, nargs='+', default=[3, 10],
+                        help='panjang riwayat laporan per kapal')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(FLEET_SIZES), help='jumlah kapal')
+    parser.add_argument('--repeat', type=int, default=200, help='jumlah pengulangan untuk median')
+    args = parser.parse_args()
+    # Insert massal seed memang lambat; jangan dicatat sebagai query lambat
+    logging.getLogger('query_metrics').setLevel(logging.ERROR)
+
+    print(f"{'kapal':>6} {'laporan':>8} {'query':<10} {'build ms':>9} {'lama µs':>10} {'index µs':>9} {'hasil':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for vessels in args.sizes:
+            for reports in args.reports_per_vessel:
+                manager = DatabaseManager(os.path.join(tmp, f'fleet_{vessels}_{reports}.db'))
+                seed(manager, vessels, reports)
+                manager.search_vessels('')  # build index sekali
+                build_ms = manager.vessel_index.build_ms
+                for kind, query in QUERIES:
+                    legacy = median_us(lambda: legacy_search(manager, query), max(args.repeat // 20, 3))
+                    indexed = median_us(lambda: manager.search_vessels(query), args.repeat)
+                    matches, _ = manager.search_vessels(query)
+                    print(f"{vessels:>6} {vessels * reports:>8} {kind:<10} {build_ms:>9.1f} "
+                          f"{legacy:>10.0f} {indexed:>9.0f} {len(matches):>6}")
+                manager.close_all()
+
+
+if __name__ == '__main__':
+    main()
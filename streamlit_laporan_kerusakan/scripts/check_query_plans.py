@@ -0,0 +1,193 @@
+"""Regression check query plan semua query DatabaseManager.
+
+Setiap method baca/tulis DatabaseManager dipanggil dengan argumen contoh pada
+database sementara; SQL yang benar-benar dijalankan ditangkap lewat
+sqlite3 trace callback lalu di-EXPLAIN QUERY PLAN. Gagal (exit code 1) jika
+ada query yang:
+  - SCAN tabel besar tanpa index, atau SCAN seluruh index yang tidak covering
+    (full scan + lookup per baris), atau
+  - memakai TEMP B-TREE (sort/group sementara),
+kecuali pada tabel ringkasan kecil (SMALL_TABLES) atau pengecualian yang
+dicatat alasannya di ALLOWED_FULL_SCAN / ALLOWED_TEMP_BTREE.
+
+Jalankan dari folder streamlit_laporan_kerusakan:
+    python scripts/check_query_plans.py [-v]
+Juga dijalankan oleh pytest (tests/test_query_plans.py).
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from database import DatabaseManager
+
+# Tabel yang ukurannya ~ kapal x bulan x unit (sqlite_sequence: satu baris per tabel),
+# bukan jumlah laporan: scan/sort dibolehkan
+SMALL_TABLES = {'vessel_summary', 'laporan_rollup', 'import_log', 'vessel_registry', 'sqlite_sequence'}
+
+# Method yang boleh full scan tabel laporan, beserta alasannya
+ALLOWED_FULL_SCAN = {
+    'get_laporan_snapshot': 'memang memuat seluruh tabel (sekali per proses, lalu ditambal delta)',
+}
+
+# Plan yang membatasi baris lewat index tanggal (filter rentang tanggal semua kapal)
+DATE_RANGE_SEARCH = r'SEARCH laporan_kerusakan USING INDEX idx_\w*_iso \(\w+_iso[<>=]'
+
+# Method yang boleh memakai TEMP B-TREE: (pola yang wajib ada di plan, alasan).
+# Sort hanya dibolehkan di atas baris yang sudah dibatasi sesuai pola; SCAN + sort tetap gagal
+ALLOWED_TEMP_BTREE = {
+    'search_laporan': (r'SCAN laporan_fts VIRTUAL TABLE',
+                       'urutan bm25 hanya atas baris hasil MATCH FTS5 (dibatasi LIMIT)'),
+    # Tanpa filter tanggal listing memakai snapshot / keyset pagination; filter per kapal
+    # memakai idx_vessel_listing tanpa sort
+    'get_all_laporan': (DATE_RANGE_SEARCH, 'urutan listing atas baris hasil filter rentang tanggal'),
+    'get_dashboard_data': (DATE_RANGE_SEARCH, 'urutan created_at atas baris hasil filter rentang tanggal'),
+}
+
+VESSELS = ['AA', 'AB', 'KM', 'ZS']
+UNITS = ['ME', 'AE', 'PUMP', 'CRANE']
+
+
+def seed(db, rows=500):
+    rng = random.Random(11)
+    db.add_laporan_many([{
+        'Day': f'{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(2022, 2025)}',
+        'Vessel': rng.choice(VESSELS),
+        'Permasalahan': f'pompa {i} bocor',
+        'Unit': rng.choice(UNITS),
+        'Issued Date': f'{rng.randint(1, 12)}/{rng.randint(1, 28)}/2024',
+        'Closed Date': f'{rng.randint(1, 12)}/{rng.randint(1, 28)}/2025' if i % 3 else '',
+        'Status': 'OPEN' if i % 3 == 0 else 'CLOSED',
+    } for i in range(rows)])
+
+
+def workload(db):
+    """(nama, fungsi) untuk setiap query DatabaseManager yang dicek"""
+    page, cursor = db.get_laporan_page(limit=10)
+    return [
+        ('get_laporan_snapshot', lambda: db._load_laporan_snapshot()),
+        ('get_all_laporan', lambda: db.get_all_laporan(year=2024)),
+        ('get_all_laporan', lambda: db.get_all_laporan(date_column='issued_date', date_from='2024-01-01', date_to='2024-06-30')),
+        ('get_laporan_by_vessel', lambda: db.get_laporan_by_vessel('AA', year=2024)),
+        ('get_laporan_by_vessel', lambda: db.get_laporan_by_vessel('AA', date_column='issued_date', date_from='2024-03-01')),
+        ('get_laporan_page', lambda: db.get_laporan_page(limit=10, cursor=cursor)),
+        ('get_laporan_page', lambda: db.get_laporan_page(vessel='AA', limit=10)),
+        ('get_laporan_page', lambda: db.get_laporan_page(vessel='AA', status='OPEN', limit=10)),
+        ('get_laporan_page', lambda: db.get_laporan_page(status='CLOSED', limit=10)),
+        ('search_laporan', lambda: db.search_laporan('pompa bocor', vessel='AA', status='OPEN')),
+        ('get_available_years', lambda: db.get_available_years('day')),
+        ('get_available_years', lambda: db.get_available_years('issued_date', vessel='AA')),
+        ('get_stats', lambda: db.get_stats()),
+        ('get_vessel_summary', lambda: db.get_vessel_summary(2024)),
+        ('get_laporan_totals', lambda: db.get_laporan_totals()),
+        ('get_laporan_totals_year', lambda: db.get_laporan_totals(2024)),
+        ('get_vessel_cards', lambda: db.get_vessel_cards(2024, VESSELS[:2], status='open',
+                                                          sort='last_issued_desc', offset=30)),
+        ('get_vessel_cards_all', lambda: db.get_vessel_cards(None, sort='open_desc')),
+        ('get_vessel_registry', lambda: db.get_vessel_registry()),
+        ('search_vessels', lambda: db.search_vessels('A')),
+        ('get_summary_years', lambda: db.get_summary_years()),
+        ('get_dashboard_data', lambda: db.get_dashboard_data(year=2024)),
+        ('get_dashboard_vessels', lambda: db.get_dashboard_vessels()),
+        ('get_dashboard_kpis', lambda: db.get_dashboard_kpis(2024, VESSELS[:2])),
+        ('get_unit_counts', lambda: db.get_unit_counts(None, VESSELS, limit=10)),
+        ('get_status_counts_for_units', lambda: db.get_status_counts_for_units(UNITS[:2], 2024, VESSELS)),
+        ('get_vessel_counts', lambda: db.get_vessel_counts(2024, VESSELS, status='OPEN')),
+        ('get_monthly_trend', lambda: db.get_monthly_trend(None, VESSELS)),
+        ('get_oldest_open', lambda: db.get_oldest_open(2024, VESSELS)),
+        ('get_oldest_open', lambda: db.get_oldest_open(None, None)),
+        ('get_mttr_by_unit', lambda: db.get_mttr_by_unit(2024, VESSELS)),
+        ('get_changes_since', lambda: db.get_changes_since(10)),
+        ('is_file_imported', lambda: db.is_file_imported('0' * 64)),
+        ('add_laporan', lambda: db.add_laporan({'Day': '1/2/2024', 'Vessel': 'AA', 'Permasalahan': 'cek plan'})),
+        ('update_laporan', lambda: db.update_laporan(int(page['id'].iloc[0]), {
+            'Day': '1/2/2024', 'Vessel': 'AA', 'Permasalahan': 'cek plan update', 'Status': 'CLOSED'})),
+        ('delete_laporan', lambda: db.delete_laporan(int(page['id'].iloc[1]))),
+        ('add_laporan_many', lambda: db.add_laporan_many([
+            {'Day': '1/2/2024', 'Vessel': 'AB', 'Permasalahan': 'cek plan'},
+            {'Day': '1/3/2024', 'Vessel': 'AB', 'Permasalahan': 'cek plan bulk'}])),
+    ]
+
+
+def capture_statements(db, func):
+    """Jalankan func dengan cache kosong, kembalikan SQL (parameter sudah terisi) yang dieksekusi"""
+    statements = []
+    conn = db.get_connection()
+    db.clear_cache()
+    conn.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements
+            if re.match(r'\s*(SELECT|UPDATE|DELETE|INSERT|WITH)\b', sql, re.IGNORECASE)]
+
+
+def plan_problems(conn, sql, allow_full_scan=False, temp_btree_pattern=None):
+    """Detail plan yang melanggar aturan untuk satu statement.
+
+    temp_btree_pattern: TEMP B-TREE dibolehkan hanya jika pola ini ada di plan.
+    """
+    plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+    tables = set(re.findall(r'\b(?:SCAN|SEARCH) (\w+)', ' '.join(plan)))
+    allow_temp_btree = temp_btree_pattern is not None and re.search(temp_btree_pattern, '\n'.join(plan))
+    problems = []
+    for detail in plan:
+        scan = re.match(r'SCAN (\w+)(.*)', detail)
+        if scan and not allow_full_scan and scan.group(1) not in SMALL_TABLES \
+                and 'COVERING INDEX' not in scan.group(2) and _is_table(conn, scan.group(1)):
+            problems.append(detail)
+        if 'TEMP B-TREE' in detail and not allow_temp_btree \
+                and not all(table in SMALL_TABLES or not _is_table(conn, table) for table in tables):
+            problems.append(detail)
+    return plan, problems
+
+
+def _is_table(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? AND sql NOT LIKE 'CREATE VIRTUAL%'",
+        (name,)
+    ).fetchone() is not None
+
+
+def check_plans(db_path):
+    """Seed database baru di db_path, jalankan workload; list (nama, sql, plan, problems)"""
+    results = []
+    db = DatabaseManager(db_path)
+    try:
+        seed(db)
+        conn = db.get_connection()
+        for name, func in workload(db):
+            temp_btree_pattern = ALLOWED_TEMP_BTREE[name][0] if name in ALLOWED_TEMP_BTREE else None
+            for sql in capture_statements(db, func):
+                plan, problems = plan_problems(conn, sql, name in ALLOWED_FULL_SCAN, temp_btree_pattern)
+                results.append((name, sql, plan, problems))
+    finally:
+        db.close_all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-v', '--verbose', action='store_true', help='tampilkan plan setiap query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = check_plans(os.path.join(tmp, 'plans.db'))
+    failures = 0
+    for name, sql, plan, problems in results:
+        if problems or args.verbose:
+            print(f"{'FAIL' if problems else 'ok  '} {name}: {' '.join(sql.split())[:160]}")
+            for detail in plan:
+                print(f"       {'!!' if detail in problems else '  '} {detail}")
+        failures += bool(problems)
+
+    print(f"\n{len(results)} statement dicek, {failures} regresi query plan")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
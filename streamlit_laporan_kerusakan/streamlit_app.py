@@ -17,6 +17,8 @@ if 'selected_ship_code' not in st.session_state:
     st.session_state.selected_ship_code = None
 if 'username' not in st.session_state:
     st.session_state.username = ""
+if 'is_admin' not in st.session_state:
+    st.session_state.is_admin = False
 
 # --- MAIN LOGIC ---
 if not st.session_state.logged_in:
@@ -59,6 +61,7 @@ if not st.session_state.logged_in:
             if username_input == USERNAME and password_input == PASSWORD:
                 st.session_state.logged_in = True
                 st.session_state.username = username_input
+                st.session_state.is_admin = username_input == USERNAME
                 st.success("Login Berhasil! Mengalihkan ke Homepage...")
                 st.rerun()
             else:
@@ -69,13 +72,16 @@ else:
     
     # Navigation menu
     st.sidebar.markdown("### Navigasi")
+    pages = ["Homepage", "Laporan Aktif & Input", "Analisis Dashboard", "Migrasi Data"]
+    if st.session_state.is_admin:
+        pages.append("Monitor Sistem")
     page = st.sidebar.radio(
         "Pilih Halaman:",
-        ["Homepage", "Laporan Aktif & Input", "Analisis Dashboard", "Migrasi Data"]
+        pages
     )
     
     # Migration option hanya untuk admin
-    if st.session_state.username == USERNAME:
+    if st.session_state.is_admin:
         if page == "Migrasi Data":
             # Import and run migration app
             from migrate_csv_to_sqlite import migrate_csv_to_sqlite_app
@@ -86,6 +92,8 @@ else:
             st.switch_page("pages/2_Laporan_Aktif_&_Input.py")
         elif page == "Analisis Dashboard":
             st.switch_page("pages/3_Analisis_Dashboard.py")
+        elif page == "Monitor Sistem":
+            st.switch_page("pages/4_admin_monitor.py")
     else:
         # Untuk user biasa, hide migration option
         if page == "Homepage":
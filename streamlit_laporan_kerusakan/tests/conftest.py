@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modul aplikasi di-import langsung (seperti page script dan scripts/)
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
@@ -0,0 +1,26 @@
+from database import DatabaseManager
+from date_utils import DATE_FORMAT
+
+
+def iso_dates(db, laporan_id):
+    return db.get_connection().execute(
+        'SELECT day_iso, issued_iso FROM laporan_kerusakan WHERE id = ?', (laporan_id,)
+    ).fetchone()
+
+
+def test_app_dates_are_day_first_and_legacy_text_keeps_its_date(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'laporan.db'))
+    entry = {'Day': '05/03/2025', 'Vessel': 'KM A', 'Permasalahan': 'Pompa bocor', 'Issued Date': '05/03/2025'}
+    app_id = db.add_laporan(entry, date_format=DATE_FORMAT)
+    assert iso_dates(db, app_id) == ('2025-03-05', '2025-03-05')
+
+    # Baris CSV lama (M/D/YYYY) yang tanggalnya tidak diedit tidak ikut di-parse ulang sebagai DD/MM
+    legacy = {'Day': '10/12/2022', 'Vessel': 'KM A', 'Permasalahan': 'Mesin mati', 'Issued Date': '10/12/2022'}
+    legacy_id = db.add_laporan(legacy)
+    assert iso_dates(db, legacy_id) == ('2022-10-12', '2022-10-12')
+    db.update_laporan(legacy_id, dict(legacy, Keterangan='dicek'), date_format=DATE_FORMAT)
+    assert iso_dates(db, legacy_id) == ('2022-10-12', '2022-10-12')
+
+    db.update_laporan(legacy_id, dict(legacy, Day='01/12/2022'), date_format=DATE_FORMAT)
+    assert iso_dates(db, legacy_id) == ('2022-12-01', '2022-10-12')
+    db.close_all()
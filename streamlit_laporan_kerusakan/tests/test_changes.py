@@ -0,0 +1,37 @@
+from database import DatabaseManager
+
+
+def laporan(permasalahan):
+    return {'Day': '05/03/2025', 'Vessel': 'KM A', 'Permasalahan': permasalahan, 'Status': 'OPEN'}
+
+
+def changelog_size(db):
+    return db.get_connection().execute('SELECT COUNT(*) FROM laporan_changes').fetchone()[0]
+
+
+def test_snapshot_prunes_changelog_and_stale_watermark_reloads(tmp_path):
+    path = str(tmp_path / 'laporan.db')
+    db, other = DatabaseManager(path), DatabaseManager(path)
+    ids = [db.add_laporan(laporan(f'Kerusakan {i}')) for i in range(10)]
+    assert len(other.get_laporan_snapshot()) == 10
+    stale_watermark = other.laporan_snapshot.stats()['watermark']
+
+    assert len(db.get_laporan_snapshot()) == 10
+    assert changelog_size(db) == 0
+    watermark = db.laporan_snapshot.stats()['watermark']
+    rows, deleted_ids, new_watermark = db.get_changes_since(watermark)
+    assert (len(rows), deleted_ids, new_watermark) == (0, [], watermark)
+
+    db.delete_laporan(ids[0])
+    db.add_laporan(laporan('Kerusakan baru'))
+    expected = sorted([f'Kerusakan {i}' for i in range(1, 10)] + ['Kerusakan baru'])
+    assert sorted(db.get_laporan_snapshot()['permasalahan']) == expected
+    assert db.laporan_snapshot.stats()['patches'] == 1
+    assert changelog_size(db) == 0
+
+    # Changelog sesudah watermark lama sudah dipangkas: delta tidak tersedia, muat ulang penuh
+    assert other.get_changes_since(stale_watermark) is None
+    assert sorted(other.get_laporan_snapshot()['permasalahan']) == expected
+    assert other.laporan_snapshot.stats()['loads'] == 2
+    db.close_all()
+    other.close_all()
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from database import DatabaseManager, laporan_content_hash
+from importer import frame_to_records, normalize_laporan_frame
+
+
+def test_blank_values_hash_like_empty_fields():
+    assert laporan_content_hash('KM A', 'nan', 'nan', 'Pompa bocor') == laporan_content_hash('KM A', '', '', 'Pompa bocor')
+    assert laporan_content_hash('km a', 'NAN', None, 'pompa  BOCOR') == laporan_content_hash('KM A', None, 'NaT', 'Pompa bocor')
+
+
+def test_form_entry_and_csv_import_are_one_report(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'laporan.db'))
+    db.add_laporan({'Day': '', 'Vessel': 'KM A', 'Permasalahan': 'Pompa bocor', 'Unit': '', 'Status': 'OPEN'})
+
+    csv_row = pd.DataFrame([{'Day': 'nan', 'Vessel': 'KM A', 'Permasalahan': 'Pompa bocor', 'Unit': 'nan'}])
+    result = db.add_laporan_many(frame_to_records(normalize_laporan_frame(csv_row)), on_conflict='skip')
+
+    assert (result['inserted'], result['skipped']) == (0, 1)
+    db.close_all()
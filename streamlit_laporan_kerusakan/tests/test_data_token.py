@@ -0,0 +1,42 @@
+import threading
+
+from database import DatabaseManager
+
+
+def laporan(permasalahan, vessel='KM A'):
+    return {
+        'Day': '05/03/2025', 'Vessel': vessel, 'Permasalahan': permasalahan, 'Penyelesaian': '',
+        'Unit': 'PUMP', 'Issued Date': '05/03/2025', 'Closed Date': '', 'Keterangan': '', 'Status': 'OPEN',
+    }
+
+
+def on_fresh_thread(read):
+    """Jalankan read() di thread baru, seperti setiap rerun Streamlit"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(read()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_write_from_other_manager_invalidates_cache_and_snapshot(tmp_path):
+    path = str(tmp_path / 'laporan.db')
+    reader, writer = DatabaseManager(path), DatabaseManager(path)
+    writer.add_laporan(laporan('Pompa bocor'))
+
+    assert on_fresh_thread(lambda: reader.get_laporan_totals()['total']) == 1
+    assert on_fresh_thread(lambda: len(reader.get_laporan_snapshot())) == 1
+
+    # Setiap commit proses lain terlihat tepat sekali, walau dibaca dari koneksi pool yang dipakai ulang
+    for expected in (2, 3):
+        writer.add_laporan(laporan(f'Kerusakan ke-{expected}'))
+        assert on_fresh_thread(lambda: reader.get_laporan_totals()['total']) == expected
+        assert on_fresh_thread(lambda: len(reader.get_laporan_snapshot())) == expected
+        assert on_fresh_thread(reader.data_token) == on_fresh_thread(reader.data_token)
+
+    writer.add_vessel('TB BARU')
+    assert 'TB BARU' in on_fresh_thread(reader.get_vessel_registry)
+    assert on_fresh_thread(lambda: reader.search_vessels('TB BARU'))[0] == ['TB BARU']
+
+    reader.close_all()
+    writer.close_all()
@@ -0,0 +1,41 @@
+import pytest
+
+from check_query_plans import ALLOWED_TEMP_BTREE, check_plans, plan_problems, seed
+from database import DatabaseManager
+
+LISTING_ORDER = 'ORDER BY status_rank DESC, created_at DESC, id DESC'
+
+
+@pytest.fixture(scope='module')
+def results(tmp_path_factory):
+    return check_plans(str(tmp_path_factory.mktemp('plans') / 'plans.db'))
+
+
+def test_no_query_plan_regressions(results):
+    failures = [f"{name}: {' '.join(sql.split())[:120]} -> {problems}" for name, sql, _, problems in results if problems]
+    assert not failures
+
+
+def test_vessel_date_filter_needs_no_sort(results):
+    plans = [plan for name, sql, plan, _ in results
+             if name == 'get_laporan_by_vessel' and sql.lstrip().startswith('SELECT * FROM laporan_kerusakan')]
+    assert plans
+    assert not any('TEMP B-TREE' in detail for plan in plans for detail in plan)
+
+
+def test_temp_btree_exemption_only_covers_date_range_search(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'laporan.db'))
+    seed(db)
+    conn = db.get_connection()
+    pattern = ALLOWED_TEMP_BTREE['get_all_laporan'][0]
+
+    date_range = "day_iso >= '2024-01-01' AND day_iso < '2025-01-01'"
+    plan, problems = plan_problems(conn, f'SELECT * FROM laporan_kerusakan WHERE {date_range} {LISTING_ORDER}',
+                                   temp_btree_pattern=pattern)
+    assert any('TEMP B-TREE' in detail for detail in plan)
+    assert problems == []
+    # Sort atas seluruh tabel (tanpa SEARCH index tanggal) tetap gagal walau method dikecualikan
+    _, problems = plan_problems(conn, 'SELECT * FROM laporan_kerusakan ORDER BY unit, created_at DESC',
+                                temp_btree_pattern=pattern)
+    assert any('TEMP B-TREE' in detail for detail in problems)
+    db.close_all()
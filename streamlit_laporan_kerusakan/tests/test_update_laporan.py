@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager
+
+
+def laporan(permasalahan, **changes):
+    data = {
+        'Day': '05/03/2025', 'Vessel': 'KM A', 'Permasalahan': permasalahan, 'Penyelesaian': '',
+        'Unit': 'PUMP', 'Issued Date': '05/03/2025', 'Closed Date': '', 'Keterangan': '', 'Status': 'OPEN',
+    }
+    data.update(changes)
+    return data
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'laporan.db'))
+    yield manager
+    manager.close_all()
+
+
+def test_update_into_existing_report_raises(db):
+    db.add_laporan(laporan('Pompa bocor'))
+    other = db.add_laporan(laporan('Mesin mati'))
+    with pytest.raises(sqlite3.IntegrityError):
+        db.update_laporan(other, laporan('Pompa bocor'))
+
+
+def test_legacy_duplicate_can_still_be_saved(db):
+    db.add_laporan(laporan('Pompa bocor'))
+    legacy = db.add_laporan(laporan('Sementara'))
+    # Seperti duplikat lama setelah migrasi idx_content_hash: isi sama, hash NULL
+    with db.transaction() as conn:
+        conn.execute("UPDATE laporan_kerusakan SET permasalahan = 'Pompa bocor', content_hash = NULL WHERE id = ?",
+                     (legacy,))
+
+    db.update_laporan(legacy, laporan('Pompa bocor', Status='CLOSED', **{'Closed Date': '07/03/2025'}))
+    status, content_hash = db.get_connection().execute(
+        'SELECT status, content_hash FROM laporan_kerusakan WHERE id = ?', (legacy,)
+    ).fetchone()
+    assert (status, content_hash) == ('CLOSED', None)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+# Panjang n-gram maksimum di index substring (query lebih panjang memakai irisan trigram)
+MAX_GRAM = 3
+
+
+def typo_budget(query):
+    """Jumlah salah ketik yang ditoleransi: 0 untuk query pendek (terlalu banyak kemiripan)"""
+    if len(query) <= 2:
+        return 0
+    return 1 if len(query) <= 5 else 2
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _trie_keys(code):
+    """Kunci trie satu kode: kode utuh dan setiap kata di dalamnya ('KM SINAR' -> 'SINAR')"""
+    words = code.replace('-', ' ').split()
+    return [code] + words if len(words) > 1 else [code]
+
+
+def _distance_row(query, char, previous, previous2, previous_char):
+    """Satu baris DP Damerau-Levenshtein (optimal string alignment) saat trie turun satu huruf"""
+    row = [previous[0] + 1]
+    for j in range(1, len(query) + 1):
+        value = min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (query[j - 1] != char))
+        if previous2 is not None and j > 1 and query[j - 1] == previous_char and query[j - 2] == char:
+            value = min(value, previous2[j - 2] + 1)  # dua huruf bertukar
+        row.append(value)
+    return row
+
+
+class VesselSearchIndex:
+    """Index pencarian kode kapal di memori, dibangun ulang utuh lewat build().
+
+    - trie (kode utuh + setiap katanya): setiap node menyimpan daftar kode (urut) di
+      bawahnya, jadi pencarian prefix cukup menelusuri len(query) node;
+    - n-gram (1..MAX_GRAM): posting list kode per potongan teks untuk substring;
+    - salah ketik: telusuri trie sambil menghitung jarak edit, cabang yang sudah
+      melewati batas dipangkas; hanya dipakai jika tidak ada yang cocok persis.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trie = {}
+        self._postings = {}
+        self._codes = ()
+        self.build_ms = 0.0
+        self.builds = 0
+
+    def build(self, codes):
+        """Bangun index dari kode kapal; struktur baru ditukar sekaligus (aman untuk thread pembaca)"""
+        started = time.perf_counter()
+        codes = sorted({code.strip().upper() for code in codes if code and code.strip()})
+        trie, postings = {'': []}, {}
+        for code in codes:
+            for key in _trie_keys(code):
+                nodes = [trie]
+                for char in key:
+                    nodes.append(nodes[-1].setdefault(char, {'': []}))
+                for node in nodes:
+                    # Kunci satu kode diinsert berurutan, jadi duplikat selalu di ujung daftar
+                    if node[''][-1:] != [code]:
+                        node[''].append(code)
+            for n in range(1, MAX_GRAM + 1):
+                for gram in _grams(code, n):
+                    postings.setdefault(gram, set()).add(code)
+        with self._lock:
+            self._trie, self._postings, self._codes = trie, postings, tuple(codes)
+            self.build_ms = (time.perf_counter() - started) * 1000
+            self.builds += 1
+
+    def __len__(self):
+        return len(self._codes)
+
+    def prefix(self, query):
+        """Kode yang diawali query (urut)"""
+        node = self._trie
+        for char in query:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node['']
+
+    def substring(self, query):
+        """Kode yang memuat query di posisi mana pun"""
+        if len(query) <= MAX_GRAM:
+            return self._postings.get(query, set())
+        postings = sorted((self._postings.get(gram, set()) for gram in _grams(query, MAX_GRAM)), key=len)
+        if not postings[0]:
+            return set()
+        return {code for code in postings[0].intersection(*postings[1:]) if query in code}
+
+    def fuzzy(self, query, max_typos=None):
+        """Kode yang salah satu prefix kode/katanya berjarak edit <= max_typos dari query:
+        daftar (jarak, kode) urut"""
+        max_typos = typo_budget(query) if max_typos is None else max_typos
+        if max_typos == 0:
+            return []
+        best = {}
+        first_row = list(range(len(query) + 1))
+        stack = [(child, char, first_row, None, None) for char, child in self._trie.items() if char]
+        while stack:
+            node, char, previous, previous2, previous_char = stack.pop()
+            row = _distance_row(query, char, previous, previous2, previous_char)
+            if row[-1] <= max_typos:
+                for code in node['']:
+                    if row[-1] < best.get(code, max_typos + 1):
+                        best[code] = row[-1]
+            # Jarak tidak bisa turun lagi di bawah min(row): cabang dipangkas
+            if min(row) <= max_typos:
+                stack.extend((child, next_char, row, previous, char)
+                             for next_char, child in node.items() if next_char)
+        return sorted((distance, code) for code, distance in best.items())
+
+    def search(self, query):
+        """Cari kode kapal: (daftar kode, fuzzy).
+
+        Urutan: prefix, lalu substring lain. Jika keduanya kosong, kode dengan jarak
+        salah ketik terkecil dengan fuzzy=True. Query kosong mengembalikan semua kode.
+        """
+        query = (query or '').strip().upper()
+        if not query:
+            return list(self._codes), False
+        matches = list(self.prefix(query))
+        seen = set(matches)
+        matches += sorted(code for code in self.substring(query) if code not in seen)
+        if matches:
+            return matches, False
+        matches = self.fuzzy(query)
+        return [code for distance, code in matches if distance == matches[0][0]], True
+
+    def stats(self):
+        return {'vessels': len(self._codes), 'grams': len(self._postings),
+                'build_ms': self.build_ms, 'builds': self.builds}